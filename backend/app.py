@@ -4,6 +4,7 @@
 FastAPI application entry point for web-based debt collection agent.
 """
 
+import asyncio
 import sys
 import os
 from pathlib import Path
@@ -16,30 +17,74 @@ load_dotenv()
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+
+from backend.graph_runner import shutdown_executor
+from src.utils.llm import (
+    warm_up_azure_openai, get_llm_readiness, get_llm_breaker_status, get_llm_deployment_status
+)
+from src.utils.log import get_logger
+from src.utils.metrics import REGISTRY
+from src.utils.plan_prefetch import shutdown_plan_prefetch
+
+log = get_logger("app")
+
+# Warm the Azure OpenAI client in the background at startup (no customer pays for it)
+LLM_WARMUP_ON_STARTUP = os.getenv("LLM_WARMUP_ON_STARTUP", "true").strip().lower() == "true"
+LLM_WARMUP_ATTEMPTS = int(os.getenv("LLM_WARMUP_ATTEMPTS", "3"))
+
+# Warm-up attempts not made yet: a failed attempt with retries left is still warming
+_warmup_attempts_left = LLM_WARMUP_ATTEMPTS if LLM_WARMUP_ON_STARTUP else 0
 
 # Validate required environment variables
 if not os.getenv("AZURE_OPENAI_API_KEY"):
-    print("[WARNING] AZURE_OPENAI_API_KEY not set. The server will start but API calls may fail.")
-    print("Please create a .env file in the project root with: AZURE_OPENAI_API_KEY=your_api_key_here")
+    log.warning("AZURE_OPENAI_API_KEY not set. The server will start but API calls may fail. "
+                "Please create a .env file in the project root with: AZURE_OPENAI_API_KEY=your_api_key_here")
 
 # Import routes with error handling
 try:
     from backend.routes import chat
-    print("[OK] Successfully imported chat routes")
+    log.info("Imported chat routes")
 except Exception as e:
-    import traceback
-    print(f"[ERROR] Failed to import chat routes: {e}")
-    traceback.print_exc()
+    log.exception("Failed to import chat routes: %s", e)
     # Create dummy router to prevent server crash
     from fastapi import APIRouter
     chat = type('obj', (object,), {'router': APIRouter()})
 
+async def warm_up_llm():
+    """Run the warm-up probe off the event loop, retrying with backoff."""
+    global _warmup_attempts_left
+    for attempt in range(1, LLM_WARMUP_ATTEMPTS + 1):
+        readiness = await asyncio.to_thread(warm_up_azure_openai)
+        _warmup_attempts_left = LLM_WARMUP_ATTEMPTS - attempt
+        if readiness["status"] == "ready":
+            return
+        if attempt < LLM_WARMUP_ATTEMPTS:
+            await asyncio.sleep(2 ** attempt)
+    log.warning("LLM warm-up failed after %d attempts; serving with fallbacks", LLM_WARMUP_ATTEMPTS)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup/shutdown hooks."""
+    warmup_task = asyncio.create_task(warm_up_llm()) if LLM_WARMUP_ON_STARTUP else None
+    yield
+    if warmup_task and not warmup_task.done():
+        warmup_task.cancel()
+    # Release graph and plan prefetch worker threads
+    shutdown_executor()
+    shutdown_plan_prefetch()
+
+
 app = FastAPI(
     title="Debt Collection Agent API",
     description="Web-based debt collection agent backend",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS middleware to allow frontend requests
@@ -54,11 +99,9 @@ app.add_middleware(
 # Register API routes
 try:
     app.include_router(chat.router, prefix="/api", tags=["chat"])
-    print("[OK] Successfully registered chat routes")
+    log.info("Registered chat routes")
 except Exception as e:
-    print(f"[ERROR] Failed to register chat routes: {e}")
-    import traceback
-    traceback.print_exc()
+    log.exception("Failed to register chat routes: %s", e)
 
 
 @app.get("/")
@@ -71,21 +114,48 @@ async def root():
 
 
 @app.get("/health")
-async def health():
-    """Health check endpoint."""
-    return {"status": "healthy"}
+async def health(response: Response):
+    """
+    Health check endpoint.
+    Returns 503 while the LLM warm-up is still running, including between a
+    failed attempt and its retry, so the load balancer only routes to warm
+    workers. A warm-up that failed every attempt, or an open LLM circuit
+    breaker, reports "degraded": the worker still serves, using rule-based
+    and template fallbacks. With several Azure OpenAI deployments
+    configured, their routing state is listed under "llm_deployments".
+    """
+    readiness = get_llm_readiness()
+    breaker = get_llm_breaker_status()
+    details = {"llm": readiness, "llm_breaker": breaker}
+    deployments = get_llm_deployment_status()
+    if deployments is not None:
+        details["llm_deployments"] = deployments
+
+    retrying = readiness["status"] == "failed" and _warmup_attempts_left > 0
+    if LLM_WARMUP_ON_STARTUP and (readiness["status"] in ("cold", "warming") or retrying):
+        response.status_code = 503
+        return {"status": "warming", **details}
+
+    if (LLM_WARMUP_ON_STARTUP and readiness["status"] == "failed") or breaker["state"] != "closed":
+        return {"status": "degraded", **details}
+
+    return {"status": "healthy", **details}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus-format metrics for this worker."""
+    return REGISTRY.render_prometheus()
 
 
 if __name__ == "__main__":
     import uvicorn
     try:
-        print("[INFO] Starting server on http://0.0.0.0:8000")
-        print("[INFO] Health check: http://localhost:8000/health")
-        print("[INFO] API docs: http://localhost:8000/docs")
+        log.info("Starting server on http://0.0.0.0:8000")
+        log.info("Health check: http://localhost:8000/health")
+        log.info("API docs: http://localhost:8000/docs")
         uvicorn.run(app, host="0.0.0.0", port=8000)
     except Exception as e:
-        print(f"[FATAL] Failed to start server: {e}")
-        import traceback
-        traceback.print_exc()
+        log.critical("Failed to start server: %s", e, exc_info=True)
         raise
 
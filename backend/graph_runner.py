@@ -0,0 +1,114 @@
+# backend/graph_runner.py
+
+"""
+Non-blocking execution of the LangGraph agent for the FastAPI routes.
+
+The graph nodes are synchronous and may block on Azure OpenAI for a full
+network round trip. Running them directly inside an ``async def`` route
+stalls the uvicorn event loop for every other session on the worker, so
+all graph runs go through here instead:
+
+- "executor" mode (default): ``graph.invoke`` runs on a dedicated, bounded
+  thread pool.
+- "async" mode: ``graph.ainvoke`` runs on the event loop; the LLM-bound
+  nodes await AsyncAzureOpenAI directly and the remaining synchronous
+  nodes are offloaded by LangGraph itself.
+
+Both modes share one semaphore per event loop (a worker runs one), so a
+worker never runs more than GRAPH_MAX_CONCURRENCY graph turns at once;
+extra requests queue on the loop.
+stream_graph() runs a turn the async way and yields reply tokens as they
+are generated, for the streaming chat route; the turn gives its slot back
+when the graph finishes, not when the client has read the reply.
+"""
+
+import asyncio
+import os
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+
+# Maximum number of graph turns executing concurrently on this worker
+GRAPH_MAX_CONCURRENCY = int(os.getenv("GRAPH_MAX_CONCURRENCY", "32"))
+
+# "executor" (thread pool around graph.invoke) or "async" (graph.ainvoke)
+GRAPH_EXECUTION_MODE = os.getenv("GRAPH_EXECUTION_MODE", "executor").strip().lower()
+
+# Default LangGraph config used by every route
+DEFAULT_GRAPH_CONFIG = {"recursion_limit": 25}
+
+_executor = ThreadPoolExecutor(
+    max_workers=GRAPH_MAX_CONCURRENCY,
+    thread_name_prefix="graph-worker",
+)
+# An asyncio.Semaphore belongs to the loop it first waits on, so each loop
+# (tests and embedders may run several in turn) gets its own.
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def _semaphore() -> asyncio.Semaphore:
+    """The running loop's graph-turn semaphore."""
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(GRAPH_MAX_CONCURRENCY)
+    return semaphore
+
+
+async def run_graph(graph, state: dict, config: dict = None) -> dict:
+    """
+    Run one graph turn without blocking the event loop.
+    Returns the updated state, exactly like ``graph.invoke``.
+    """
+    config = config or DEFAULT_GRAPH_CONFIG
+
+    async with _semaphore():
+        if GRAPH_EXECUTION_MODE == "async":
+            return await graph.ainvoke(state, config)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, partial(graph.invoke, state, config))
+
+
+async def stream_graph(graph, state: dict, config: dict = None):
+    """
+    Run one graph turn on the event loop, streaming the LLM reply.
+    Yields ("token", text) for each generated token, then ("state", final_state).
+    The turn holds its graph slot only while the graph runs: tokens are
+    queued for the caller, so a client that reads slowly does not keep
+    other turns waiting.
+    """
+    config = {**(config or DEFAULT_GRAPH_CONFIG), "configurable": {"stream_tokens": True}}
+    events = asyncio.Queue()
+
+    async def run():
+        try:
+            async with _semaphore():
+                final_state = None
+                async for mode, chunk in graph.astream(state, config, stream_mode=["custom", "values"]):
+                    if mode == "custom" and "token" in chunk:
+                        events.put_nowait(("token", chunk["token"]))
+                    elif mode == "values":
+                        final_state = chunk
+            events.put_nowait(("state", final_state))
+        except Exception as e:
+            events.put_nowait(("error", e))
+
+    turn = asyncio.create_task(run())
+    try:
+        while True:
+            kind, value = await events.get()
+            if kind == "error":
+                raise value
+            yield kind, value
+            if kind == "state":
+                return
+    finally:
+        # Stops the turn if the client went away before the end (no-op otherwise)
+        turn.cancel()
+
+
+def shutdown_executor() -> None:
+    """Release graph worker threads (called on application shutdown)."""
+    _executor.shutdown(wait=False, cancel_futures=True)
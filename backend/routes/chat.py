@@ -6,9 +6,12 @@ Handles user input and invokes LangGraph agent.
 """
 
 from fastapi import APIRouter, HTTPException, File, UploadFile, Form
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional
+import json
 import os
+import time
 from datetime import datetime
 
 import sys
@@ -18,21 +21,28 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
+from src.utils.log import get_logger
+
+log = get_logger("chat")
+
 # Import with error handling
 try:
     from src.graph import app as graph_app
-    print("[OK] Successfully imported graph")
+    log.info("Imported graph")
 except Exception as e:
-    import traceback
-    print(f"[ERROR] Failed to import graph: {e}")
-    traceback.print_exc()
+    log.exception("Failed to import graph: %s", e)
     graph_app = None
 
 from backend.session_store import get_session, create_session, update_session
+from backend.graph_runner import run_graph, stream_graph
 
 
 router = APIRouter()
 
+# Latency budget (seconds) for one /chat turn. LLM calls are bounded by what is
+# left of it; once it is spent, nodes answer with their templates/fallback plans.
+TURN_LATENCY_BUDGET_SECONDS = float(os.getenv("TURN_LATENCY_BUDGET_SECONDS", "8"))
+
 
 class ChatRequest(BaseModel):
     """Request model for /chat endpoint."""
@@ -85,16 +95,10 @@ def sanitize_user_input(user_input: str) -> str:
     return sanitized
 
 
-@router.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+def _start_chat_turn(request: ChatRequest) -> tuple:
     """
-    Handle user chat input.
-    
-    Flow:
-    1. Validate session and input
-    2. Add user message to state
-    3. Invoke LangGraph to process
-    4. Return updated state
+    Validate a chat request and prepare its session state for a graph turn.
+    Returns (session_id, state). Raises HTTPException for invalid requests.
     """
     # Validate request
     if not request:
@@ -161,7 +165,7 @@ async def chat(request: ChatRequest):
     
     # Warn if agent not awaiting input (but allow it)
     if not state.get("awaiting_user"):
-        print(f"[WARNING] Received input when not awaiting user. Stage: {state.get('stage')}")
+        log.warning("Received input when not awaiting user. Stage: %s", state.get("stage"))
     
     # Add user message to conversation
     state["messages"].append({
@@ -172,18 +176,84 @@ async def chat(request: ChatRequest):
     # Update state for graph processing
     state["last_user_input"] = user_input
     state["awaiting_user"] = False
+    state["turn_deadline"] = time.time() + TURN_LATENCY_BUDGET_SECONDS
+
+    # Validate graph is available
+    if graph_app is None:
+        raise HTTPException(
+            status_code=500,
+            detail="Server configuration error: Graph not initialized. Please check server logs."
+        )
+
+    return session_id, state
+
+
+def _chat_response(updated_state: dict) -> ChatResponse:
+    """Build the /chat response from the state returned by the graph."""
+    # Extract response data with defaults
+    messages = updated_state.get("messages", [])
+    stage = updated_state.get("stage", "unknown")
+    awaiting_user = updated_state.get("awaiting_user", False)
+    offered_plans = updated_state.get("offered_plans", [])
+    is_complete = updated_state.get("is_complete", False)
+    payment_status = updated_state.get("payment_status")
+    
+    # Extract customer info for header
+    is_verified = updated_state.get("is_verified", False)
+    customer_name = updated_state.get("customer_name")
+    outstanding_amount = updated_state.get("outstanding_amount")
+    days_past_due = updated_state.get("days_past_due")
+    loan_id = updated_state.get("loan_id")
+    
+    # Ensure messages list is valid
+    if not isinstance(messages, list):
+        messages = []
+    
+    return ChatResponse(
+        messages=messages,
+        stage=stage,
+        awaiting_user=awaiting_user,
+        offered_plans=offered_plans,
+        is_complete=is_complete,
+        payment_status=payment_status,
+        is_verified=is_verified,
+        customer_name=customer_name,
+        outstanding_amount=outstanding_amount,
+        days_past_due=days_past_due,
+        loan_id=loan_id
+    )
+
+
+def _chat_error_detail(e: Exception) -> str:
+    """User-friendly message for an unexpected error during a chat turn."""
+    error_detail = "An error occurred while processing your message. Please try again."
+    error_str = str(e).lower()
+    
+    if "azure_openai_api_key" in error_str or "api_key" in error_str:
+        error_detail = "Server configuration error: AZURE_OPENAI_API_KEY is not set. Please configure the API key in the .env file."
+    elif "timeout" in error_str:
+        error_detail = "Request timed out. Please try again."
+    elif "connection" in error_str:
+        error_detail = "Connection error. Please check your internet connection."
+    return error_detail
+
+
+@router.post("/chat", response_model=ChatResponse)
+async def chat(request: ChatRequest):
+    """
+    Handle user chat input.
+    
+    Flow:
+    1. Validate session and input
+    2. Add user message to state
+    3. Invoke LangGraph to process
+    4. Return updated state
+    """
+    session_id, state = _start_chat_turn(request)
     
     try:
-        # Validate graph is available
-        if graph_app is None:
-            raise HTTPException(
-                status_code=500,
-                detail="Server configuration error: Graph not initialized. Please check server logs."
-            )
-        
-        # Process through LangGraph
-        config = {"recursion_limit": 25}
-        updated_state = graph_app.invoke(state, config)
+        # Process through LangGraph (off the event loop)
+        updated_state = await run_graph(graph_app, state)
         
         # Validate that we got a valid state back
         if not updated_state:
@@ -192,69 +262,69 @@ async def chat(request: ChatRequest):
         # Update session store with new state
         update_session(session_id, updated_state)
         
-        # Extract response data with defaults
-        messages = updated_state.get("messages", [])
-        stage = updated_state.get("stage", "unknown")
-        awaiting_user = updated_state.get("awaiting_user", False)
-        offered_plans = updated_state.get("offered_plans", [])
-        is_complete = updated_state.get("is_complete", False)
-        payment_status = updated_state.get("payment_status")
-        
-        # Extract customer info for header
-        is_verified = updated_state.get("is_verified", False)
-        customer_name = updated_state.get("customer_name")
-        outstanding_amount = updated_state.get("outstanding_amount")
-        days_past_due = updated_state.get("days_past_due")
-        loan_id = updated_state.get("loan_id")
-        
-        # Ensure messages list is valid
-        if not isinstance(messages, list):
-            messages = []
-        
-        return ChatResponse(
-            messages=messages,
-            stage=stage,
-            awaiting_user=awaiting_user,
-            offered_plans=offered_plans,
-            is_complete=is_complete,
-            payment_status=payment_status,
-            is_verified=is_verified,
-            customer_name=customer_name,
-            outstanding_amount=outstanding_amount,
-            days_past_due=days_past_due,
-            loan_id=loan_id
-        )
+        return _chat_response(updated_state)
         
     except ValueError as e:
         # Handle validation errors
-        print(f"[ERROR] Validation error: {e}")
+        log.warning("Validation error: %s", e)
         raise HTTPException(
             status_code=400,
             detail=f"Invalid request: {str(e)}"
         )
     except Exception as e:
-        import traceback
-        error_trace = traceback.format_exc()
-        print(f"[ERROR] Chat endpoint error: {e}")
-        print(error_trace)
+        log.exception("Chat endpoint error: %s", e)
         
         # Provide user-friendly error message
-        error_detail = "An error occurred while processing your message. Please try again."
-        error_str = str(e).lower()
-        
-        if "azure_openai_api_key" in error_str or "api_key" in error_str:
-            error_detail = "Server configuration error: AZURE_OPENAI_API_KEY is not set. Please configure the API key in the .env file."
-        elif "timeout" in error_str:
-            error_detail = "Request timed out. Please try again."
-        elif "connection" in error_str:
-            error_detail = "Connection error. Please check your internet connection."
-        
         raise HTTPException(
             status_code=500,
-            detail=error_detail
+            detail=_chat_error_detail(e)
         )
 
 
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Handle user chat input, streaming the agent's reply as Server-Sent Events.
+
+    Events:
+    - "token": {"text": ...} for each generated token of an LLM reply
+    - "done": the same fields as the /chat response (authoritative: if the
+      reply fell back to a template, its text replaces the streamed tokens)
+    - "error": {"detail": ...} if the turn failed
+    """
+    session_id, state = _start_chat_turn(request)
+
+    async def events():
+        try:
+            updated_state = None
+            async for kind, value in stream_graph(graph_app, state):
+                if kind == "token":
+                    yield _sse("token", {"text": value})
+                else:
+                    updated_state = value
+
+            if not updated_state:
+                raise ValueError("Graph returned empty state")
+
+            update_session(session_id, updated_state)
+            yield _sse("done", _chat_response(updated_state).model_dump())
+
+        except Exception as e:
+            log.exception("Chat stream error: %s", e)
+            yield _sse("error", {"detail": _chat_error_detail(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 class InitRequest(BaseModel):
     """Request model for /init endpoint."""
     phone: str
@@ -345,8 +415,7 @@ async def init_session(request: InitRequest):
                 detail="Server configuration error: Graph not initialized. Please check server logs."
             )
         
-        config = {"recursion_limit": 25}
-        initial_state = graph_app.invoke(state, config)
+        initial_state = await run_graph(graph_app, state)
         
         # Validate state
         if not initial_state:
@@ -375,16 +444,13 @@ async def init_session(request: InitRequest):
             "loan_id": initial_state.get("loan_id")
         }
     except ValueError as e:
-        print(f"[ERROR] Validation error during init: {e}")
+        log.warning("Validation error during init: %s", e)
         raise HTTPException(
             status_code=400,
             detail=f"Invalid request: {str(e)}"
         )
     except Exception as e:
-        import traceback
-        error_trace = traceback.format_exc()
-        print(f"[ERROR] Init session error: {e}")
-        print(error_trace)
+        log.exception("Init session error: %s", e)
         
         # Provide user-friendly error message
         error_detail = "An error occurred while starting the chat. Please try again."
@@ -454,36 +520,33 @@ async def upload_screenshot(
         
         # Trigger graph to complete if payment proof uploaded
         if state.get("payment_status") == "paid" and state.get("stage") == "closing":
-            print(f"[UPLOAD] Payment status is 'paid' and stage is 'closing' - triggering graph")
+            log.debug("Payment status is 'paid' and stage is 'closing' - triggering graph")
             try:
                 # Set last_user_input to trigger graph processing
                 state["last_user_input"] = f"[Screenshot uploaded: {screenshot.filename}]"
                 state["awaiting_user"] = False
-                
-                print(f"[UPLOAD] Invoking graph with state: payment_status={state.get('payment_status')}, stage={state.get('stage')}, awaiting_user={state.get('awaiting_user')}")
+                state["turn_deadline"] = time.time() + TURN_LATENCY_BUDGET_SECONDS
                 
                 # Invoke graph to process and complete
                 if graph_app is not None:
-                    config = {"recursion_limit": 25}
-                    updated_state = graph_app.invoke(state, config)
+                    updated_state = await run_graph(graph_app, state)
                     
-                    print(f"[UPLOAD] Graph returned. Updated state: is_complete={updated_state.get('is_complete')}, stage={updated_state.get('stage')}, messages_count={len(updated_state.get('messages', []))}")
+                    log.debug("Graph returned. Updated state: is_complete=%s, stage=%s, messages_count=%d",
+                              updated_state.get("is_complete"), updated_state.get("stage"), len(updated_state.get("messages", [])))
                     
                     # Validate state
                     if updated_state:
                         state = updated_state
                         update_session(session_id, state)
-                        print(f"[UPLOAD] Session updated with final state")
+                        log.debug("Session updated with final state")
                 else:
-                    print(f"[UPLOAD] ERROR: graph_app is None!")
+                    log.error("graph_app is None!")
             except Exception as e:
-                import traceback
-                print(f"[ERROR] Error processing screenshot upload in graph: {e}")
-                traceback.print_exc()
+                log.exception("Error processing screenshot upload in graph: %s", e)
                 # Continue with manual state update if graph fails
                 update_session(session_id, state)
         else:
-            print(f"[UPLOAD] Not triggering graph - payment_status={state.get('payment_status')}, stage={state.get('stage')}")
+            log.debug("Not triggering graph - payment_status=%s, stage=%s", state.get("payment_status"), state.get("stage"))
             # Update session normally
             update_session(session_id, state)
         
@@ -506,7 +569,7 @@ async def upload_screenshot(
             "loan_id": state.get("loan_id")
         }
     except Exception as e:
-        print(f"[ERROR] Screenshot upload error: {e}")
+        log.exception("Screenshot upload error: %s", e)
         raise HTTPException(
             status_code=500,
             detail="Failed to upload screenshot. Please try again."
@@ -550,7 +613,7 @@ async def submit_feedback(request: FeedbackRequest):
     
     # In production, save to database
     # For now, just log it
-    print(f"[FEEDBACK] Received feedback: {feedback_data}")
+    log.info("Received feedback", extra={"fields": feedback_data})
     
     # TODO: Save to database or external service
     # Example:
@@ -9,6 +9,7 @@ In production, use Redis or a database.
 from typing import Optional
 import uuid
 from src.state import CallState, create_initial_state
+from src.utils.plan_prefetch import discard_prefetched_plans
 
 
 # In-memory session store (key: session_id, value: CallState)
@@ -27,6 +28,7 @@ def create_session(phone: str) -> tuple[str, Optional[CallState]]:
     state = create_initial_state(phone)
     if not state:
         return session_id, None
+    state["session_id"] = session_id
     
     _sessions[session_id] = state
     return session_id, state
@@ -46,6 +48,7 @@ def delete_session(session_id: str) -> None:
     """Delete a session."""
     if session_id in _sessions:
         del _sessions[session_id]
+    discard_prefetched_plans(session_id)
 
 
 def session_exists(session_id: str) -> bool:
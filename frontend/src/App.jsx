@@ -6,7 +6,7 @@ import ConversationCompletion from "./components/conversationcompletion";
 import FeedbackModal from "./components/feedbackmodal";
 import FloatingPayButton from "./components/floatingpaybutton";
 import ErrorBoundary from "./components/errorboundary";
-import { startChat, sendChatMessage, submitFeedback } from "./api/chatapi";
+import { startChat, streamChatMessage, submitFeedback } from "./api/chatapi";
 import predixionLogo from "./assets/predixion-logo.png";
 
 import "./styles/design-system.css";
@@ -94,7 +94,7 @@ function App() {
     handleSend("Mujhe payment options dikhayein");
   }
 
-  // Send user message and get agent response
+  // Send user message and stream the agent response into the chat
   async function handleSend(input) {
     // Validate state before sending
     if (!callState?.awaiting_user || callState?.is_complete) {
@@ -120,11 +120,39 @@ function App() {
     
     try {
       const startTime = Date.now();
-      const data = await sendChatMessage(sessionId, input.trim());
+      let streamed = false;
+      // Show the reply in a pending assistant bubble as its tokens arrive
+      const data = await streamChatMessage(sessionId, input.trim(), (token) => {
+        if (!streamed) {
+          streamed = true;
+          setIsTyping(false);
+        }
+        setCallState(prevState => {
+          const messages = [...(prevState?.messages || [])];
+          const last = messages[messages.length - 1];
+          if (last?.pending) {
+            messages[messages.length - 1] = { ...last, content: last.content + token };
+          } else {
+            messages.push(
+              { role: "user", content: input.trim() },
+              { role: "assistant", content: token, pending: true, streamed: true }
+            );
+          }
+          return { ...prevState, messages };
+        });
+      });
       const elapsedTime = Date.now() - startTime;
+
+      // The final state replaces the pending bubble; its reply was already shown, so don't type it out again
+      if (streamed && Array.isArray(data.messages)) {
+        const lastAssistant = data.messages.findLastIndex(m => m.role === "assistant");
+        if (lastAssistant >= 0) {
+          data.messages[lastAssistant] = { ...data.messages[lastAssistant], streamed: true };
+        }
+      }
       
-      // Add delay if response was too fast
-      if (elapsedTime < minDelay) {
+      // Add delay if a reply that was not streamed came back too fast
+      if (!streamed && elapsedTime < minDelay) {
         await new Promise(resolve => setTimeout(resolve, minDelay - elapsedTime));
       }
       
@@ -64,6 +64,63 @@ export async function sendChatMessage(sessionId, userInput) {
   }
 }
 
+/**
+ * Send user message and stream the agent's reply (Server-Sent Events)
+ * @param {string} sessionId - Current chat session ID
+ * @param {string} userInput - User's message
+ * @param {function(string): void} onToken - Called with each token of the reply as it arrives
+ * @returns {Promise<Object>} Updated conversation state (same shape as sendChatMessage)
+ */
+export async function streamChatMessage(sessionId, userInput, onToken) {
+  if (!sessionId) throw new Error("Session ID is required");
+  if (!userInput) throw new Error("User input cannot be empty");
+
+  try {
+    const res = await fetch(`${BASE_URL}/chat/stream`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ session_id: sessionId, user_input: userInput })
+    });
+
+    if (!res.ok) {
+      const text = await res.text();
+      throw new Error(`Failed to send message: ${text}`);
+    }
+
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      // Events are separated by a blank line
+      let boundary;
+      while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+        const block = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+
+        const event = block.match(/^event: (.*)$/m)?.[1];
+        const data = JSON.parse(block.match(/^data: (.*)$/m)?.[1] || "{}");
+
+        if (event === "token" && onToken) onToken(data.text);
+        if (event === "done") return data;
+        if (event === "error") throw new Error(data.detail);
+      }
+    }
+
+    throw new Error("Stream ended before the final state was received");
+  } catch (error) {
+    // Handle network errors
+    if (error.message.includes("Failed to fetch") || error.message.includes("NetworkError")) {
+      throw new Error("Cannot connect to server. Please make sure the backend server is running on http://localhost:8000");
+    }
+    throw error;
+  }
+}
+
 /**
  * Submit feedback after conversation completion
  * @param {string} sessionId - Current chat session ID
@@ -98,9 +98,9 @@ function ChatWindow({
                 hour12: true 
               });
               
-              // Show typing animation for new assistant messages
+              // Show typing animation for new assistant messages (streamed replies appear as they arrive)
               const isAssistantMessage = m.role === "assistant";
-              const shouldShowTyping = isAssistantMessage && i > fullyTypedMessageIndex;
+              const shouldShowTyping = isAssistantMessage && !m.streamed && i > fullyTypedMessageIndex;
               
               return (
                 <MessageBubble 
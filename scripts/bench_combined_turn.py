@@ -0,0 +1,124 @@
+# scripts/bench_combined_turn.py
+
+"""
+Benchmark of the combined turn mode (LLM_COMBINED_TURN).
+
+Runs the two LLM-bound kinds of customer turn through the graph nodes,
+with every LLM call answered by the local provider after a round trip of
+--round-trip-ms plus --ms-per-token for each completion token (the
+generation time a single round trip cannot hide):
+
+- the "willing" turn after the disclosure: payment_check classifies and
+  negotiation presents the plans, with PLAN_SOURCE=llm and no prefetch
+  (classify + plans calls, or one turn call);
+- a reply turn in negotiation (one negotiate call, or one turn call).
+
+The intent shortcuts (cache, rules, local model) are bypassed so that every
+willing turn needs the LLM, and the plan cache is off. Reports LLM calls,
+prompt/completion tokens and latency per turn, for separate calls and for
+the combined mode.
+
+Usage:
+    python scripts/bench_combined_turn.py
+    python scripts/bench_combined_turn.py --round-trip-ms 600 --ms-per-token 15 --turns 20
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import src.nodes.negotiation as negotiation
+import src.nodes.payment_check as payment_check
+import src.utils.llm as llm
+from src.state import create_initial_state
+from src.utils.llm_provider import LocalLLMProvider
+from src.utils.prompt_budget import approximate_tokens
+
+
+class TimedProvider(LocalLLMProvider):
+    """Local answers (the customer is always willing) after a round trip plus generation time."""
+
+    def __init__(self, round_trip_ms: float, ms_per_token: float):
+        super().__init__(f"fixed:{round_trip_ms}")
+        self.per_token = ms_per_token / 1000
+        self.calls = []  # (kind, prompt tokens, completion tokens)
+
+    def answer(self, kind: str, prompt: str) -> str:
+        if kind == "classify":
+            return "willing"
+        text = super().answer(kind, prompt)
+        if kind == "turn":
+            text = json.dumps({**json.loads(text), "intent": "willing"}, ensure_ascii=False)
+        return text
+
+    def _plan_call(self, kind: str, request: dict) -> tuple:
+        text, prompt_tokens, latency, timed_out = super()._plan_call(kind, request)
+        completion_tokens = approximate_tokens(text)
+        self.calls.append((kind, prompt_tokens, completion_tokens))
+        return text, prompt_tokens, latency + completion_tokens * self.per_token, timed_out
+
+
+def _say(state: dict, text: str) -> None:
+    state["messages"].append({"role": "user", "content": text})
+    state["last_user_input"] = text
+
+
+def run(provider: TimedProvider, turns: int) -> dict:
+    """Per turn kind: [(seconds, calls, prompt tokens, completion tokens)]."""
+    results = {"willing": [], "reply": []}
+
+    def measure(kind: str, step) -> None:
+        provider.calls.clear()
+        start = time.perf_counter()
+        step()
+        results[kind].append((time.perf_counter() - start, len(provider.calls),
+                              sum(c[1] for c in provider.calls), sum(c[2] for c in provider.calls)))
+
+    for i in range(turns):
+        state = create_initial_state("+919876543210")
+        state.update(is_verified=True, stage="disclosure", messages=[
+            {"role": "assistant", "content": "Main aapke outstanding payment ke baare mein call kar raha hoon - "
+                                             "₹45,000. Kya aap aaj yeh payment kar sakte hain?"}])
+        _say(state, f"Haan ho jayega, bas thoda time chahiye ({i})")
+
+        def willing_turn():
+            state.update(payment_check.payment_check_node(state))
+            state.update(negotiation.negotiation_node(state))
+
+        measure("willing", willing_turn)
+        _say(state, f"Theek hai, main soch ke batata hoon ({i})")
+        measure("reply", lambda: state.update(negotiation.negotiation_node(state)))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark separate vs combined LLM calls per customer turn")
+    parser.add_argument("--round-trip-ms", type=float, default=400, help="Latency of a call before its first token")
+    parser.add_argument("--ms-per-token", type=float, default=12, help="Generation time per completion token")
+    parser.add_argument("--turns", type=int, default=10, help="Conversations (one turn of each kind) per mode")
+    args = parser.parse_args()
+
+    provider = TimedProvider(args.round_trip_ms, args.ms_per_token)
+    llm._provider = provider
+    llm._shortcut_intent = lambda prompt, cache_key: None
+    llm.PLAN_CACHE_ENABLED = False
+    negotiation.PLAN_SOURCE = payment_check.PLAN_SOURCE = "llm"
+
+    print(f"Round trip {args.round_trip_ms:g} ms + {args.ms_per_token:g} ms per completion token, "
+          f"{args.turns} turns of each kind")
+    for mode, combined in (("separate calls", False), ("combined", True)):
+        negotiation.LLM_COMBINED_TURN = payment_check.LLM_COMBINED_TURN = combined
+        for kind, samples in run(provider, args.turns).items():
+            seconds, calls, prompt, completion = (statistics.mean(column) for column in zip(*samples))
+            print(f"{mode:<15} {kind:<8} calls={calls:.1f}  tokens={prompt:.0f}+{completion:.0f}  "
+                  f"mean={seconds * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
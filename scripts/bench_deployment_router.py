@@ -0,0 +1,138 @@
+# scripts/bench_deployment_router.py
+
+"""
+Benchmark of multi-deployment routing (AZURE_OPENAI_DEPLOYMENTS).
+
+Starts three scripts/mock_azure_openai.py servers standing in for
+deployments in different regions, with equal weights:
+
+- fast: --fast-latency;
+- slow: --slow-latency;
+- flaky: as fast as "fast", but --flaky-error-rate of its answers are 500s.
+
+Sends --calls classification calls, --concurrency at a time, through
+llm._create_chat_completion() (retry policy, breaker, metrics) with two
+routing strategies:
+
+- weighted-random: each call goes to a deployment drawn by weight, with no
+  regard for its health; errors are left to the retry policy;
+- router: the DeploymentRouter (EWMA latency and error score, failover).
+
+Reports p50/p99 latency, calls that still failed, and each deployment's
+share of the attempts.
+
+Usage:
+    python scripts/bench_deployment_router.py
+    python scripts/bench_deployment_router.py --calls 2000 --concurrency 32 --flaky-error-rate 0.5
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+os.environ.setdefault("AZURE_OPENAI_API_KEY", "mock")
+
+import src.utils.llm as llm
+from scripts.bench_http_transport import _percentile, start_mock
+from src.utils.circuit_breaker import CircuitBreaker
+from src.utils.deployment_router import Deployment, DeploymentRouter
+
+
+class WeightedRandomProvider(llm.AzureOpenAIProvider):
+    """Health-blind baseline: a deployment drawn by weight for every attempt."""
+
+    def create(self, client, kind: str, **request):
+        deployments = self.router.deployments
+        deployment = random.choices(deployments, weights=[d.weight for d in deployments])[0]
+        self.attempts[deployment.name] += 1
+        return llm.get_deployment_client(deployment).chat.completions.create(
+            **llm._routed_request(request, deployment, request.get("timeout")))
+
+
+class CountingRouter(DeploymentRouter):
+    def _start(self, deployment):
+        self.attempts[deployment.name] += 1
+        return super()._start(deployment)
+
+
+def run(provider, calls: int, concurrency: int) -> tuple:
+    """(latencies of successful calls, failed calls)."""
+    llm._provider = provider
+    llm._azure_breaker = CircuitBreaker("bench", **llm._breaker_settings)
+
+    def call(i: int):
+        start = time.perf_counter()
+        try:
+            llm._create_chat_completion(
+                provider.get_client(), "classify", deadline=time.time() + 10, model=provider.model,
+                messages=[{"role": "user", "content": f'Classify this customer response.\n\nResponse: "Kal pay karunga {i}"'}],
+                max_tokens=10,
+            )
+        except Exception:
+            return None
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(call, range(calls)))
+    return [r for r in results if r is not None], sum(r is None for r in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark latency/error-aware deployment routing")
+    parser.add_argument("--port", type=int, default=8095, help="First of three consecutive ports")
+    parser.add_argument("--fast-latency", default="lognormal:80,0.3")
+    parser.add_argument("--slow-latency", default="lognormal:400,0.3")
+    parser.add_argument("--flaky-error-rate", type=float, default=0.3)
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    mocks = {
+        "fast": (args.fast_latency,),
+        "slow": (args.slow_latency,),
+        "flaky": (args.fast_latency, "--error-rate", str(args.flaky_error_rate)),
+    }
+    processes = []
+    try:
+        deployments = {}
+        for i, (name, (latency, *options)) in enumerate(mocks.items()):
+            processes.append(start_mock(args.port + i, latency, 0, *options))
+            deployments[name] = f"http://127.0.0.1:{args.port + i}"
+
+        def make(name, endpoint):
+            return Deployment(name, endpoint, llm.AZURE_OPENAI_DEPLOYMENT, api_key="mock",
+                              api_version=llm.AZURE_OPENAI_API_VERSION,
+                              breaker=CircuitBreaker(f"bench:{name}", **llm._breaker_settings))
+
+        print(f"{args.calls} calls, {args.concurrency} concurrent; fast {args.fast_latency}, "
+              f"slow {args.slow_latency}, flaky {args.fast_latency} with {args.flaky_error_rate:.0%} 500s")
+        for strategy in ("weighted-random", "router"):
+            router = CountingRouter([make(name, endpoint) for name, endpoint in deployments.items()],
+                                    alpha=llm.LLM_ROUTER_EWMA_ALPHA, error_penalty=llm.LLM_ROUTER_ERROR_PENALTY,
+                                    decay_seconds=llm.LLM_ROUTER_DECAY_SECONDS,
+                                    min_call_seconds=llm.LLM_MIN_CALL_SECONDS)
+            provider = (WeightedRandomProvider if strategy == "weighted-random" else llm.AzureOpenAIProvider)(router)
+            provider.attempts = router.attempts = Counter()
+            run(provider, args.concurrency, args.concurrency)  # first connections, not measured
+            provider.attempts.clear()
+
+            latencies, failed = run(provider, args.calls, args.concurrency)
+            total = sum(provider.attempts.values())
+            shares = "  ".join(f"{name}={provider.attempts[name] / total:.0%}" for name in deployments)
+            print(f"{strategy:<16} p50={_percentile(latencies, 50) * 1000:7.1f} ms  "
+                  f"p99={_percentile(latencies, 99) * 1000:7.1f} ms  failed={failed:<4} attempts: {shares}")
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
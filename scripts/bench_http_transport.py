@@ -0,0 +1,142 @@
+# scripts/bench_http_transport.py
+
+"""
+Benchmark of the Azure OpenAI client's HTTP transport.
+
+Starts scripts/mock_azure_openai.py in a subprocess and sends waves of
+concurrent classification calls through two sync clients:
+
+- default: AzureOpenAI with openai's own HTTP client (httpx defaults:
+  idle connections dropped after 5 s, at most 100 kept);
+- shared: the client from llm.get_azure_openai_client(), on the shared
+  transport configured by AZURE_OPENAI_MAX_CONNECTIONS,
+  AZURE_OPENAI_MAX_KEEPALIVE, AZURE_OPENAI_KEEPALIVE_EXPIRY and
+  AZURE_OPENAI_HTTP2.
+
+Waves are separated by --idle seconds, like the pauses between customer
+turns, and run both clients in turn. Reports the connections
+each client opened (counted by the mock server) and p50/p99 call latency.
+The mock speaks plain HTTP, so it charges --connection-setup-ms on the
+first response of each new connection for the TCP + TLS handshakes a
+remote Azure region would cost.
+
+Usage:
+    python scripts/bench_http_transport.py
+    python scripts/bench_http_transport.py --concurrency 64 --waves 10 --idle 8
+    AZURE_OPENAI_KEEPALIVE_EXPIRY=5 python scripts/bench_http_transport.py
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import httpx
+
+
+def _percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _connections(base_url: str) -> int:
+    return httpx.get(f"{base_url}/stats").json()["connections"]
+
+
+def start_mock(port: int, latency: str, connection_setup_ms: float, *options: str) -> subprocess.Popen:
+    """Start the mock server (extra command-line `options` are passed on) and wait until it answers."""
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(project_root, "scripts", "mock_azure_openai.py"),
+         "--port", str(port), "--latency", latency, "--connection-setup-ms", str(connection_setup_ms), *options],
+    )
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/stats")
+            return process
+        except httpx.TransportError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("Mock Azure OpenAI server did not start")
+
+
+def run_wave(pool: ThreadPoolExecutor, client, model: str, concurrency: int) -> list:
+    """Latency (seconds) of each of `concurrency` simultaneous calls."""
+    def call(i: int) -> float:
+        start = time.perf_counter()
+        client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": f'Classify this customer response.\n\nResponse: "Kal pay karunga {i}"'}],
+            max_tokens=10,
+        )
+        return time.perf_counter() - start
+
+    return list(pool.map(call, range(concurrency)))
+
+
+def report(name: str, latencies: list, connections: int) -> None:
+    p50, p99 = _percentile(latencies, 50) * 1000, _percentile(latencies, 99) * 1000
+    print(f"{name:<8} calls={len(latencies):<5} connections={connections:<5} "
+          f"p50={p50:7.1f} ms  p99={p99:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the shared Azure OpenAI HTTP transport")
+    parser.add_argument("--port", type=int, default=8091)
+    parser.add_argument("--latency", default="fixed:50", help="Mock response latency (see mock_azure_openai.py)")
+    parser.add_argument("--connection-setup-ms", type=float, default=40,
+                        help="Handshake cost the mock charges per new connection (TCP + TLS to Azure)")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent calls per wave")
+    parser.add_argument("--waves", type=int, default=6)
+    parser.add_argument("--idle", type=float, default=12.0, help="Seconds between a client's waves")
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    os.environ["AZURE_OPENAI_ENDPOINT"] = base_url
+    os.environ.setdefault("AZURE_OPENAI_API_KEY", "mock")
+
+    from openai import AzureOpenAI
+    import src.utils.llm as llm
+
+    process = start_mock(args.port, args.latency, args.connection_setup_ms)
+    pool = ThreadPoolExecutor(max_workers=args.concurrency)
+    try:
+        clients = {
+            "default": AzureOpenAI(api_key="mock", api_version=llm.AZURE_OPENAI_API_VERSION,
+                                   azure_endpoint=base_url, max_retries=0),
+            "shared": llm.get_azure_openai_client(),
+        }
+        print(f"{args.waves} waves x {args.concurrency} calls, {args.idle:g}s apart per client, mock latency {args.latency} "
+              f"+ {args.connection_setup_ms:g} ms per new connection; "
+              f"shared transport: keep-alive {llm.AZURE_OPENAI_KEEPALIVE_EXPIRY:g}s, "
+              f"{llm.AZURE_OPENAI_MAX_KEEPALIVE} idle connections")
+        for client in clients.values():
+            run_wave(pool, client, llm.AZURE_OPENAI_DEPLOYMENT, 1)  # import/first-call costs, not measured
+
+        # Each wave runs both clients, taking turns going first, so both see the same machine load
+        results = {name: ([], 0) for name in clients}
+        for wave in range(args.waves):
+            order = list(clients.items())
+            for name, client in (order[::-1] if wave % 2 else order):
+                time.sleep(args.idle / 2)  # also lets the mock settle after the other client's wave
+                before = _connections(base_url)
+                latencies = run_wave(pool, client, llm.AZURE_OPENAI_DEPLOYMENT, args.concurrency)
+                results[name] = (results[name][0] + latencies, results[name][1] + _connections(base_url) - before)
+        for name, result in results.items():
+            report(name, *result)
+
+        (default_lat, default_conn), (shared_lat, shared_conn) = results["default"], results["shared"]
+        print(f"Shared transport: {default_conn - shared_conn} fewer connections opened, "
+              f"p99 {_percentile(default_lat, 99) * 1000:.1f} -> {_percentile(shared_lat, 99) * 1000:.1f} ms")
+    finally:
+        pool.shutdown()
+        process.terminate()
+        process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# scripts/bench_intent_rules.py
+
+"""
+Microbenchmark for the compiled rule-based intent classifier.
+
+Reports per-utterance classification cost over the 180-case Hinglish suite,
+plus accuracy and how many utterances are confident enough to skip the LLM.
+
+Usage:
+    python scripts/bench_intent_rules.py
+    python scripts/bench_intent_rules.py --repeat 200
+"""
+
+import argparse
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.utils.intent_rules import classify_with_confidence
+from src.utils.llm import RULE_CONFIDENCE_THRESHOLD
+from tests.test_cases_comprehensive import TEST_CASES
+from tests.run_comprehensive_tests import WORKFLOW_STATUS_MAP
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the rule-based intent classifier")
+    parser.add_argument("--repeat", type=int, default=100, help="Passes over the test suite")
+    args = parser.parse_args()
+
+    cases = [(text, WORKFLOW_STATUS_MAP[workflow]) for workflow, texts in TEST_CASES.items() for text in texts]
+
+    correct = 0
+    confident = 0
+    for text, expected in cases:
+        intent, confidence = classify_with_confidence(text)
+        correct += intent == expected
+        confident += confidence >= RULE_CONFIDENCE_THRESHOLD
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for text, _expected in cases:
+            classify_with_confidence(text)
+    elapsed = time.perf_counter() - start
+    per_utterance_us = elapsed / (args.repeat * len(cases)) * 1e6
+
+    print(f"Utterances:            {len(cases)}")
+    print(f"Accuracy:              {correct}/{len(cases)} ({correct / len(cases):.1%})")
+    print(f"Confident (>= {RULE_CONFIDENCE_THRESHOLD}):  {confident}/{len(cases)} (skip the LLM)")
+    print(f"Cost per utterance:    {per_utterance_us:.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# scripts/bench_logging.py
+
+"""
+Benchmark of /api/chat throughput with per-turn debug logging on and off.
+
+Runs the in-process load test (scripts/load_test_chat.py, local LLM
+provider) once per logging setup:
+
+- info: LOG_LEVEL=INFO, the default; per-turn tracing is disabled;
+- debug: LOG_LEVEL=DEBUG through the queue handler (writes happen on the
+  listener thread);
+- debug-inline: LOG_LEVEL=DEBUG written by the thread serving the turn,
+  like the print() tracing it replaced;
+- debug-sampled: LOG_LEVEL=DEBUG keeping --sample-rate of the debug records.
+
+Log output goes to --log-file (a temp file by default), so terminal speed
+does not skew the numbers.
+
+Usage:
+    python scripts/bench_logging.py
+    python scripts/bench_logging.py --levels 8 32 --llm-latency 0.05 --log-file /tmp/agent.log
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from scripts.load_test_chat import main_async
+from src.utils.log import configure_logging
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /api/chat throughput with debug logging on and off")
+    parser.add_argument("--levels", type=int, nargs="+", default=[16, 64], help="Concurrent session counts")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Simulated LLM latency in seconds")
+    parser.add_argument("--sample-rate", type=float, default=0.1, help="Debug sample rate of debug-sampled")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per setup (the best is reported)")
+    parser.add_argument("--log-file", help="Where log records go (default: a temp file)")
+    args = parser.parse_args()
+
+    log_file = args.log_file or os.path.join(tempfile.mkdtemp(), "agent.log")
+    setups = {
+        "info": {"level": "INFO", "use_queue": True},
+        "debug": {"level": "DEBUG", "use_queue": True},
+        "debug-inline": {"level": "DEBUG", "use_queue": False},
+        "debug-sampled": {"level": "DEBUG", "use_queue": True, "sample_rate": args.sample_rate},
+    }
+
+    async def run_setups(stream) -> dict:
+        # One event loop for every run: the graph runner's semaphore is bound to it
+        await main_async([min(args.levels)], "executor", args.llm_latency)  # warm up imports and caches
+        results = {}
+        for name, options in setups.items():
+            configure_logging(stream=stream, **options)
+            runs = [await main_async(args.levels, "executor", args.llm_latency) for _ in range(args.repeat)]
+            results[name] = [max(run[i]["throughput"] for run in runs) for i in range(len(args.levels))]
+        return results
+
+    with open(log_file, "a", encoding="utf-8") as stream:
+        try:
+            results = asyncio.run(run_setups(stream))
+        finally:
+            configure_logging()
+
+    print(f"\nLLM latency {args.llm_latency * 1000:.0f} ms, logs in {log_file} "
+          f"({os.path.getsize(log_file) / 1e6:.1f} MB)")
+    print(f"{'setup':<15}" + "".join(f"{f'{level} sessions':>14}" for level in args.levels) + "  (turns/sec)")
+    for name, throughputs in results.items():
+        print(f"{name:<15}" + "".join(f"{t:>14.1f}" for t in throughputs))
+
+
+if __name__ == "__main__":
+    main()
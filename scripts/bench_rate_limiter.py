@@ -0,0 +1,110 @@
+# scripts/bench_rate_limiter.py
+
+"""
+Benchmark of the client-side rate limiter (AZURE_OPENAI_RPM_LIMIT /
+AZURE_OPENAI_TPM_LIMIT) against a deployment quota.
+
+Starts scripts/mock_azure_openai.py with an RPM quota (--quota-rpm,
+enforced per --quota-window seconds, answered with 429 + retry-after-ms)
+and sends bursts of --burst concurrent classification calls every
+--interval seconds through llm._create_chat_completion() (retry policy,
+breaker, turn deadline of --deadline seconds). On average the traffic fits
+the quota; the bursts do not. Two setups:
+
+- no limiter: bursts go straight out, the excess gets 429s and is retried
+  after retry-after-ms or falls back;
+- limiter: the limiter is set to --limit-ratio of the quota, so bursts
+  queue client-side for at most LLM_RATE_LIMIT_MAX_WAIT seconds.
+
+Reports the 429s the mock sent, calls that fell back, p50/p99 latency and
+the limiter's mean queue wait.
+
+Usage:
+    python scripts/bench_rate_limiter.py
+    python scripts/bench_rate_limiter.py --quota-rpm 1200 --burst 30 --interval 2
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import httpx
+
+from scripts.bench_http_transport import _percentile, start_mock
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the client-side rate limiter against a quota")
+    parser.add_argument("--port", type=int, default=8092)
+    parser.add_argument("--latency", default="lognormal:150,0.3", help="Mock response latency")
+    parser.add_argument("--quota-rpm", type=float, default=600)
+    parser.add_argument("--quota-window", type=float, default=1.0)
+    parser.add_argument("--limit-ratio", type=float, default=0.9, help="Limiter RPM as a share of the quota")
+    parser.add_argument("--burst", type=int, default=16, help="Concurrent calls per burst")
+    parser.add_argument("--interval", type=float, default=2.0, help="Seconds between bursts")
+    parser.add_argument("--bursts", type=int, default=15)
+    parser.add_argument("--deadline", type=float, default=4.0, help="Turn deadline of each call (seconds)")
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    os.environ["AZURE_OPENAI_ENDPOINT"] = base_url
+    os.environ.setdefault("AZURE_OPENAI_API_KEY", "mock")
+
+    import src.utils.llm as llm
+    from src.utils.circuit_breaker import CircuitBreaker
+    from src.utils.rate_limiter import RateLimiter, _rate_limit_wait
+
+    process = start_mock(args.port, args.latency, 0,
+                         "--rpm", str(args.quota_rpm), "--quota-window", str(args.quota_window))
+    pool = ThreadPoolExecutor(max_workers=args.burst)
+
+    def call(i: int):
+        start = time.perf_counter()
+        try:
+            llm._create_chat_completion(
+                llm._provider.get_client(), "classify", deadline=time.time() + args.deadline,
+                model=llm._provider.model,
+                messages=[{"role": "user", "content": f'Classify this customer response.\n\nResponse: "Kal pay karunga {i}"'}],
+                max_tokens=10,
+            )
+        except Exception:
+            return None
+        return time.perf_counter() - start
+
+    try:
+        print(f"Quota {args.quota_rpm:g} RPM per {args.quota_window:g}s window; {args.bursts} bursts of "
+              f"{args.burst} calls every {args.interval:g}s ({args.burst / args.interval * 60:.0f} RPM on average)")
+        limit = args.quota_rpm * args.limit_ratio
+        for name, limiter in (("no limiter", None), (f"limiter {limit:g} RPM",
+                                                         RateLimiter("bench", rpm=limit,
+                                                                     burst_seconds=llm.LLM_RATE_LIMIT_BURST_SECONDS))):
+            llm._provider = llm.AzureOpenAIProvider(limiter=limiter)
+            llm._azure_breaker = CircuitBreaker("bench", **llm._breaker_settings)
+            time.sleep(args.quota_window)  # an empty quota window between setups
+            throttled = httpx.get(f"{base_url}/stats").json()["responses"].get("429", 0)
+
+            results = []
+            for burst in range(args.bursts):
+                started = time.perf_counter()
+                results += pool.map(call, range(burst * args.burst, (burst + 1) * args.burst))
+                time.sleep(max(args.interval - (time.perf_counter() - started), 0))
+
+            throttled = httpx.get(f"{base_url}/stats").json()["responses"].get("429", 0) - throttled
+            latencies = [r for r in results if r is not None]
+            waits = _rate_limit_wait.snapshot().get("bench", {"count": 0, "sum": 0.0})
+            print(f"{name:<20} 429s={throttled:<5} fell back={len(results) - len(latencies):<4} "
+                  f"p50={_percentile(latencies, 50) * 1000:7.1f} ms  p99={_percentile(latencies, 99) * 1000:7.1f} ms"
+                  + (f"  mean queue wait={waits['sum'] / max(waits['count'], 1) * 1000:.0f} ms" if limiter else ""))
+    finally:
+        pool.shutdown()
+        process.terminate()
+        process.wait()
+
+
+if __name__ == "__main__":
+    main()
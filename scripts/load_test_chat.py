@@ -0,0 +1,157 @@
+# scripts/load_test_chat.py
+
+"""
+Load test for the /api/init and /api/chat routes.
+
+Runs the FastAPI app in-process (httpx ASGI transport) and drives N
+concurrent sessions through greeting -> disclosure -> negotiation. The
+negotiation turn generates payment plans, which is where Azure OpenAI
+latency lands; every LLM call is answered by the local provider
+(src/utils/llm_provider.py) after --llm-latency seconds, blocking exactly
+like the synchronous SDK would. With --llm-provider azure the real Azure
+OpenAI clients are used instead, e.g. against scripts/mock_azure_openai.py
+(AZURE_OPENAI_ENDPOINT pointing at it), so HTTP costs are included.
+
+Throughput (turns/sec) is reported per concurrency level. With the graph
+running off the event loop it grows with concurrency; with --mode inline
+(the old behaviour of calling graph.invoke inside the route) it stays flat.
+
+Usage:
+    python scripts/load_test_chat.py
+    python scripts/load_test_chat.py --levels 1 8 32 --llm-latency 0.3
+    python scripts/load_test_chat.py --mode inline
+    python scripts/load_test_chat.py --think-time 1.0   # customer reading/typing between turns
+    python scripts/load_test_chat.py --llm-provider azure  # real clients (mock server or Azure)
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import httpx
+
+import src.nodes.disclosure as disclosure
+import src.nodes.negotiation as negotiation
+import src.utils.llm as llm
+from src.utils.llm_provider import LocalLLMProvider
+import backend.graph_runner as graph_runner
+import backend.routes.chat as chat_routes
+from backend.app import app
+
+
+PHONES = ["+919876543210", "+919876543211", "+919876543212"]
+USER_TURNS = ["Yes", "Main installments mein pay kar sakta hoon"]
+
+# Latency of each /api/chat request in the current level
+_turn_latencies = []
+
+
+def install_llm(provider: str, latency: float) -> None:
+    """
+    With the local provider, answer every LLM call after a fixed latency.
+    Either way plans are generated by the LLM (not the plan engine), so
+    the negotiation turn makes a call.
+    """
+    if provider == "local":
+        llm._provider = LocalLLMProvider(f"fixed:{latency * 1000:g}")
+    disclosure.PLAN_SOURCE = negotiation.PLAN_SOURCE = "llm"
+
+
+def install_mode(mode: str) -> None:
+    """Select how the routes execute the graph."""
+    if mode == "inline":
+        async def run_inline(graph, state, config=None):
+            return graph.invoke(state, config or graph_runner.DEFAULT_GRAPH_CONFIG)
+        chat_routes.run_graph = run_inline
+    else:
+        graph_runner.GRAPH_EXECUTION_MODE = mode
+
+
+async def run_session(client: httpx.AsyncClient, phone: str, think_time: float = 0.0) -> int:
+    """Drive one session through the conversation. Returns number of turns served."""
+    response = await client.post("/api/init", json={"phone": phone})
+    response.raise_for_status()
+    session_id = response.json()["session_id"]
+    turns = 1
+
+    for user_input in USER_TURNS:
+        if think_time:
+            await asyncio.sleep(think_time)
+        start = time.perf_counter()
+        response = await client.post(
+            "/api/chat",
+            json={"session_id": session_id, "user_input": user_input},
+        )
+        response.raise_for_status()
+        _turn_latencies.append(time.perf_counter() - start)
+        turns += 1
+    return turns
+
+
+async def run_level(concurrency: int, think_time: float = 0.0) -> dict:
+    """Run `concurrency` sessions at once and measure throughput."""
+    _turn_latencies.clear()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=120) as client:
+        start = time.perf_counter()
+        results = await asyncio.gather(*[
+            run_session(client, PHONES[i % len(PHONES)], think_time) for i in range(concurrency)
+        ])
+        elapsed = time.perf_counter() - start
+
+    turns = sum(results)
+    return {
+        "concurrency": concurrency,
+        "turns": turns,
+        "elapsed": elapsed,
+        "throughput": turns / elapsed,
+        "avg_chat_latency": sum(_turn_latencies) / len(_turn_latencies),
+    }
+
+
+async def main_async(levels: list, mode: str, llm_latency: float, think_time: float = 0.0,
+                     llm_provider: str = "local") -> list:
+    install_llm(llm_provider, llm_latency)
+    install_mode(mode)
+
+    results = []
+    for level in levels:
+        results.append(await run_level(level, think_time))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the chat routes")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 16, 32],
+                        help="Concurrent session counts to test")
+    parser.add_argument("--mode", choices=["executor", "async", "inline"], default="executor",
+                        help="Graph execution mode ('inline' reproduces the blocking behaviour)")
+    parser.add_argument("--llm-latency", type=float, default=0.2,
+                        help="Simulated Azure OpenAI latency in seconds")
+    parser.add_argument("--llm-provider", choices=["local", "azure"], default="local",
+                        help="'azure' uses the real clients and AZURE_OPENAI_ENDPOINT (e.g. the mock server)")
+    parser.add_argument("--think-time", type=float, default=0.0,
+                        help="Seconds each simulated customer waits before replying")
+    args = parser.parse_args()
+
+    results = asyncio.run(
+        main_async(args.levels, args.mode, args.llm_latency, args.think_time, args.llm_provider)
+    )
+
+    if args.llm_provider == "local":
+        print(f"\nMode: {args.mode}, simulated LLM latency: {args.llm_latency * 1000:.0f} ms")
+    else:
+        print(f"\nMode: {args.mode}, LLM: Azure OpenAI client at {llm.AZURE_OPENAI_ENDPOINT}")
+    print(f"{'sessions':>10} {'turns':>8} {'elapsed (s)':>12} {'turns/sec':>10} {'chat ms':>8}")
+    for r in results:
+        print(f"{r['concurrency']:>10} {r['turns']:>8} {r['elapsed']:>12.2f} {r['throughput']:>10.1f} "
+              f"{r['avg_chat_latency'] * 1000:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
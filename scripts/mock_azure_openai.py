@@ -0,0 +1,271 @@
+# scripts/mock_azure_openai.py
+
+"""
+Mock Azure OpenAI server for load testing.
+
+Speaks the Azure chat-completions wire format
+(POST /openai/deployments/{deployment}/chat/completions), so the real
+AzureOpenAI / AsyncAzureOpenAI clients run unchanged against it: HTTP
+connection pooling, JSON serialisation, SSE parsing, 429 handling and
+retries are all exercised. Answers come from the local provider's canned
+replies (src/utils/llm_provider.py).
+
+- --latency samples each response's latency (fixed:MS | uniform:LOW,HIGH |
+  normal:MEAN,STD | lognormal:MEDIAN,SIGMA);
+- --error-rate answers that share of requests with a 500;
+- --throttle-rate answers that share with a 429 (with retry-after-ms);
+- --burst-every/--burst-seconds throttle every request for burst-seconds
+  out of each burst-every seconds, like a deployment over its quota;
+- --rpm/--tpm enforce a quota like Azure's: over each --quota-window
+  seconds at most that window's share of it, a request's tokens counted
+  as its estimated prompt plus max_tokens; requests over it get a 429
+  whose retry-after-ms says when the window has room again;
+- --connection-setup-ms adds to the first response on each new client
+  connection, standing in for the TCP + TLS handshakes with a remote
+  Azure region (the mock itself speaks plain HTTP);
+- "stream": true is answered as server-sent events, one word per chunk,
+  with a usage chunk when stream_options.include_usage is set.
+
+GET /stats reports the responses sent so far by status, and how many
+distinct client connections they were served on.
+
+Usage:
+    python scripts/mock_azure_openai.py --port 8090 --latency lognormal:300,0.4
+    python scripts/mock_azure_openai.py --error-rate 0.02 --burst-every 30 --burst-seconds 5
+
+    AZURE_OPENAI_ENDPOINT=http://127.0.0.1:8090 AZURE_OPENAI_API_KEY=mock \\
+        python scripts/load_test_chat.py --llm-provider azure
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from src.utils.llm_provider import LocalLLMProvider, parse_latency
+from src.utils.prompt_budget import approximate_tokens, count_message_tokens
+
+
+def guess_kind(prompt: str) -> str:
+    """Which of the app's prompts this is (classify/turn/plans/probe/negotiate)."""
+    if prompt.startswith("Classify this customer response"):
+        return "classify"
+    if "Return JSON analysing the customer's last message" in prompt:
+        return "turn"
+    if "payment plans" in prompt and "JSON" in prompt:
+        return "plans"
+    if prompt.strip() == "Say 'ok'":
+        return "probe"
+    return "negotiate"
+
+
+class MockAzureOpenAI:
+    """Latency, failure and throttling behaviour of the mock deployment."""
+
+    def __init__(self, latency: str = "fixed:0", token_delay: float = 0.0, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, burst_every: float = 0.0, burst_seconds: float = 0.0,
+                 retry_after_ms: int = 500, connection_setup: float = 0.0, rpm: float = 0, tpm: float = 0,
+                 quota_window: float = 1.0, seed: int = 0):
+        self.sample_latency = parse_latency(latency)
+        self.token_delay = token_delay
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.burst_every = burst_every
+        self.burst_seconds = burst_seconds
+        self.retry_after_ms = retry_after_ms
+        self.connection_setup = connection_setup
+        self.rpm = rpm
+        self.tpm = tpm
+        self.quota_window = quota_window
+        self._admitted = deque()  # (time, tokens) of requests inside the quota window
+        self.started = time.monotonic()
+        self.answers = LocalLLMProvider()
+        self.responses = Counter()
+        self.connections = set()  # (host, port) of every client connection seen
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def in_burst(self) -> bool:
+        if self.burst_every <= 0:
+            return False
+        return (time.monotonic() - self.started) % self.burst_every < self.burst_seconds
+
+    def over_quota(self, tokens: int):
+        """Milliseconds until a request of `tokens` fits the quota, or None if it is admitted now."""
+        if self.rpm <= 0 and self.tpm <= 0:
+            return None
+        now = time.monotonic()
+        share = self.quota_window / 60
+        with self._lock:
+            while self._admitted and self._admitted[0][0] <= now - self.quota_window:
+                self._admitted.popleft()
+            requests_over = self.rpm > 0 and len(self._admitted) + 1 > self.rpm * share
+            tokens_over = self.tpm > 0 and sum(t for _, t in self._admitted) + tokens > self.tpm * share
+            if not (requests_over or tokens_over):
+                self._admitted.append((now, tokens))
+                return None
+            oldest = self._admitted[0][0] if self._admitted else now
+        return max(int((oldest + self.quota_window - now) * 1000), 1)
+
+    def plan_response(self) -> tuple:
+        """(status, latency in seconds) for the next request."""
+        with self._lock:
+            throttled = self.in_burst() or self._rng.random() < self.throttle_rate
+            failed = self._rng.random() < self.error_rate
+            latency = self.sample_latency(self._rng)
+        if throttled:
+            return 429, 0.0
+        return (500 if failed else 200), latency
+
+    def count(self, status: int, client: tuple = None) -> bool:
+        """Record a response. Returns True if it is the first on its connection."""
+        with self._lock:
+            self.responses[status] += 1
+            new_connection = client is not None and client not in self.connections
+            if new_connection:
+                self.connections.add(client)
+            return new_connection
+
+
+def _error(status: int, code: str, message: str, headers: dict = None) -> JSONResponse:
+    return JSONResponse(status_code=status, content={"error": {"code": code, "message": message}}, headers=headers)
+
+
+def _usage(messages: list, text: str) -> dict:
+    prompt_tokens = count_message_tokens(messages)
+    completion_tokens = approximate_tokens(text)
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens}
+
+
+def create_app(mock: MockAzureOpenAI) -> FastAPI:
+    app = FastAPI(title="Mock Azure OpenAI")
+
+    @app.post("/openai/deployments/{deployment}/chat/completions")
+    async def chat_completions(deployment: str, request: Request):
+        body = await request.json()
+        messages = body.get("messages", [])
+        retry_after_ms = mock.over_quota(count_message_tokens(messages) + (body.get("max_tokens") or 0))
+        status, latency = (429, 0.0) if retry_after_ms is not None else mock.plan_response()
+        if mock.count(status, tuple(request.client) if request.client else None):
+            latency += mock.connection_setup
+
+        if status == 429:
+            retry_after_ms = retry_after_ms or mock.retry_after_ms
+            return _error(
+                429, "429",
+                f"Requests to the ChatCompletions_Create Operation have exceeded the rate limit. "
+                f"Please retry after {retry_after_ms} milliseconds.",
+                headers={"retry-after-ms": str(retry_after_ms),
+                         "retry-after": str(math.ceil(retry_after_ms / 1000))},
+            )
+
+        await asyncio.sleep(latency)
+        if status == 500:
+            return _error(500, "InternalServerError", "The server had an error while processing your request.")
+
+        prompt = "\n".join(str(m.get("content") or "") for m in messages)
+        text = mock.answers.answer(guess_kind(prompt), prompt)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+
+        if not body.get("stream"):
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": deployment,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": _usage(messages, text),
+            }
+
+        include_usage = (body.get("stream_options") or {}).get("include_usage")
+
+        def chunk(choices: list, usage: dict = None) -> str:
+            data = {"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                    "model": deployment, "choices": choices}
+            if usage is not None:
+                data["usage"] = usage
+            return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+        async def events():
+            yield chunk([])  # Azure sends the prompt filter results first
+            for i, word in enumerate(text.split(" ")):
+                if mock.token_delay:
+                    await asyncio.sleep(mock.token_delay)
+                delta = {"content": word if i == 0 else " " + word}
+                yield chunk([{"index": 0, "delta": delta, "finish_reason": None}])
+            yield chunk([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+            if include_usage:
+                yield chunk([], _usage(messages, text))
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/stats")
+    async def stats():
+        return {"responses": {str(status): n for status, n in sorted(mock.responses.items())},
+                "connections": len(mock.connections),
+                "in_burst": mock.in_burst()}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Azure OpenAI chat-completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", default="lognormal:250,0.4", help="Response latency distribution (ms)")
+    parser.add_argument("--token-delay-ms", type=float, default=10, help="Delay between streamed chunks")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with a 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered with a 429")
+    parser.add_argument("--burst-every", type=float, default=0.0, help="Seconds between 429 bursts (0 = none)")
+    parser.add_argument("--burst-seconds", type=float, default=0.0, help="Length of each 429 burst")
+    parser.add_argument("--retry-after-ms", type=int, default=500, help="retry-after-ms sent with 429s")
+    parser.add_argument("--rpm", type=float, default=0, help="Requests-per-minute quota (0 = none)")
+    parser.add_argument("--tpm", type=float, default=0, help="Tokens-per-minute quota (0 = none)")
+    parser.add_argument("--quota-window", type=float, default=1,
+                        help="Seconds over which the quota is enforced (Azure: 1 or 10)")
+    parser.add_argument("--connection-setup-ms", type=float, default=0.0,
+                        help="Extra latency of the first response on each new connection")
+    parser.add_argument("--keep-alive", type=float, default=240,
+                        help="Seconds an idle client connection is kept open (Azure: about 4 minutes)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    mock = MockAzureOpenAI(
+        latency=args.latency,
+        token_delay=args.token_delay_ms / 1000,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        burst_every=args.burst_every,
+        burst_seconds=args.burst_seconds,
+        retry_after_ms=args.retry_after_ms,
+        connection_setup=args.connection_setup_ms / 1000,
+        rpm=args.rpm,
+        tpm=args.tpm,
+        quota_window=args.quota_window,
+        seed=args.seed,
+    )
+    print(f"[MOCK_AZURE] Serving on http://{args.host}:{args.port} (latency {args.latency})")
+    uvicorn.run(create_app(mock), host=args.host, port=args.port, log_level="warning",
+                timeout_keep_alive=args.keep_alive)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# scripts/train_intent_model.py
+
+"""
+Train the local intent model and report its accuracy.
+
+Training data:
+- the 180-case Hinglish suite (tests/test_cases_comprehensive.py);
+- LLM-labelled production utterances from the persistent intent cache
+  (--db, defaults to INTENT_CACHE_DB), when one exists;
+- optional extra JSONL files with {"text": ..., "intent": ...} lines.
+
+Reports k-fold cross-validated accuracy on the suite (the honest number),
+accuracy and coverage at the acceptance threshold, and prediction cost,
+then writes the artifact loaded by classify_intent().
+
+Usage:
+    python scripts/train_intent_model.py
+    python scripts/train_intent_model.py --db /var/lib/debt-agent/llm_cache.db
+    python scripts/train_intent_model.py --extra labelled.jsonl --output models/intent_model.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.utils.intent_model import IntentModel
+from src.utils.llm import ALLOWED_INTENTS, INTENT_CACHE_DB, INTENT_MODEL_PATH, INTENT_MODEL_THRESHOLD
+from src.utils.sqlite_store import SQLiteStore
+from tests.test_cases_comprehensive import TEST_CASES
+from tests.run_comprehensive_tests import WORKFLOW_STATUS_MAP
+
+
+def suite_examples() -> list:
+    return [(text, WORKFLOW_STATUS_MAP[workflow]) for workflow, texts in TEST_CASES.items() for text in texts]
+
+
+def logged_examples(db_path: str) -> list:
+    """LLM classifications recorded by the persistent intent cache."""
+    if not db_path or not os.path.exists(db_path):
+        return []
+    store = SQLiteStore(db_path)
+    try:
+        return [(text, intent) for text, intent in store.iter_entries("intent")
+                if text and intent in ALLOWED_INTENTS]
+    finally:
+        store.close()
+
+
+def jsonl_examples(paths: list) -> list:
+    examples = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    if row.get("intent") in ALLOWED_INTENTS:
+                        examples.append((row["text"], row["intent"]))
+    return examples
+
+
+def evaluate(model: IntentModel, cases: list, threshold: float) -> dict:
+    """Accuracy overall, and accuracy/coverage of predictions above the threshold."""
+    correct = accepted = accepted_correct = 0
+    for text, expected in cases:
+        intent, probability = model.predict(text)
+        correct += intent == expected
+        # classify_intent() never accepts "unknown" from the model
+        if probability >= threshold and intent != "unknown":
+            accepted += 1
+            accepted_correct += intent == expected
+    return {"correct": correct, "accepted": accepted, "accepted_correct": accepted_correct}
+
+
+def cross_validate(extra: list, folds: int, threshold: float) -> dict:
+    """Stratified k-fold over the suite; extra examples are always in the training set."""
+    totals = {"correct": 0, "accepted": 0, "accepted_correct": 0}
+    for fold in range(folds):
+        train, held_out = list(extra), []
+        for workflow, texts in TEST_CASES.items():
+            for i, text in enumerate(texts):
+                (held_out if i % folds == fold else train).append((text, WORKFLOW_STATUS_MAP[workflow]))
+        result = evaluate(IntentModel().fit(train), held_out, threshold)
+        for key in totals:
+            totals[key] += result[key]
+    return totals
+
+
+def report(title: str, result: dict, total: int) -> None:
+    accepted = result["accepted"]
+    precision = result["accepted_correct"] / accepted if accepted else 0.0
+    print(f"{title}")
+    print(f"  Accuracy:             {result['correct']}/{total} ({result['correct'] / total:.1%})")
+    print(f"  Accepted (>= thresh): {accepted}/{total} ({accepted / total:.1%}), "
+          f"{result['accepted_correct']} correct ({precision:.1%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the local intent model")
+    parser.add_argument("--db", default=INTENT_CACHE_DB, help="Persistent intent cache to learn from")
+    parser.add_argument("--extra", nargs="*", default=[], help="Extra JSONL files of labelled utterances")
+    parser.add_argument("--output", default=INTENT_MODEL_PATH, help="Where to write the model artifact")
+    parser.add_argument("--threshold", type=float, default=INTENT_MODEL_THRESHOLD,
+                        help="Acceptance probability to report against")
+    parser.add_argument("--folds", type=int, default=5, help="Cross-validation folds over the suite")
+    args = parser.parse_args()
+
+    suite = suite_examples()
+    extra = logged_examples(args.db) + jsonl_examples(args.extra)
+    print(f"Training examples: {len(suite)} from the suite, {len(extra)} logged/extra")
+
+    report(f"{args.folds}-fold cross-validation on the suite (threshold {args.threshold}):",
+           cross_validate(extra, args.folds, args.threshold), len(suite))
+
+    model = IntentModel().fit(suite + extra)
+    report("Final model on the suite (training data, optimistic):",
+           evaluate(model, suite, args.threshold), len(suite))
+
+    start = time.perf_counter()
+    for text, _intent in suite:
+        model.predict(text)
+    per_utterance_us = (time.perf_counter() - start) / len(suite) * 1e6
+    print(f"Cost per prediction:    {per_utterance_us:.1f} µs")
+
+    if args.output:
+        model.save(args.output)
+        print(f"Saved {args.output} ({os.path.getsize(args.output) / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,18 @@
 # src/graph.py
 
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
 from src.state import CallState
 
 from src.nodes.greeting import greeting_node
 from src.nodes.verification import verification_node
 from src.nodes.disclosure import disclosure_node
-from src.nodes.payment_check import payment_check_node
-from src.nodes.negotiation import negotiation_node
+from src.nodes.payment_check import payment_check_node, apayment_check_node
+from src.nodes.negotiation import negotiation_node, anegotiation_node
 from src.nodes.closing import closing_node
+from src.utils.log import get_logger
+
+log = get_logger("graph")
 
 
 def should_continue(state: CallState) -> str:
@@ -93,7 +97,7 @@ def should_continue(state: CallState) -> str:
         return END
     
     # Safety fallback for unknown stages
-    print(f"[WARNING] Unknown stage '{stage}', ending conversation")
+    log.warning("Unknown stage %r, ending conversation", stage)
     return END
 
 
@@ -105,8 +109,10 @@ def create_graph():
     graph.add_node("greeting", greeting_node)
     graph.add_node("verification", verification_node)
     graph.add_node("disclosure", disclosure_node)
-    graph.add_node("payment_check", payment_check_node)
-    graph.add_node("negotiation", negotiation_node)
+    # LLM-bound nodes have async twins: graph.invoke uses the sync function,
+    # graph.ainvoke awaits the async one instead of offloading to a thread
+    graph.add_node("payment_check", RunnableLambda(payment_check_node, afunc=apayment_check_node, name="payment_check"))
+    graph.add_node("negotiation", RunnableLambda(negotiation_node, afunc=anegotiation_node, name="negotiation"))
     graph.add_node("closing", closing_node)
 
     # Set entry point with conditional routing
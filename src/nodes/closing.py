@@ -2,6 +2,9 @@
 
 from ..state import CallState
 from ..data import save_call_record, save_dispute, save_ptp
+from ..utils.log import get_logger
+
+log = get_logger("closing")
 
 
 def closing_node(state: CallState) -> dict:
@@ -12,7 +15,8 @@ def closing_node(state: CallState) -> dict:
     # Get payment status from state
     payment_status = state.get("payment_status", "completed")
     
-    print(f"[CLOSING] Closing node called. payment_status={payment_status}, is_complete={state.get('is_complete')}, stage={state.get('stage')}")
+    log.debug("Closing node called. payment_status=%s, is_complete=%s, stage=%s",
+              payment_status, state.get("is_complete"), state.get("stage"))
     
     # Generate closing message based on payment status
     if payment_status == "paid":
@@ -23,8 +27,7 @@ def closing_node(state: CallState) -> dict:
             for msg in messages
         )
         
-        print(f"[CLOSING] Payment status is 'paid'. Has screenshot: {has_screenshot}")
-        print(f"[CLOSING] Messages count: {len(messages)}")
+        log.debug("Payment status is 'paid'. Has screenshot: %s, messages: %d", has_screenshot, len(messages))
         
         if not has_screenshot:
             # Request payment proof before closing
@@ -35,7 +38,7 @@ def closing_node(state: CallState) -> dict:
                 "Aap neeche attachment button (📎) use karke apna proof upload kar sakte hain."
             )
             outcome = "paid"
-            print(f"[CLOSING] Returning early - asking for proof. is_complete=False, awaiting_user=True")
+            log.debug("Returning early - asking for proof")
             # Don't complete yet - wait for screenshot upload
             return {
                 "messages": state["messages"] + [{
@@ -49,7 +52,7 @@ def closing_node(state: CallState) -> dict:
             }
         else:
             # Screenshot uploaded, show final closing message
-            print(f"[CLOSING] Screenshot found - showing final closing message")
+            log.debug("Screenshot found - showing final closing message")
             closing_message = (
                 "Payment proof dene ke liye dhanyawad. "
                 "Humne aapka attachment receive kar liya hai aur hum ise verify karenge. "
@@ -1,6 +1,8 @@
 # src/nodes/disclosure.py
 
 from ..state import CallState
+from ..utils.plan_engine import PLAN_SOURCE
+from ..utils.plan_prefetch import start_plan_prefetch
 
 
 def disclosure_node(state: CallState) -> dict:
@@ -32,6 +34,11 @@ def disclosure_node(state: CallState) -> dict:
         f"Yeh ek debt collection attempt hai. "
         f"Kya aap aaj yeh payment kar sakte hain?"
     )
+
+    # Generate LLM plans while the customer reads this, in case they turn out willing
+    if PLAN_SOURCE == "llm":
+        start_plan_prefetch(state.get("session_id"), amount, state.get("customer_name", "Customer"),
+                            loan_type=state.get("loan_type"))
     
     return {
         "has_disclosed": True,
@@ -1,11 +1,37 @@
 # src/nodes/negotiation.py
 
+from langgraph.config import get_stream_writer
+
 from ..state import CallState
-from ..utils.llm import generate_negotiation_response, generate_payment_plans
+from ..utils.llm import (
+    LLM_COMBINED_TURN,
+    analyze_turn,
+    generate_negotiation_response,
+    generate_payment_plans,
+    generate_fallback_plans,
+    aanalyze_turn,
+    agenerate_negotiation_response,
+    agenerate_payment_plans,
+)
+from ..utils.plan_engine import PLAN_SOURCE, build_payment_plans
+from ..utils.plan_prefetch import take_prefetched_plans, atake_prefetched_plans
+from ..utils.prompt_budget import (
+    PROMPT_MESSAGE_TOKENS,
+    PROMPT_RECENT_MESSAGES,
+    PROMPT_TOKEN_BUDGET,
+    approximate_tokens,
+    record_trim,
+    roll_summary,
+    truncate_to_tokens,
+)
+from ..utils.log import get_logger
 from ..data import save_ptp
 from datetime import datetime, timedelta
+import logging
 import re
 
+log = get_logger("negotiation")
+
 
 def extract_amount(text: str) -> float:
     """Extract monetary amount from text using pattern matching."""
@@ -131,6 +157,29 @@ def extract_date(text: str) -> str:
     return None
 
 
+def plan_amount(plan: dict) -> float:
+    """
+    Amount the customer commits to by choosing a plan: the first installment
+    (or the settlement amount). Plan engine plans carry it as a field;
+    LLM-generated plans only have it in their description.
+    """
+    if plan.get("installment_amount") is not None:
+        return float(plan["installment_amount"])
+    amount_match = re.search(r'₹(\d+(?:,\d+)*)', plan.get('description', ''))
+    if amount_match:
+        return float(amount_match.group(1).replace(',', ''))
+    return None
+
+
+def plan_months(plan: dict) -> int:
+    """Length in months of an installment plan, or None (settlements, unrecognised text)."""
+    if "kind" in plan:
+        return plan["months"] if plan["kind"] == "installments" else None
+    text = f"{plan.get('name', '')} {plan.get('description', '')}".lower()
+    month_match = re.search(r'(\d+)\s*[-]?\s*(?:month|mahine)', text)
+    return int(month_match.group(1)) if month_match else None
+
+
 def has_commitment_details(state: CallState, last_user_input: str) -> tuple:
     """
     Check if customer has provided both amount and date commitment.
@@ -163,59 +212,48 @@ def has_commitment_details(state: CallState, last_user_input: str) -> tuple:
     start_index = max(plan_offer_index, verification_done_index + 1) if plan_offer_index >= 0 else verification_done_index + 1
     relevant_messages = messages[start_index:] if start_index >= 0 else messages[-3:]
     
-    print(f"[COMMITMENT] Checking {len(relevant_messages)} messages after plans offered")
-    if offered_plans:
-        print(f"[COMMITMENT] Available plans: {[p['name'] for p in offered_plans]}")
+    log.debug("Checking %d messages after plans offered", len(relevant_messages))
+    if offered_plans and log.isEnabledFor(logging.DEBUG):
+        log.debug("Available plans: %s", [p["name"] for p in offered_plans])
     
     for msg in relevant_messages:
         if msg.get("role") == "user":
             content = msg.get("content", "").lower()
             
-            print(f"[COMMITMENT] Analyzing user message: '{content}'")
+            log.debug("Analyzing user message: %r", content)
             
             if offered_plans and not selected_plan:
-                print(f"[COMMITMENT] Plans available: {len(offered_plans)}")
+                log.debug("Plans available: %d", len(offered_plans))
                 # Try to match by month count (e.g., "3 month", "3-month", "three month")
                 month_match = re.search(r'(\d+)\s*[-]?\s*month', content)
                 if month_match:
                     months = int(month_match.group(1))
-                    print(f"[PLAN DETECTION] Found {months}-month mention in: '{content}'")
+                    log.debug("Found %d-month mention in: %r", months, content)
                     for idx, plan in enumerate(offered_plans):
-                        plan_name_lower = plan['name'].lower()
-                        plan_desc_lower = plan['description'].lower()
+                        log.debug("Checking plan %d: %r", idx + 1, plan["name"])
                         
-                        print(f"[PLAN DETECTION] Checking plan {idx+1}: '{plan_name_lower}' / '{plan_desc_lower}'")
-                        
-                        matches = (
-                            f"{months}-month" in plan_name_lower or
-                            f"{months} month" in plan_desc_lower or
-                            f"{months}month" in plan_name_lower.replace("-", "").replace(" ", "") or
-                            (str(months) in plan_name_lower and "month" in plan_name_lower)
-                        )
+                        matches = plan_months(plan) == months
                         
                         if matches:
                             selected_plan = plan
-                            print(f"[PLAN DETECTION] OK: Matched to plan: {plan['name']}")
-                            amount_match = re.search(r'₹(\d+(?:,\d+)*)', plan['description'])
-                            if amount_match:
-                                committed_amount = float(amount_match.group(1).replace(',', ''))
-                                print(f"[PLAN DETECTION] Amount: ₹{committed_amount:,.0f}")
+                            log.debug("Matched to plan: %s", plan["name"])
+                            committed_amount = plan_amount(plan)
+                            if committed_amount:
+                                log.debug("Amount: ₹%.0f", committed_amount)
                             break
                         else:
-                            print(f"[PLAN DETECTION] No match for {months} months")
+                            log.debug("No match for %d months", months)
                 
                 # Try to match by plan/option number (e.g., "plan 1", "option 2", "1st plan")
                 if not selected_plan:
                     plan_num_match = re.search(r'(?:plan|option|choice)\s*(\d+)', content)
                     if plan_num_match:
                         plan_idx = int(plan_num_match.group(1)) - 1
-                        print(f"[PLAN DETECTION] Plan number {plan_idx + 1} selected")
+                        log.debug("Plan number %d selected", plan_idx + 1)
                         if 0 <= plan_idx < len(offered_plans):
                             selected_plan = offered_plans[plan_idx]
-                            print(f"[PLAN DETECTION] Matched to: {selected_plan['name']}")
-                            amount_match = re.search(r'₹(\d+(?:,\d+)*)', selected_plan['description'])
-                            if amount_match:
-                                committed_amount = float(amount_match.group(1).replace(',', ''))
+                            log.debug("Matched to: %s", selected_plan["name"])
+                            committed_amount = plan_amount(selected_plan)
                 
                 # Try to match by position words (first, second, third, etc.)
                 if not selected_plan:
@@ -229,10 +267,8 @@ def has_commitment_details(state: CallState, last_user_input: str) -> tuple:
                         if keyword in content:
                             if idx < len(offered_plans):
                                 selected_plan = offered_plans[idx]
-                                print(f"[PLAN DETECTION] Position-based selection ({keyword}): {selected_plan['name']}")
-                                amount_match = re.search(r'₹(\d+(?:,\d+)*)', selected_plan['description'])
-                                if amount_match:
-                                    committed_amount = float(amount_match.group(1).replace(',', ''))
+                                log.debug("Position-based selection (%s): %s", keyword, selected_plan["name"])
+                                committed_amount = plan_amount(selected_plan)
                             break
                 
                 # Try to match by acceptance phrases (works for me, sounds good, etc.)
@@ -244,7 +280,7 @@ def has_commitment_details(state: CallState, last_user_input: str) -> tuple:
                         'let\'s go with', 'let us go with', 'i\'d like', 'i would like'
                     ]
                     if any(phrase in content for phrase in acceptance_phrases):
-                        print("[PLAN DETECTION] Acceptance phrase detected")
+                        log.debug("Acceptance phrase detected")
                         msg_index = messages.index(msg)
                         if msg_index > 0:
                             prev_msg = messages[msg_index - 1]
@@ -255,10 +291,8 @@ def has_commitment_details(state: CallState, last_user_input: str) -> tuple:
                                 else:
                                     selected_plan = offered_plans[0]
                                 
-                                print(f"[PLAN DETECTION] Assumed plan: {selected_plan['name']}")
-                                amount_match = re.search(r'₹(\d+(?:,\d+)*)', selected_plan['description'])
-                                if amount_match:
-                                    committed_amount = float(amount_match.group(1).replace(',', ''))
+                                log.debug("Assumed plan: %s", selected_plan["name"])
+                                committed_amount = plan_amount(selected_plan)
                 
                 # Try to match by plan name keywords
                 if not selected_plan:
@@ -268,10 +302,8 @@ def has_commitment_details(state: CallState, last_user_input: str) -> tuple:
                         # If significant overlap in keywords, consider it a match
                         if len(plan_name_words & content_words) >= 2:
                             selected_plan = plan
-                            print(f"[PLAN DETECTION] Keyword-based match: {plan['name']}")
-                            amount_match = re.search(r'₹(\d+(?:,\d+)*)', plan['description'])
-                            if amount_match:
-                                committed_amount = float(amount_match.group(1).replace(',', ''))
+                            log.debug("Keyword-based match: %s", plan["name"])
+                            committed_amount = plan_amount(plan)
                             break
             
             if not committed_date:
@@ -284,15 +316,15 @@ def has_commitment_details(state: CallState, last_user_input: str) -> tuple:
                         # Only accept dates from 2020 onwards (commitment dates should be future dates)
                         if year >= 2020:
                             committed_date = date
-                            print(f"[DATE DETECTION] Found date: {date}")
+                            log.debug("Found date: %s", date)
                         else:
-                            print(f"[DATE DETECTION] Ignoring past date (likely DOB): {date}")
+                            log.debug("Ignoring past date (likely DOB): %s", date)
             
             if not committed_amount and not selected_plan:
                 amount = extract_amount(content)
                 if amount:
                     committed_amount = amount
-                    print(f"[AMOUNT DETECTION] Found explicit amount: {amount}")
+                    log.debug("Found explicit amount: %s", amount)
     
     # If we have a date but no amount/plan, and user expressed willingness to pay, use full outstanding amount
     if committed_date and not committed_amount and not selected_plan:
@@ -306,19 +338,40 @@ def has_commitment_details(state: CallState, last_user_input: str) -> tuple:
         ]
         if any(phrase in msg for msg in all_user_messages for phrase in willingness_phrases):
             committed_amount = state.get("outstanding_amount")
-            print(f"[COMMITMENT] Direct payment commitment detected, using full amount: ₹{committed_amount:,.0f}")
+            log.debug("Direct payment commitment detected, using full amount: ₹%.0f", committed_amount)
     
     has_both = committed_amount is not None and committed_date is not None
     
-    print(f"[COMMITMENT] Final - Amount: {committed_amount}, Date: {committed_date}, Plan: {selected_plan['name'] if selected_plan else None}")
+    log.debug("Final - Amount: %s, Date: %s, Plan: %s",
+              committed_amount, committed_date, selected_plan["name"] if selected_plan else None)
     
     return has_both, committed_amount, committed_date, selected_plan
 
 
-def negotiation_node(state: CallState) -> dict:
+def _with_turn_slots(state: CallState, analysis: dict, amount, date, plan) -> tuple:
     """
-    Negotiate payment with customer.
-    Detects when customer commits to both amount and date, then saves PTP and closes.
+    Fill in the commitment details the patterns missed from a combined turn
+    analysis (LLM_COMBINED_TURN). Returns (has_both, amount, date, plan).
+    """
+    offered_plans = state.get("offered_plans") or []
+    choice = analysis.get("plan_choice")
+    if plan is None and choice is not None and choice <= len(offered_plans):
+        plan = offered_plans[choice - 1]
+        amount = plan_amount(plan) or amount
+        log.debug("Plan chosen per turn analysis: %s", plan["name"])
+    if amount is None:
+        amount = analysis.get("amount")
+    if date is None:
+        date = analysis.get("date")
+    return amount is not None and date is not None, amount, date, plan
+
+
+def _prepare_negotiation(state: CallState, analysis: dict = None):
+    """
+    Validate state and handle every negotiation outcome that needs no LLM call.
+    Returns (early_result, ctx); when early_result is None, ctx says whether
+    plans must be generated ("needs_plans") or a free-form reply is needed.
+    Slots from a combined turn analysis complete the customer's commitment.
     """
     # Validate state structure
     if not isinstance(state, dict):
@@ -364,15 +417,17 @@ def negotiation_node(state: CallState) -> dict:
                 in_negotiation = True
                 negotiation_turns += 1
     
-    print(f"[NEGOTIATION] Turn {negotiation_turns + 1}, User input: '{last_user_input}'")
+    log.debug("Turn %d, User input: %r", negotiation_turns + 1, last_user_input)
     
     # Check if customer has committed to both amount and date
     commitment_result = has_commitment_details(state, last_user_input)
+    if analysis:
+        commitment_result = _with_turn_slots(state, analysis, *commitment_result[1:])
     has_both, committed_amount, committed_date, selected_plan = commitment_result
     
     # Save PTP and close if full commitment received
     if has_both:
-        print(f"[NEGOTIATION] OK: Full commitment received - CLOSING NOW")
+        log.debug("Full commitment received - closing now")
         
         # Validate commitment data
         if not committed_amount or committed_amount <= 0:
@@ -390,7 +445,7 @@ def negotiation_node(state: CallState) -> dict:
             date=committed_date,
             plan_type=plan_type
         )
-        print(f"[NEGOTIATION] PTP saved with ID: {ptp_id}")
+        log.info("PTP saved", extra={"fields": {"ptp_id": ptp_id, "customer_id": state["customer_id"]}})
         
         response = (
             f"Perfect, {customer_name}. Maine aapka commitment document kar diya hai - {plan_name} "
@@ -415,10 +470,10 @@ def negotiation_node(state: CallState) -> dict:
             "payment_status": "willing",
             "call_outcome": "ptp_recorded",
             "is_complete": True,  # THIS ENDS THE CALL
-        }
+        }, None
     
     if selected_plan and not committed_date:
-        print(f"[NEGOTIATION] Plan selected, asking for date")
+        log.debug("Plan selected, asking for date")
         response = (
             f"Bahut achha choice, {customer_name}! Maine {selected_plan['name']} note kar liya hai. "
             f"Aap pehli payment kab karna chahenge?"
@@ -432,7 +487,7 @@ def negotiation_node(state: CallState) -> dict:
             "awaiting_user": True,
             "last_user_input": None,
             "payment_status": "willing",
-        }
+        }, None
     
     end_signals = ["no that's all", "no thanks bye", "goodbye", "bye bye", "nothing else", "that's all"]
     user_wants_to_end = any(signal in last_user_input.lower() for signal in end_signals)
@@ -440,7 +495,7 @@ def negotiation_node(state: CallState) -> dict:
     should_close = user_wants_to_end or negotiation_turns >= 8
     
     if should_close:
-        print(f"[NEGOTIATION] Closing conversation (user_wants_to_end={user_wants_to_end}, turns={negotiation_turns})")
+        log.debug("Closing conversation (user_wants_to_end=%s, turns=%d)", user_wants_to_end, negotiation_turns)
         response = (
             f"Dhanyawad, {customer_name}. Maine hamari discussion document kar di hai. "
             f"Hum jaldi hi aapke saath follow-up karke arrangement finalize kar denge. "
@@ -454,7 +509,7 @@ def negotiation_node(state: CallState) -> dict:
             "stage": "negotiation",
             "awaiting_user": False,
             "last_user_input": None,
-        }
+        }, None
     
     plan_request_keywords = [
         "payment plan", "installment", "emi", "monthly payment",
@@ -464,85 +519,153 @@ def negotiation_node(state: CallState) -> dict:
     
     is_plan_request = any(keyword in last_user_input.lower() for keyword in plan_request_keywords)
     
-    if negotiation_turns == 0 or (is_plan_request and not state.get("offered_plans")):
-        try:
-            plans = generate_payment_plans(amount, customer_name)
-        except Exception as e:
-            print(f"[NEGOTIATION] Error generating plans: {e}, using fallback")
-            from ..utils.llm import generate_fallback_plans
-            plans = generate_fallback_plans(amount)
-        
-        if plans and len(plans) > 0:
-            if negotiation_turns == 0:
-                response = f"Main aapki willingness ki kadar karta hoon, {customer_name}. Chaliye main aapko kuch options dikhata hoon:\n\n"
-            else:
-                response = f"Bilkul, {customer_name}. Yahan kuch payment options hain:\n\n"
-            
-            for i, plan in enumerate(plans, 1):
-                # Remove any markdown asterisks from plan name
-                clean_name = plan['name'].replace('**', '').strip()
-                response += f"{i}. {clean_name}: {plan['description']}\n"
-            
-            response += f"\nAapke liye kaunsa option best rahega?"
-            
-            return {
-                "offered_plans": plans,
-                "messages": state["messages"] + [{
-                    "role": "assistant",
-                    "content": response
-                }],
-                "stage": "negotiation",
-                "awaiting_user": True,
-                "last_user_input": None,
-                "payment_status": "willing",
-            }
+    ctx = {
+        "customer_name": customer_name,
+        "amount": amount,
+        "last_user_input": last_user_input,
+        "negotiation_turns": negotiation_turns,
+        "committed_amount": committed_amount,
+        "committed_date": committed_date,
+        "selected_plan": selected_plan,
+        "needs_plans": negotiation_turns == 0 or (is_plan_request and not state.get("offered_plans")),
+    }
+    return None, ctx
+
+
+def _loan_terms(state: CallState) -> dict:
+    """The call's loan as a LOANS-style record for the plan engine."""
+    return {
+        "id": state.get("loan_id"),
+        "type": state.get("loan_type"),
+        "principal": state.get("principal_amount"),
+        "emi": state.get("emi_amount"),
+        "outstanding": state["outstanding_amount"],
+        "days_past_due": state.get("days_past_due"),
+        "due_date": state.get("due_date"),
+    }
+
+
+def _plans_result(state: CallState, ctx: dict, plans: list) -> dict:
+    """Present generated payment plans to the customer."""
+    customer_name = ctx["customer_name"]
+    negotiation_turns = ctx["negotiation_turns"]
+
+    if plans and len(plans) > 0:
+        if negotiation_turns == 0:
+            response = f"Main aapki willingness ki kadar karta hoon, {customer_name}. Chaliye main aapko kuch options dikhata hoon:\n\n"
         else:
-            return {
-                "messages": state["messages"] + [{
-                    "role": "assistant",
-                    "content": (
-                        f"Main aapki willingness ki kadar karta hoon, {customer_name}. "
-                        f"Kya aap mujhe bata sakte hain ki monthly kitna amount aur kab ka date aapke liye theek rahega?"
-                    )
-                }],
-                "stage": "negotiation",
-                "awaiting_user": True,
-                "last_user_input": None,
-                "payment_status": "willing",
-            }
-    
-    recent_conversation = ""
-    for msg in messages[-6:]:
+            response = f"Bilkul, {customer_name}. Yahan kuch payment options hain:\n\n"
+        
+        for i, plan in enumerate(plans, 1):
+            # Remove any markdown asterisks from plan name
+            clean_name = plan['name'].replace('**', '').strip()
+            response += f"{i}. {clean_name}: {plan['description']}\n"
+        
+        response += f"\nAapke liye kaunsa option best rahega?"
+        
+        return {
+            "offered_plans": plans,
+            "messages": state["messages"] + [{
+                "role": "assistant",
+                "content": response
+            }],
+            "stage": "negotiation",
+            "awaiting_user": True,
+            "last_user_input": None,
+            "payment_status": "willing",
+        }
+    else:
+        return {
+            "messages": state["messages"] + [{
+                "role": "assistant",
+                "content": (
+                    f"Main aapki willingness ki kadar karta hoon, {customer_name}. "
+                    f"Kya aap mujhe bata sakte hain ki monthly kitna amount aur kab ka date aapke liye theek rahega?"
+                )
+            }],
+            "stage": "negotiation",
+            "awaiting_user": True,
+            "last_user_input": None,
+            "payment_status": "willing",
+        }
+
+
+def _roll_summary(state: CallState) -> dict:
+    """Fold turns that scrolled out of the prompt's recent window into the rolling summary."""
+    summary, summarized = roll_summary(
+        state.get("messages", []), state.get("conversation_summary"), state.get("summarized_messages") or 0
+    )
+    return {"conversation_summary": summary, "summarized_messages": summarized}
+
+
+def _build_negotiation_context(state: CallState, ctx: dict, summary: str = None, combined: bool = False) -> str:
+    """
+    Build the LLM context for a free-form negotiation reply, trimmed to
+    PROMPT_TOKEN_BUDGET: older recent turns go first, then the plan
+    descriptions (names are kept), then the oldest summary lines. For a
+    combined turn call the JSON instructions follow instead of "Response:".
+    """
+    customer_name = ctx["customer_name"]
+    amount = ctx["amount"]
+    messages = state.get("messages", [])
+
+    recent_lines = []
+    for msg in messages[-PROMPT_RECENT_MESSAGES:]:
         role = "Agent" if msg["role"] == "assistant" else "Customer"
-        recent_conversation += f"{role}: {msg['content']}\n"
-    
-    plans_context = ""
-    if state.get("offered_plans"):
-        plans_context = "\n\nOffered plans:\n"
-        for plan in state["offered_plans"]:
-            plans_context += f"- {plan['name']}: {plan['description']}\n"
-    
-    context = f"""Aap ek professional debt collection agent hain. Hinglish mein respond karein (Hindi aur English mix).
+        recent_lines.append(f"{role}: {truncate_to_tokens(msg['content'], PROMPT_MESSAGE_TOKENS)}")
+
+    plan_lines = [f"- {plan['name']}: {plan['description']}" for plan in state.get("offered_plans") or []]
+    plan_names = [f"- {plan['name']}" for plan in state.get("offered_plans") or []]
+    summary_lines = summary.split("\n") if summary else []
+    last_user_input = truncate_to_tokens(ctx["last_user_input"], PROMPT_MESSAGE_TOKENS)
+
+    answer_cue = "" if combined else "\n\nResponse:"
+
+    def render() -> str:
+        summary_context = "\nEarlier in the call:\n" + "\n".join(summary_lines) + "\n" if summary_lines else ""
+        plans_context = "\n\nOffered plans:\n" + "\n".join(plan_lines) + "\n" if plan_lines else ""
+        recent_conversation = "".join(line + "\n" for line in recent_lines)
+        return f"""Aap ek professional debt collection agent hain. Hinglish mein respond karein (Hindi aur English mix).
 
 Customer: {customer_name}
 Outstanding: ₹{amount:,.0f}
-
+{summary_context}
 Recent conversation:
 {recent_conversation}
 {plans_context}
 
 Customer ne kaha: "{last_user_input}"
 
-Task: Naturally respond karein Hinglish mein. Agar unhone plan select kiya hai, confirm karein aur payment date puchhein. Agar unhone date mention kiya hai, confirm karein. Brief rahein (2-3 sentences).
+Task: Naturally respond karein Hinglish mein. Agar unhone plan select kiya hai, confirm karein aur payment date puchhein. Agar unhone date mention kiya hai, confirm karein. Brief rahein (2-3 sentences).{answer_cue}"""
+
+    context = render()
+    trimmed = False
+    while approximate_tokens(context) > PROMPT_TOKEN_BUDGET:
+        if len(recent_lines) > 2:
+            recent_lines = recent_lines[1:]
+        elif plan_lines != plan_names:
+            plan_lines = plan_names
+        elif summary_lines:
+            summary_lines = summary_lines[1:]
+        else:
+            break
+        trimmed = True
+        context = render()
 
-Response:"""
+    if trimmed:
+        record_trim("negotiation")
+        log.debug("Prompt trimmed to ~%d tokens", approximate_tokens(context))
+    return context
+
+
+def _negotiation_response_result(state: CallState, ctx: dict, response: str) -> dict:
+    """Wrap an LLM reply (or the template fallback when it is None)."""
+    customer_name = ctx["customer_name"]
 
-    response = generate_negotiation_response(context)
-    
     if not response:
-        print("[NEGOTIATION] Using smart template fallback")
+        log.info("Using smart template fallback")
         
-        if committed_date and not committed_amount and not selected_plan:
+        if ctx["committed_date"] and not ctx["committed_amount"] and not ctx["selected_plan"]:
             response = (
                 f"Us date ke liye dhanyawad, {customer_name}. "
                 f"Kya aap confirm kar sakte hain ki kaunsa payment plan aapke liye best rahega?"
@@ -562,4 +685,121 @@ Response:"""
         "awaiting_user": True,
         "last_user_input": None,
         "payment_status": "willing",
-    }
\ No newline at end of file
+    }
+
+
+def _turn_reply_result(state: CallState, analysis: dict) -> dict:
+    """
+    Reply from a combined turn call, unless its slots complete the
+    commitment or pick a plan (handled like the patterns' findings).
+    The template fallback sees the slots too.
+    """
+    early_result, ctx = _prepare_negotiation(state, analysis)
+    if early_result is not None:
+        return early_result
+    return _negotiation_response_result(state, ctx, analysis["reply"])
+
+
+def _negotiate(state: CallState) -> dict:
+    analysis = state.get("turn_analysis")
+    early_result, ctx = _prepare_negotiation(state, analysis)
+    if early_result is not None:
+        return early_result
+
+    if ctx["needs_plans"] and PLAN_SOURCE == "engine":
+        return _plans_result(state, ctx, build_payment_plans(_loan_terms(state)))
+
+    if ctx["needs_plans"]:
+        plans = (analysis or {}).get("plans")
+        try:
+            if plans is None:
+                plans = take_prefetched_plans(state.get("session_id"), ctx["amount"], state.get("turn_deadline"))
+            if plans is None:
+                plans = generate_payment_plans(ctx["amount"], ctx["customer_name"], state.get("turn_deadline"),
+                                               loan_type=state.get("loan_type"))
+        except Exception as e:
+            log.warning("Error generating plans: %s, using fallback", e)
+            plans = generate_fallback_plans(ctx["amount"])
+        return _plans_result(state, ctx, plans)
+
+    summary = _roll_summary(state)
+    if LLM_COMBINED_TURN:
+        context = _build_negotiation_context(state, ctx, summary["conversation_summary"], combined=True)
+        analysis = analyze_turn(context, state.get("turn_deadline"), classify=False)
+        if analysis is not None:
+            return {**_turn_reply_result(state, analysis), **summary}
+
+    context = _build_negotiation_context(state, ctx, summary["conversation_summary"])
+    response = generate_negotiation_response(context, state.get("turn_deadline"))
+    return {**_negotiation_response_result(state, ctx, response), **summary}
+
+
+def negotiation_node(state: CallState) -> dict:
+    """
+    Negotiate payment with customer.
+    Detects when customer commits to both amount and date, then saves PTP and closes.
+    With LLM_COMBINED_TURN, a reply turn is one structured call that also
+    extracts the commitment slots; a turn analysis left by payment_check
+    supplies slots and plans, and is used up.
+    """
+    result = _negotiate(state)
+    return {**result, "turn_analysis": None} if state.get("turn_analysis") else result
+
+
+def _token_writer(config: dict):
+    """
+    Token callback for streamed replies, when the graph is run with
+    configurable stream_tokens (see backend/graph_runner.stream_graph).
+    Tokens are emitted on LangGraph's "custom" stream as {"token": text}.
+    """
+    if not (config or {}).get("configurable", {}).get("stream_tokens"):
+        return None
+    writer = get_stream_writer()
+    return lambda text: writer({"token": text})
+
+
+async def _anegotiate(state: CallState, config: dict = None) -> dict:
+    analysis = state.get("turn_analysis")
+    early_result, ctx = _prepare_negotiation(state, analysis)
+    if early_result is not None:
+        return early_result
+
+    if ctx["needs_plans"] and PLAN_SOURCE == "engine":
+        return _plans_result(state, ctx, build_payment_plans(_loan_terms(state)))
+
+    if ctx["needs_plans"]:
+        plans = (analysis or {}).get("plans")
+        try:
+            if plans is None:
+                plans = await atake_prefetched_plans(state.get("session_id"), ctx["amount"],
+                                                     state.get("turn_deadline"))
+            if plans is None:
+                plans = await agenerate_payment_plans(ctx["amount"], ctx["customer_name"], state.get("turn_deadline"),
+                                                      loan_type=state.get("loan_type"))
+        except Exception as e:
+            log.warning("Error generating plans: %s, using fallback", e)
+            plans = generate_fallback_plans(ctx["amount"])
+        return _plans_result(state, ctx, plans)
+
+    summary = _roll_summary(state)
+    # A structured reply is not streamed; the client gets it with the final state
+    if LLM_COMBINED_TURN:
+        context = _build_negotiation_context(state, ctx, summary["conversation_summary"], combined=True)
+        analysis = await aanalyze_turn(context, state.get("turn_deadline"), classify=False)
+        if analysis is not None:
+            return {**_turn_reply_result(state, analysis), **summary}
+
+    context = _build_negotiation_context(state, ctx, summary["conversation_summary"])
+    response = await agenerate_negotiation_response(context, state.get("turn_deadline"), on_token=_token_writer(config))
+    return {**_negotiation_response_result(state, ctx, response), **summary}
+
+
+async def anegotiation_node(state: CallState, config: dict = None) -> dict:
+    """
+    Async twin of negotiation_node().
+    Awaits plan and reply generation instead of blocking a thread, and
+    streams the reply's tokens when the caller asked for them (except
+    combined turn replies, which arrive whole).
+    """
+    result = await _anegotiate(state, config)
+    return {**result, "turn_analysis": None} if state.get("turn_analysis") else result
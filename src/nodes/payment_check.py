@@ -1,22 +1,31 @@
 # src/nodes/payment_check.py
 
+import re
+
 from ..state import CallState
-from ..utils.llm import classify_intent
+from ..utils.llm import LLM_COMBINED_TURN, classify_intent, aclassify_intent, classify_turn, aclassify_turn
+from ..utils.log import get_logger
+from ..utils.plan_engine import PLAN_SOURCE
+from ..utils.plan_prefetch import discard_prefetched_plans, has_prefetched_plans
+from ..utils.prompt_budget import PROMPT_MESSAGE_TOKENS, truncate_to_tokens
 
+log = get_logger("payment_check")
 
-def payment_check_node(state: CallState) -> dict:
+
+def _prepare_payment_check(state: CallState):
     """
-    Classify customer's payment intent using LLM classification.
-    Routes customer to appropriate next step based on their response.
+    Validate state and pick out the utterance to classify.
+    Returns (early_result, user_input); early_result is set when no
+    classification is needed this turn.
     """
     # Validate state structure
     if not isinstance(state, dict):
         raise ValueError("Invalid state: state must be a dictionary")
-    
+
     # Ensure customer is verified
     if not state.get("is_verified"):
         raise ValueError("Invalid state: User must be verified before payment check")
-    
+
     user_input = state.get("last_user_input")
 
     # Wait for user input if not provided
@@ -24,22 +33,50 @@ def payment_check_node(state: CallState) -> dict:
         return {
             "stage": "payment_check",
             "awaiting_user": True,
-        }
-    
+        }, None
+
     # Filter out DOB inputs (from verification, not payment responses)
-    import re
     date_pattern = r'^\d{2}-\d{2}-\d{4}$'
     if re.match(date_pattern, user_input.strip()):
         return {
             "stage": "payment_check",
             "awaiting_user": True,
             "last_user_input": None,
-        }
+        }, None
 
-    # Classify customer intent using LLM
-    print(f"\n[PAYMENT_CHECK] Analyzing user input: '{user_input}'")
-    intent = classify_intent(user_input).strip().lower()
-    print(f"[PAYMENT_CHECK] Classified intent: {intent}\n")
+    log.debug("Analyzing user input: %r", user_input)
+    return None, user_input
+
+
+def _turn_context(state: CallState, user_input: str) -> str:
+    """Prompt context for the combined turn call: who owes what, the disclosure and the answer."""
+    customer_name = str(state.get("customer_name") or "Customer").split()[0]
+    agent_said = next((m.get("content", "") for m in reversed(state.get("messages", []))
+                       if m.get("role") == "assistant"), "")
+    return (
+        "Aap ek professional debt collection agent hain. Customer Hinglish mein bol sakte hain.\n\n"
+        f"Customer: {customer_name}\n"
+        f"Outstanding: ₹{state.get('outstanding_amount', 0):,.0f}\n\n"
+        f'Agent ne kaha: "{truncate_to_tokens(agent_said, PROMPT_MESSAGE_TOKENS)}"\n'
+        f'Customer ne kaha: "{truncate_to_tokens(user_input, PROMPT_MESSAGE_TOKENS)}"'
+    )
+
+
+def _turn_plans_for(state: CallState):
+    """The amount negotiation would call the LLM for plans for, or None (engine plans, or a prefetch)."""
+    if PLAN_SOURCE != "llm" or has_prefetched_plans(state.get("session_id")):
+        return None
+    return state.get("outstanding_amount")
+
+
+def _payment_check_result(state: CallState, intent: str, analysis: dict = None) -> dict:
+    """
+    Normalise a classified intent into the node's state update. A combined
+    turn analysis (slots and plans) is handed on to negotiation when the
+    customer is willing.
+    """
+    intent = intent.strip().lower()
+    log.debug("Classified intent: %s", intent)
 
     # Normalize intent variations
     alias_map = {
@@ -53,12 +90,54 @@ def payment_check_node(state: CallState) -> dict:
     # Validate classification result
     valid_statuses = ["paid", "disputed", "callback", "unable", "willing", "unknown"]
     if payment_status not in valid_statuses:
-        print(f"[WARNING] Unexpected payment status: {payment_status}, defaulting to 'unknown'")
+        log.warning("Unexpected payment status: %s, defaulting to 'unknown'", payment_status)
         payment_status = "unknown"
 
+    # Plans prefetched during disclosure are only needed for negotiation
+    if payment_status != "willing":
+        discard_prefetched_plans(state.get("session_id"))
+
     return {
         "payment_status": payment_status,
         "stage": "payment_check",
         "awaiting_user": False,
         "last_user_input": None,
-    }
\ No newline at end of file
+        "turn_analysis": analysis if payment_status == "willing" else None,
+    }
+
+
+def payment_check_node(state: CallState) -> dict:
+    """
+    Classify customer's payment intent using LLM classification.
+    Routes customer to appropriate next step based on their response.
+    """
+    early_result, user_input = _prepare_payment_check(state)
+    if early_result is not None:
+        return early_result
+
+    # One LLM call for the intent, the commitment slots and the plans
+    if LLM_COMBINED_TURN:
+        intent, analysis = classify_turn(user_input, _turn_context(state, user_input), state.get("turn_deadline"),
+                                         plans_for=_turn_plans_for(state), loan_type=state.get("loan_type"))
+        return _payment_check_result(state, intent, analysis)
+
+    # Classify customer intent using LLM
+    return _payment_check_result(state, classify_intent(user_input, state.get("turn_deadline")))
+
+
+async def apayment_check_node(state: CallState) -> dict:
+    """
+    Async twin of payment_check_node().
+    Awaits the LLM classification instead of blocking a thread.
+    """
+    early_result, user_input = _prepare_payment_check(state)
+    if early_result is not None:
+        return early_result
+
+    if LLM_COMBINED_TURN:
+        intent, analysis = await aclassify_turn(user_input, _turn_context(state, user_input),
+                                                state.get("turn_deadline"), plans_for=_turn_plans_for(state),
+                                                loan_type=state.get("loan_type"))
+        return _payment_check_result(state, intent, analysis)
+
+    return _payment_check_result(state, await aclassify_intent(user_input, state.get("turn_deadline")))
@@ -35,6 +35,7 @@ PaymentStatus = Literal[
 class CallState(TypedDict):
     """Complete state for a debt collection call conversation."""
     # === Conversation ===
+    session_id: Optional[str]  # API session this call belongs to (None outside the web app)
     messages: List[dict]  # Conversation history
     stage: Stage  # Current conversation stage
     turn_count: int  # Number of conversation turns
@@ -42,6 +43,8 @@ class CallState(TypedDict):
     awaiting_user: bool  # Whether agent is waiting for user input
     has_greeted: bool  # Whether greeting has been sent
     has_disclosed: bool  # Whether legal disclosure has been provided
+    conversation_summary: Optional[str]  # Rolling summary of turns older than the prompt's recent window
+    summarized_messages: int  # Number of messages the summary covers
     
     # === Customer Info ===
     customer_id: str  # Unique customer identifier
@@ -54,6 +57,9 @@ class CallState(TypedDict):
     loan_type: str  # Type of loan (e.g., "Personal Loan")
     outstanding_amount: float  # Amount owed
     days_past_due: int  # Days overdue
+    principal_amount: float  # Original loan amount
+    emi_amount: float  # Contractual monthly installment (0 for credit cards)
+    due_date: str  # Installment due date (YYYY-MM-DD)
     
     # === Verification ===
     verification_attempts: int  # Number of verification attempts
@@ -72,8 +78,9 @@ class CallState(TypedDict):
     dispute_id: Optional[str]  # Dispute ticket ID
     
     # === Negotiation ===
-    offered_plans: List[dict]  # Payment plans offered to customer
+    offered_plans: List[dict]  # Payment plans offered to customer (PaymentPlan when from the plan engine)
     selected_plan: Optional[dict]  # Plan selected by customer
+    turn_analysis: Optional[dict]  # Combined LLM analysis of this turn, for negotiation (LLM_COMBINED_TURN)
     
     # === Call Outcome ===
     call_outcome: Optional[str]  # Final call result
@@ -82,6 +89,9 @@ class CallState(TypedDict):
     # === Flags ===
     is_complete: bool  # Whether conversation is finished
 
+    # === Latency Budget ===
+    turn_deadline: Optional[float]  # Epoch time by which the current turn must finish
+
 
 # =========================
 # Initial State Factory
@@ -100,6 +110,7 @@ def create_initial_state(phone: str) -> Optional[CallState]:
     
     return CallState(
         # Conversation
+        session_id=None,
         messages=[],
         stage="init",
         turn_count=0,
@@ -107,6 +118,8 @@ def create_initial_state(phone: str) -> Optional[CallState]:
         awaiting_user=False,
         has_greeted=False,
         has_disclosed=False,
+        conversation_summary=None,
+        summarized_messages=0,
         
         # Customer
         customer_id=customer["id"],
@@ -119,6 +132,9 @@ def create_initial_state(phone: str) -> Optional[CallState]:
         loan_type=loan["type"],
         outstanding_amount=loan["outstanding"],
         days_past_due=loan["days_past_due"],
+        principal_amount=loan["principal"],
+        emi_amount=loan["emi"],
+        due_date=loan["due_date"],
         
         # Verification
         verification_attempts=0,
@@ -139,6 +155,7 @@ def create_initial_state(phone: str) -> Optional[CallState]:
         # Negotiation
         offered_plans=[],
         selected_plan=None,
+        turn_analysis=None,
         
         # Outcome
         call_outcome=None,
@@ -146,4 +163,7 @@ def create_initial_state(phone: str) -> Optional[CallState]:
         
         # Flags
         is_complete=False,
+
+        # Latency budget (set per turn by the API)
+        turn_deadline=None,
     )
\ No newline at end of file
@@ -0,0 +1,159 @@
+"""
+Circuit breaker for calls to a remote dependency (Azure OpenAI).
+
+When the dependency is degraded, every caller would otherwise wait for its
+own timeout before falling back. The breaker watches the outcome and
+latency of the most recent calls and, once too many fail or are too slow,
+rejects calls immediately so callers fall back at once.
+
+- closed: calls flow; outcomes are recorded in a sliding window.
+- open: calls are rejected until the cooldown has elapsed.
+- half-open: a single trial call is let through. Success closes the
+  breaker; failure (or a slow call) opens it for another cooldown.
+"""
+
+import threading
+import time
+from collections import deque
+
+from .log import get_logger
+from .metrics import counter, gauge
+
+log = get_logger("circuit_breaker")
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Numeric encoding of the state for the gauge
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+_breaker_state = gauge(
+    "circuit_breaker_state", "Circuit breaker state (0=closed, 1=half-open, 2=open)", ("breaker",)
+)
+_breaker_transitions = counter(
+    "circuit_breaker_transitions_total", "Circuit breaker state changes", ("breaker", "state")
+)
+_breaker_rejections = counter(
+    "circuit_breaker_rejected_total", "Calls rejected without reaching the dependency", ("breaker",)
+)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the dependency while the breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Count-based sliding-window breaker with failure-rate and slow-call-rate
+    thresholds. Thread-safe; shared by the sync and async call paths.
+    """
+
+    def __init__(self, name: str, failure_rate_threshold: float = 0.5, slow_call_seconds: float = 10.0,
+                 slow_call_rate_threshold: float = 0.8, window_size: int = 20, min_calls: int = 5,
+                 cooldown_seconds: float = 30.0):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.min_calls = min_calls
+        self.cooldown_seconds = cooldown_seconds
+
+        self._window = deque(maxlen=window_size)  # (failed, slow) per call
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trial_started_at = None
+        self._last_error = None
+        self._lock = threading.Lock()
+        _breaker_state.set(_STATE_VALUES[CLOSED], breaker=name)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def _transition(self, state: str) -> None:
+        """Change state. Caller holds the lock."""
+        if state == self._state:
+            return
+        log.warning("%s: %s -> %s", self.name, self._state, state)
+        self._state = state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        if state != HALF_OPEN:
+            self._trial_started_at = None
+        if state == CLOSED:
+            self._window.clear()
+        _breaker_state.set(_STATE_VALUES[state], breaker=self.name)
+        _breaker_transitions.inc(breaker=self.name, state=state)
+
+    def allow_request(self) -> bool:
+        """Whether a call may go to the dependency now."""
+        now = time.monotonic()
+        with self._lock:
+            if self._state == OPEN and now - self._opened_at >= self.cooldown_seconds:
+                self._transition(HALF_OPEN)
+
+            if self._state == CLOSED:
+                return True
+
+            # One trial call at a time while half-open; a trial that never
+            # reported back (e.g. a cancelled task) is abandoned after a cooldown
+            if self._state == HALF_OPEN and (
+                self._trial_started_at is None or now - self._trial_started_at >= self.cooldown_seconds
+            ):
+                self._trial_started_at = now
+                return True
+
+        _breaker_rejections.inc(breaker=self.name)
+        return False
+
+    def check(self) -> None:
+        """Raise CircuitOpenError unless a call is allowed."""
+        if not self.allow_request():
+            raise CircuitOpenError(f"Circuit breaker '{self.name}' is open")
+
+    def record_success(self, latency: float) -> None:
+        self._record(failed=False, latency=latency)
+
+    def record_failure(self, latency: float, error: Exception = None) -> None:
+        self._record(failed=True, latency=latency, error=error)
+
+    def _record(self, failed: bool, latency: float, error: Exception = None) -> None:
+        slow = latency >= self.slow_call_seconds
+        with self._lock:
+            if error is not None:
+                self._last_error = f"{type(error).__name__}: {str(error)[:200]}"
+
+            if self._state == HALF_OPEN:
+                self._transition(OPEN if failed or slow else CLOSED)
+                return
+            if self._state == OPEN:
+                # A call that started before the breaker opened
+                return
+
+            self._window.append((failed, slow))
+            calls = len(self._window)
+            if calls < self.min_calls:
+                return
+            failure_rate = sum(f for f, _ in self._window) / calls
+            slow_rate = sum(s for _, s in self._window) / calls
+            if failure_rate >= self.failure_rate_threshold or slow_rate >= self.slow_call_rate_threshold:
+                self._transition(OPEN)
+
+    def snapshot(self) -> dict:
+        """State and recent-window statistics (for /health)."""
+        with self._lock:
+            calls = len(self._window)
+            snapshot = {
+                "state": self._state,
+                "recent_calls": calls,
+                "failure_rate": round(sum(f for f, _ in self._window) / calls, 3) if calls else 0.0,
+                "slow_call_rate": round(sum(s for _, s in self._window) / calls, 3) if calls else 0.0,
+                "last_error": self._last_error,
+            }
+            if self._state == OPEN:
+                remaining = self.cooldown_seconds - (time.monotonic() - self._opened_at)
+                snapshot["retry_in_seconds"] = round(max(remaining, 0.0), 1)
+            return snapshot
@@ -0,0 +1,315 @@
+"""
+Routing of chat completions across several Azure OpenAI deployments.
+
+AZURE_OPENAI_DEPLOYMENTS lists endpoint/deployment pairs, each with a
+weight (see parse_deployments()), so capacity in more regions or quotas is
+added by configuration. Every call goes to one of them:
+
+- score = EWMA latency x (calls in flight + 1) x (1 + penalty x EWMA error
+  rate) / weight; lower is better. Under light load calls go to the fastest
+  healthy deployment; under load they spread roughly in proportion to the
+  weights, since every call in flight raises a deployment's score.
+- Two deployments are drawn at random and the lower score wins ("power of
+  two choices"), so many workers routing at once do not all pile onto the
+  same one.
+- While a deployment gets no calls its statistics fade (half-life
+  LLM_ROUTER_DECAY_SECONDS): the error rate towards zero, the latency
+  towards the average of all deployments (also what a deployment with no
+  successful call yet is assumed to take). One that was avoided after a
+  bad spell is tried again later instead of being starved forever.
+- Each deployment has its own circuit breaker: an open one gets no calls
+  until its cooldown has passed.
+- A retryable error (429, 5xx, timeout, dropped connection), or the
+  deployment's client-side rate limiter refusing the call, fails over at
+  once to the best deployment not yet tried for that call, as long as the
+  call's time allows. When every deployment has failed, the last error is
+  raised to the retry policy and the process-wide breaker in llm.py.
+
+The router knows nothing about clients: llm.py passes a function that
+sends the request to the chosen deployment.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .log import get_logger
+from .metrics import counter, gauge
+from .rate_limiter import RateLimitExceeded, service_clock
+from .retry import is_transient_failure, retry_reason
+
+log = get_logger("llm_router")
+
+
+_deployment_calls = counter(
+    "llm_deployment_calls_total", "Chat completion attempts by routed deployment and outcome",
+    ("deployment", "outcome"),
+)
+_deployment_failovers = counter(
+    "llm_deployment_failovers_total", "Calls moved to another deployment after a retryable error",
+    ("deployment", "reason"),
+)
+_deployment_latency = gauge(
+    "llm_deployment_latency_ewma_seconds", "Smoothed latency of each routed deployment", ("deployment",)
+)
+_deployment_error_rate = gauge(
+    "llm_deployment_error_rate_ewma", "Smoothed error rate of each routed deployment", ("deployment",)
+)
+
+
+def parse_deployments(spec: str, defaults: dict) -> list:
+    """
+    Deployment settings from an AZURE_OPENAI_DEPLOYMENTS value, a JSON list:
+
+        [{"endpoint": "https://eastus.example.azure.com/", "deployment": "gpt-4.1-mini",
+          "weight": 2, "api_key_env": "AZURE_OPENAI_API_KEY_EASTUS"}, ...]
+
+    Only "endpoint" is required. "deployment", "api_version", the quota
+    ("rpm", "tpm") and the key (given as "api_key", or read from the
+    "api_key_env" variable) default to `defaults`; "weight" to 1 and "name"
+    to "<host>/<deployment>".
+    """
+    entries = json.loads(spec)
+    if not isinstance(entries, list) or not entries:
+        raise ValueError("AZURE_OPENAI_DEPLOYMENTS must be a non-empty JSON list")
+
+    deployments = []
+    for entry in entries:
+        if not entry.get("endpoint"):
+            raise ValueError(f"Deployment without an endpoint: {entry!r}")
+        weight = float(entry.get("weight", 1))
+        if weight <= 0:
+            raise ValueError(f"Deployment weight must be positive: {entry!r}")
+        deployment = entry.get("deployment") or defaults.get("deployment")
+        api_key = entry.get("api_key")
+        if api_key is None and entry.get("api_key_env"):
+            api_key = os.getenv(entry["api_key_env"])
+        deployments.append({
+            "name": entry.get("name") or f"{urlparse(entry['endpoint']).netloc or entry['endpoint']}/{deployment}",
+            "endpoint": entry["endpoint"],
+            "deployment": deployment,
+            "api_key": api_key if api_key is not None else defaults.get("api_key"),
+            "api_version": entry.get("api_version") or defaults.get("api_version"),
+            "weight": weight,
+            "rpm": float(entry.get("rpm", defaults.get("rpm", 0))),
+            "tpm": float(entry.get("tpm", defaults.get("tpm", 0))),
+        })
+
+    names = [d["name"] for d in deployments]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Deployment names must be unique: {names}")
+    return deployments
+
+
+def _failover_reason(error: Exception):
+    """Why a failed attempt should move to another deployment ("throttled", "rate_limited", ...), or None."""
+    return "rate_limited" if isinstance(error, RateLimitExceeded) else retry_reason(error)
+
+
+class Deployment:
+    """One endpoint/deployment pair and its routing statistics."""
+
+    def __init__(self, name: str, endpoint: str, deployment: str, api_key: str = None,
+                 api_version: str = None, weight: float = 1.0, breaker: CircuitBreaker = None, limiter=None):
+        self.name = name
+        self.endpoint = endpoint
+        self.deployment = deployment
+        self.api_key = api_key
+        self.api_version = api_version
+        self.weight = weight
+        self.breaker = breaker or CircuitBreaker(f"deployment:{name}")
+        self.limiter = limiter  # RateLimiter for its quota, applied by the caller's send function
+
+        # Guarded by the router's lock
+        self.latency = 0.0      # EWMA seconds, successful and timed-out calls
+        self.latency_samples = 0
+        self.error_rate = 0.0   # EWMA of 0 (ok) / 1 (error)
+        self.in_flight = 0
+        self.updated_at = None  # monotonic time of the last sample
+
+
+class DeploymentRouter:
+    """Picks a deployment per call and fails over between them. Thread-safe."""
+
+    def __init__(self, deployments: list, alpha: float = 0.3, error_penalty: float = 10.0,
+                 decay_seconds: float = 30.0, min_call_seconds: float = 0.3):
+        if not deployments:
+            raise ValueError("DeploymentRouter needs at least one deployment")
+        self.deployments = list(deployments)
+        self.alpha = alpha
+        self.error_penalty = error_penalty
+        self.decay_seconds = decay_seconds
+        self.min_call_seconds = min_call_seconds  # failover only with at least this much time left
+        self._lock = threading.Lock()
+
+    @property
+    def model(self) -> str:
+        """The deployment name(s) behind the router, e.g. for cache keys and metric labels."""
+        return ",".join(sorted({d.deployment for d in self.deployments}))
+
+    def _fleet_latency(self) -> float:
+        """Average latency of the deployments with samples. Caller holds the lock."""
+        sampled = [d.latency for d in self.deployments if d.latency_samples]
+        return sum(sampled) / len(sampled) if sampled else 0.0
+
+    def _decayed(self, deployment: Deployment, now: float, fleet_latency: float) -> tuple:
+        """(latency, error_rate) after fading for the time since the last sample. Caller holds the lock."""
+        latency = deployment.latency if deployment.latency_samples else fleet_latency
+        if deployment.updated_at is None or self.decay_seconds <= 0:
+            return latency, deployment.error_rate
+        keep = 0.5 ** ((now - deployment.updated_at) / self.decay_seconds)
+        return fleet_latency + (latency - fleet_latency) * keep, deployment.error_rate * keep
+
+    def _score(self, deployment: Deployment, now: float, fleet_latency: float) -> float:
+        latency, error_rate = self._decayed(deployment, now, fleet_latency)
+        return (max(latency, 1e-3) * (deployment.in_flight + 1)
+                * (1 + self.error_penalty * error_rate) / deployment.weight)
+
+    def score(self, deployment: Deployment) -> float:
+        """Current routing score of a deployment; lower is better."""
+        with self._lock:
+            return self._score(deployment, time.monotonic(), self._fleet_latency())
+
+    def choose(self, exclude=()) -> Deployment:
+        """
+        The deployment for the next attempt, skipping `exclude` and those
+        whose breaker is open. Raises CircuitOpenError when none is left.
+        """
+        candidates = [d for d in self.deployments if d not in exclude]
+        while candidates:
+            pair = random.sample(candidates, 2) if len(candidates) > 2 else candidates
+            with self._lock:
+                now, fleet_latency = time.monotonic(), self._fleet_latency()
+                chosen = min(pair, key=lambda d: self._score(d, now, fleet_latency))
+            if chosen.breaker.allow_request():
+                return chosen
+            candidates.remove(chosen)
+        raise CircuitOpenError("No Azure OpenAI deployment is available")
+
+    def _start(self, deployment: Deployment) -> float:
+        with self._lock:
+            deployment.in_flight += 1
+        return service_clock()  # the deployment's limiter queue is not its latency
+
+    def _finish(self, deployment: Deployment, start: float, error: BaseException = None,
+                cancelled: bool = False) -> None:
+        """Record one attempt: in-flight count, EWMAs, breaker and metrics."""
+        latency = service_clock() - start
+        reason = _failover_reason(error) if isinstance(error, Exception) else None
+        with self._lock:
+            deployment.in_flight -= 1
+            if cancelled:
+                return
+            now = time.monotonic()
+            faded_latency, deployment.error_rate = self._decayed(deployment, now, self._fleet_latency())
+            if deployment.latency_samples:
+                deployment.latency = faded_latency
+            # A fast 429 or refused connection says nothing about how quickly it answers
+            if error is None or reason == "timeout":
+                if deployment.latency_samples == 0:
+                    deployment.latency = latency
+                else:
+                    deployment.latency += self.alpha * (latency - deployment.latency)
+                deployment.latency_samples += 1
+            deployment.error_rate += self.alpha * ((error is not None) - deployment.error_rate)
+            deployment.updated_at = now
+            _deployment_latency.set(deployment.latency, deployment=deployment.name)
+            _deployment_error_rate.set(deployment.error_rate, deployment=deployment.name)
+
+        # As in llm.py, a 429 or another 4xx means the deployment is up: it only
+        # affects the score. A call refused by the rate limiter never reached it.
+        if error is not None and is_transient_failure(error):
+            deployment.breaker.record_failure(latency, error)
+        elif reason != "rate_limited":
+            deployment.breaker.record_success(latency)
+        _deployment_calls.inc(deployment=deployment.name,
+                              outcome="ok" if error is None else reason or "error")
+
+    def _next(self, tried: list, error: Exception, timeout: float, started: float):
+        """(deployment, timeout) of the next attempt; re-raises `error` when failover is not possible."""
+        remaining = None if timeout is None else timeout - (time.perf_counter() - started)
+        if error is not None and remaining is not None and remaining < self.min_call_seconds:
+            raise error
+        try:
+            deployment = self.choose(tried)
+        except CircuitOpenError:
+            if error is not None:
+                raise error
+            raise
+        if error is not None:
+            reason = _failover_reason(error)
+            _deployment_failovers.inc(deployment=tried[-1].name, reason=reason)
+            log.info("Failing over from %s to %s (%s)", tried[-1].name, deployment.name, reason)
+        return deployment, remaining
+
+    def call(self, fn, timeout: float = None):
+        """
+        fn(deployment, timeout) on the best deployment, failing over to the
+        others on retryable errors. `timeout` is the time allowed for the
+        whole call; each attempt gets what is left of it.
+        """
+        started = time.perf_counter()
+        tried, error = [], None
+        while True:
+            deployment, remaining = self._next(tried, error, timeout, started)
+            start = self._start(deployment)
+            try:
+                result = fn(deployment, remaining)
+            except Exception as e:
+                self._finish(deployment, start, e)
+                if _failover_reason(e) is None:
+                    raise
+                tried.append(deployment)
+                error = e
+                continue
+            except BaseException:
+                self._finish(deployment, start, cancelled=True)
+                raise
+            self._finish(deployment, start)
+            return result
+
+    async def acall(self, fn, timeout: float = None):
+        """Async twin of call(); fn returns an awaitable."""
+        started = time.perf_counter()
+        tried, error = [], None
+        while True:
+            deployment, remaining = self._next(tried, error, timeout, started)
+            start = self._start(deployment)
+            try:
+                result = await fn(deployment, remaining)
+            except Exception as e:
+                self._finish(deployment, start, e)
+                if _failover_reason(e) is None:
+                    raise
+                tried.append(deployment)
+                error = e
+                continue
+            except BaseException:  # cancelled
+                self._finish(deployment, start, cancelled=True)
+                raise
+            self._finish(deployment, start)
+            return result
+
+    def snapshot(self) -> list:
+        """Per-deployment routing state (for /health)."""
+        with self._lock:
+            now, fleet_latency = time.monotonic(), self._fleet_latency()
+            rows = []
+            for d in self.deployments:
+                latency, error_rate = self._decayed(d, now, fleet_latency)
+                rows.append({
+                    "name": d.name,
+                    "deployment": d.deployment,
+                    "weight": d.weight,
+                    "latency_ms": round(latency * 1000, 1),
+                    "error_rate": round(error_rate, 3),
+                    "in_flight": d.in_flight,
+                    "score": round(self._score(d, now, fleet_latency), 4),
+                })
+        for row, d in zip(rows, self.deployments):
+            row["breaker"] = d.breaker.state
+        return rows
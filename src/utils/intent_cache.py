@@ -0,0 +1,104 @@
+"""
+In-process TTL + LRU cache for classification results.
+
+Real traffic repeats the same short Hinglish replies all day ("payment ho
+gaya hai", "baad mein call karo"), so paid LLM classifications are kept
+and reused. Keys combine the normalised utterance with the prompt/model
+version, so changing the prompt or deployment never serves stale answers.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from .metrics import counter, gauge
+
+
+_cache_requests = counter(
+    "cache_requests_total", "Cache lookups by cache and result (hit/miss)", ("cache", "result")
+)
+_cache_evictions = counter(
+    "cache_evictions_total", "Cache evictions by cache and reason (lru/ttl)", ("cache", "reason")
+)
+_cache_size = gauge("cache_entries", "Current number of cache entries", ("cache",))
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_utterance(text: str) -> str:
+    """
+    Canonical form of a customer utterance for cache keys.
+    Lowercases, collapses whitespace and drops trailing '.'/'!' (but keeps
+    '?', which separates questions from statements for the classifier).
+    """
+    text = _WHITESPACE.sub(" ", (text or "").strip().lower())
+    return text.rstrip(".! ")
+
+
+class TTLCache:
+    """
+    Thread-safe mapping with a size bound (LRU eviction) and per-entry TTL.
+    Hits, misses and evictions are recorded under the cache's name.
+    """
+
+    def __init__(self, name: str, maxsize: int = 10000, ttl: float = 86400):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return the cached value, or None on a miss or expired entry."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._data[key]
+                _cache_evictions.inc(cache=self.name, reason="ttl")
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                _cache_requests.inc(cache=self.name, result="miss")
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            _cache_requests.inc(cache=self.name, result="hit")
+            return entry[1]
+
+    def set(self, key, value) -> None:
+        """Store a value, evicting the least recently used entries if full."""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                _cache_evictions.inc(cache=self.name, reason="lru")
+            _cache_size.set(len(self._data), cache=self.name)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+            _cache_size.set(0, cache=self.name)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
@@ -0,0 +1,165 @@
+"""
+Local statistical intent model (the tier between the rules and Azure OpenAI).
+
+A multinomial logistic regression over hashed features of the normalised
+utterance: character 2-4 grams (robust to Hinglish spelling variants such as
+"kar diya" / "kr diya") plus whole words. Pure Python, no extra
+dependencies; prediction is a few dictionary lookups per feature, well
+under a millisecond. Logistic regression is used rather than naive Bayes
+because its probabilities are far better calibrated, which is what the
+acceptance threshold relies on.
+
+Trained offline by scripts/train_intent_model.py from the 180-case suite
+plus LLM-labelled production utterances, and saved as a small JSON
+artifact that stores weights only for feature buckets seen in training.
+"""
+
+import json
+import math
+import os
+import random
+import zlib
+
+from .intent_cache import normalize_utterance
+
+
+MODEL_FORMAT_VERSION = 1
+
+DEFAULT_NUM_BUCKETS = 2 ** 18
+DEFAULT_NGRAM_RANGE = (2, 4)
+DEFAULT_EPOCHS = 30
+DEFAULT_LEARNING_RATE = 0.5
+DEFAULT_L2 = 1e-4
+
+
+def extract_features(text: str, ngram_range: tuple = DEFAULT_NGRAM_RANGE) -> list:
+    """Character n-grams (with word-boundary padding) and words of the normalised text."""
+    normalized = normalize_utterance(text)
+    padded = f" {normalized} "
+    features = []
+    low, high = ngram_range
+    for n in range(low, high + 1):
+        features.extend(f"c:{padded[i:i + n]}" for i in range(len(padded) - n + 1))
+    features.extend(f"w:{word}" for word in normalized.split())
+    return features
+
+
+def hash_features(features: list, num_buckets: int) -> dict:
+    """
+    Map features to {bucket: weight}, L2-normalised so long and short
+    utterances are on the same scale. crc32 is stable across processes,
+    unlike hash().
+    """
+    counts = {}
+    for feature in features:
+        bucket = zlib.crc32(feature.encode("utf-8")) % num_buckets
+        counts[bucket] = counts.get(bucket, 0) + 1
+    norm = math.sqrt(sum(c * c for c in counts.values())) or 1.0
+    return {bucket: count / norm for bucket, count in counts.items()}
+
+
+def _softmax(scores: list) -> list:
+    best = max(scores)
+    exp_scores = [math.exp(score - best) for score in scores]
+    total = sum(exp_scores)
+    return [value / total for value in exp_scores]
+
+
+class IntentModel:
+    """Softmax (multinomial logistic) regression over hashed n-gram features."""
+
+    def __init__(self, num_buckets: int = DEFAULT_NUM_BUCKETS, ngram_range: tuple = DEFAULT_NGRAM_RANGE):
+        self.num_buckets = num_buckets
+        self.ngram_range = tuple(ngram_range)
+        self.labels = []
+        self.bias = []
+        self.weights = {}  # bucket -> [weight per label]
+        self.trained_examples = 0
+
+    def _vectorize(self, text: str) -> dict:
+        return hash_features(extract_features(text, self.ngram_range), self.num_buckets)
+
+    def _scores(self, vector: dict) -> list:
+        scores = list(self.bias)
+        for bucket, value in vector.items():
+            row = self.weights.get(bucket)
+            if row is not None:
+                for i, weight in enumerate(row):
+                    scores[i] += weight * value
+        return scores
+
+    def fit(self, examples: list, epochs: int = DEFAULT_EPOCHS, learning_rate: float = DEFAULT_LEARNING_RATE,
+            l2: float = DEFAULT_L2, seed: int = 0) -> "IntentModel":
+        """Train from (text, intent) pairs with plain SGD on the cross-entropy loss."""
+        self.labels = sorted({label for _text, label in examples})
+        index = {label: i for i, label in enumerate(self.labels)}
+        num_labels = len(self.labels)
+        self.bias = [0.0] * num_labels
+        self.weights = {}
+        self.trained_examples = len(examples)
+
+        data = [(self._vectorize(text), index[label]) for text, label in examples]
+        rng = random.Random(seed)
+        decay = 1 - learning_rate * l2
+        for _epoch in range(epochs):
+            rng.shuffle(data)
+            for vector, target in data:
+                probs = _softmax(self._scores(vector))
+                for i in range(num_labels):
+                    gradient = probs[i] - (i == target)
+                    self.bias[i] -= learning_rate * gradient
+                    for bucket, value in vector.items():
+                        row = self.weights.get(bucket)
+                        if row is None:
+                            row = self.weights[bucket] = [0.0] * num_labels
+                        row[i] = row[i] * decay - learning_rate * gradient * value
+        return self
+
+    def predict_proba(self, text: str) -> dict:
+        """Probability of every intent for an utterance."""
+        return dict(zip(self.labels, _softmax(self._scores(self._vectorize(text)))))
+
+    def predict(self, text: str) -> tuple:
+        """Most likely intent and its probability."""
+        proba = self.predict_proba(text)
+        label = max(proba, key=proba.get)
+        return label, proba[label]
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def to_dict(self) -> dict:
+        return {
+            "format_version": MODEL_FORMAT_VERSION,
+            "num_buckets": self.num_buckets,
+            "ngram_range": list(self.ngram_range),
+            "trained_examples": self.trained_examples,
+            "labels": self.labels,
+            "bias": [round(b, 4) for b in self.bias],
+            "weights": {str(bucket): [round(w, 4) for w in row] for bucket, row in sorted(self.weights.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "IntentModel":
+        if data.get("format_version") != MODEL_FORMAT_VERSION:
+            raise ValueError(f"Unsupported intent model format: {data.get('format_version')}")
+
+        model = cls(data["num_buckets"], tuple(data["ngram_range"]))
+        model.trained_examples = data["trained_examples"]
+        model.labels = data["labels"]
+        model.bias = data["bias"]
+        model.weights = {int(bucket): row for bucket, row in data["weights"].items()}
+        return model
+
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str) -> "IntentModel":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,421 @@
+"""
+Compiled rule-based intent classifier.
+
+Every phrase list is compiled once, at import, into a single alternation
+regex (built from a prefix trie, so shared prefixes such as "payment ..."
+are matched once) with word-boundary guards. Classification returns an
+intent plus a confidence value:
+
+- exact ambiguous inputs ("hi", "kya?", "ok") and strong phrase matches are
+  high confidence and can be trusted without an LLM call;
+- the looser keyword tier is low confidence;
+- no match at all is "unknown" with zero confidence.
+
+Callers send only low-confidence inputs to Azure OpenAI.
+"""
+
+import re
+
+
+# Confidence assigned per rule tier
+CONFIDENCE_EXACT = 0.95    # exact ambiguous inputs (greetings, bare questions)
+CONFIDENCE_PHRASE = 0.9    # strong, specific phrase matches
+CONFIDENCE_KEYWORD = 0.6   # loose keyword matches
+CONFIDENCE_NONE = 0.0      # nothing matched
+
+
+# ------------------------------------------------------------------
+# Phrase lists
+# ------------------------------------------------------------------
+
+# Ambiguous inputs (classified "unknown" with high confidence)
+
+AMBIGUOUS_EXACT = [
+    # Simple greetings
+    "hi", "hello", "hey",
+    # Simple questions (single word or very short)
+    "kya?", "kaise?", "kyun?", "kahan?", "kab?", "kaun?", "kya hua?", "kya baat hai?",
+    # Confirmation words (without context)
+    "haan", "nahi", "theek hai", "achha", "ok", "okay",
+    # Requests for clarification
+    "samajh nahi aaya", "aap kya keh rahe hain?", "aap kya bol rahe hain?",
+    "explain kar sakte hain?", "kya matlab hai?", "mujhe samajh nahi aaya",
+    # Wait phrases
+    "wait", "ruko", "thoda ruko", "ek minute", "just a moment",
+    # Generic responses
+    "batao", "suno", "dekho",
+    # Identity questions
+    "yeh kaun hai?"
+]
+
+SHORT_CONFIRMATIONS = [
+    "haan", "nahi", "ok", "okay", "theek hai", "achha",
+]
+
+QUESTION_WORDS = [
+    "kya", "kaise", "kyun", "kahan", "kab", "kaun", "kya hua", "kya baat hai",
+]
+
+WAIT_PHRASES = [
+    "wait", "ruko", "thoda ruko", "ek minute", "just a moment",
+]
+
+CLARIFICATION_PHRASES = [
+    "samajh nahi", "kya matlab", "explain", "yeh kaun hai",
+]
+
+# Strong phrase tier (including Hinglish)
+
+PAID_PHRASES = [
+    "already paid", "already made payment", "already cleared",
+    "payment done", "payment made", "payment cleared", "payment completed",
+    "i paid", "i've paid", "i have paid", "i made payment", "i cleared",
+    "paid last week", "paid yesterday", "paid today", "paid it",
+    "made the payment", "cleared the payment", "settled the payment",
+    "transferred", "transferred the amount", "sent the money",
+    "payment was made", "payment is done", "already settled",
+    "cleared my dues", "paid my dues", "settled my account",
+    # Hinglish phrases - expanded patterns
+    "main ne pay kar diya", "payment ho gaya", "payment kar diya",
+    "main ne payment kar di", "payment clear ho gaya", "dues clear kar di",
+    "main ne transfer kar diya", "amount transfer ho gaya", "paise bhej diye",
+    "main ne pehle hi payment kar diya", "pehle hi payment", "pehle hi pay",
+    "payment ho gaya hai", "payment kar diya hai", "payment kar di thi",
+    "transfer kar diya", "amount transfer", "transfer ho chuka",
+    "dues clear ho gaye", "clear ho gaye hain", "dues clear",
+    "sab paise de diye", "full amount pay kar diya", "loan clear kar diya",
+    "pehle hi settle kar diya", "settle kar diya", "settle ho gaya",
+    "payment receipt bhej di", "receipt bhej di", "proof bhej diya",
+    "payement successfull ho gya", "payment successful ho gaya", "payment success ho gaya",
+    "upi se transfer", "bank se payment", "cheque bhej diya",
+    "online payment kar diya", "payment done hai", "emi pay kar di",
+    "account clear ho gaya", "payment process ho gaya", "payment confirm",
+    "amount deduct ho gaya", "payment kar di thi kal", "receipt mil gaya",
+    # Additional patterns for successful payments
+    "transaction complete ho gaya", "payment successful ho gaya",
+    "transaction complete", "payment successful", "payment successful hai",
+    "transaction successful", "transaction successful hai", "complete ho gaya",
+    "successful ho gaya", "successfully done", "successfully completed"
+]
+
+UNABLE_PHRASES = [
+    "lost my job", "lost job", "no job", "unemployed", "jobless",
+    "no money", "no funds", "no cash", "broke", "out of money",
+    "can't afford", "cant afford", "cannot afford", "unable to afford",
+    "financial crisis", "financial difficulty", "financial trouble",
+    "struggling", "struggling financially", "going through tough times",
+    "difficult situation", "hard time", "tough time",
+    "no income", "no salary", "no earnings", "no source of income",
+    "medical emergency", "family emergency", "emergency expenses",
+    # Hinglish phrases - expanded patterns
+    "naukri chali gayi", "job nahi hai", "paise nahi hain",
+    "afford nahi kar sakta", "paisa nahi hai", "financial problem hai",
+    "mushkil mein hoon", "paise ki problem hai", "income nahi hai",
+    # Additional patterns for inability to pay
+    "kuch bhi pay nahi kar sakta", "kuch nahi de sakta", "kuch bhi nahi de sakta",
+    "paise nahi de sakta", "pay nahi kar sakta", "payment nahi kar sakta",
+    "salary bandh ho gayi", "salary bandh", "income source bandh",
+    "savings khatam ho gayi", "savings khatam", "funds khatam",
+    "financial condition theek nahi", "financial situation kharab",
+    "financial condition kharab", "financial situation theek nahi",
+    "financially weak", "financially unstable", "financially unable",
+    "funds available nahi", "resources nahi hain", "money available nahi",
+    "paise de sakta right now", "abhi paise nahi", "right now paise nahi",
+    "job chali gayi", "naukri chali gayi hai", "income source bandh ho gayi",
+    "mere paas funds nahi", "mere paas money nahi", "mere paas paise nahi",
+    "main financially struggling", "main financially weak", "main financially unstable"
+]
+
+DISPUTE_PHRASES = [
+    "never took", "never borrowed", "never applied", "never had",
+    "haven't taken", "havent taken", "didn't take", "didnt take",
+    "not my loan", "not my account", "not my debt", "not mine",
+    "don't owe", "dont owe", "do not owe", "i don't owe",
+    "this is wrong", "this is incorrect", "this is not mine",
+    "this is not my", "this doesn't belong", "this is fraud",
+    "i didn't take", "i never took", "i never borrowed",
+    "doesn't seem right", "doesnt seem right", "does not seem right",
+    "not right", "seems wrong", "looks wrong", "appears wrong",
+    "mistake", "error", "fraud", "fraudulent", "identity theft",
+    "someone else", "wrong person", "not me", "i don't know about this",
+    "i never applied", "i never signed", "unauthorized", "not authorized",
+    # Hinglish phrases - expanded patterns
+    "maine liya hi nahi", "yeh mera nahi hai", "yeh galat hai",
+    "maine kabhi nahi liya", "yeh meri loan nahi hai", "yeh fraud hai",
+    "mujhe nahi pata", "galat person", "yeh mera account nahi hai",
+    "yeh loan mera nahi", "loan mera nahi hai", "yeh loan kabhi nahi liya",
+    "yeh galat hai mujhe", "kuch nahi dena", "fraud lagta hai",
+    "yeh mera account nahi", "loan apply nahi kiya", "kabhi yeh loan nahi",
+    "yeh mistake hai", "wrong person hai", "yeh debt nahi liya",
+    "unauthorized transaction", "loan sign nahi kiya", "identity theft lagta",
+    "loan approve nahi kiya", "meri responsibility nahi", "loan accept nahi",
+    "error hai system", "loan acknowledge nahi", "meri liability nahi",
+    "loan authorize nahi", "fake loan hai", "loan verify nahi",
+    "meri mistake nahi", "loan process nahi", "wrong account hai",
+    "loan document nahi sign", "meri fault nahi", "loan agree nahi",
+    "incorrect information hai"
+]
+
+# A dispute phrase in a hardship context is not a dispute...
+FINANCIAL_HARDSHIP_CONTEXT = [
+    "financial condition", "financial situation", "financial problem",
+    "financially", "income", "salary", "funds", "savings", "paise",
+    "naukri", "job", "struggling", "weak", "unstable", "crisis"
+]
+
+# ...unless the text also denies the loan itself
+LOAN_DENIAL_WORDS = [
+    "loan", "debt", "account", "mera nahi", "meri nahi", "liya", "kiya", "sign",
+    "approve", "apply",
+]
+
+CALLBACK_PHRASES = [
+    "call later", "call me later", "call back", "callback",
+    "call me next week", "call me next month", "call me tomorrow",
+    "call me next time", "call me some other time",
+    "call you back", "call back later", "call back tomorrow",
+    "next week", "next month", "tomorrow", "some other time",
+    "busy now", "busy right now", "busy at the moment", "busy currently",
+    "not available", "not available now", "not available right now",
+    "out of town", "currently out", "away", "travelling", "traveling",
+    "can't talk now", "cant talk now", "cannot talk now",
+    "not a good time", "bad time", "inconvenient time",
+    "later please", "please call later", "call me when convenient",
+    # Hinglish phrases - expanded patterns
+    "baad mein call karo", "abhi busy hoon", "abhi available nahi hoon",
+    "kal call karo", "baad mein baat karte hain", "abhi time nahi hai",
+    "ghar se bahar hoon", "travel kar raha hoon", "abhi baat nahi kar sakta",
+    "aap baad mein call kar sakte", "baad mein call kar sakte hain",
+    "abhi busy hoon kal", "available nahi hoon next week", "next week call karo",
+    "out of town hoon", "next month call karo", "baat nahi kar sakta baad mein",
+    "kal call karo please", "office mein hoon", "next week call kar lena",
+    "time nahi hai evening", "travel kar raha hoon baad mein", "meeting mein hoon",
+    "tomorrow call karo", "abhi driving kar raha", "weekend mein call karo",
+    "convenient nahi hai", "baad mein call kar lena", "ghar par nahi hoon",
+    "discuss nahi kar sakta", "kal subah call karo", "hospital mein hoon",
+    "evening mein call karo", "baat karne ka time nahi", "available rahunga",
+    "family ke saath hoon", "baad mein call kar lena please", "busy hoon later",
+    "tomorrow evening call karo", "important work mein hoon", "next week call"
+]
+
+WILLING_PHRASES = [
+    "i want to pay", "i will pay", "i can pay", "i'd like to pay",
+    "ready to pay", "willing to pay", "prepared to pay",
+    "installment", "installments", "monthly payment", "monthly installments",
+    "payment plan", "payemnt plan", "pay plan", "repayment plan",
+    "can i pay in", "can pay in", "pay in installments", "pay in parts",
+    "emi", "equated monthly installment", "monthly emi",
+    "work out a plan", "work out payment", "work something out",
+    "can't pay full", "cant pay full", "cannot pay full",
+    "can't pay in full", "cant pay in full", "cannot pay in full",
+    "can't pay the full", "cant pay the full", "cannot pay the full",
+    "can't pay full amount", "cant pay full amount", "cannot pay full amount",
+    "can pay partial", "can pay some", "can pay part", "can pay portion",
+    "partial payment", "pay partial", "pay some", "pay part",
+    "pay later", "pay next month", "pay after", "pay when",
+    "let's work", "let us work", "we can work", "we can arrange",
+    "interested in paying", "want to settle", "want to clear",
+    "can manage", "can arrange", "can figure out", "can work something out",
+    # Payment options requests
+    "payment options", "payment option", "show payment options", "show me payment options",
+    "i'd like to see payment options", "i would like to see payment options",
+    "i want to see payment options", "want to see payment options",
+    "can i see payment options", "can you show payment options",
+    "what are my options", "what options do i have", "what are the options",
+    "options please", "show options", "show me options",
+    "what can you offer", "can you offer", "do you have options",
+    "i'd like options", "i would like options", "want options",
+    # Hinglish phrases - expanded patterns
+    "main pay kar sakta hoon", "emi chahiye", "payment plan de do",
+    "installment mein pay kar sakta hoon", "monthly pay kar sakta hoon",
+    "full amount nahi de sakta", "thoda thoda pay kar sakta hoon",
+    "payment options dikhao", "kya options hain", "payment kar sakta hoon",
+    "settle kar sakta hoon", "clear kar sakta hoon", "manage kar sakta hoon",
+    "pay karna chahta hoon", "pay karne ko ready", "pay karne ko willing",
+    "installments mein pay", "kya main installments mein", "monthly installments de sakta",
+    "payment options dikhao", "kya options hain", "monthly basis par pay",
+    "thoda thoda pay", "payment karne ko ready", "emi plan chahiye",
+    "pay kar sakta hoon but installments", "payment options kya hain",
+    "settle kar sakta hoon but plan", "monthly pay kar sakta",
+    "kya main payment plan le sakta", "pay karne ko interested",
+    "payment options batao", "monthly emi de sakta", "payment plan choose",
+    "monthly basis par", "settle kar sakta installment mein",
+    "payment plan select", "options chahiye", "payment plan ke liye ready"
+]
+
+# Loose keyword tier (low confidence)
+
+PAID_KEYWORDS = [
+    "pay kar diya", "payment kar diya", "transfer kar diya", "clear kar diya",
+    "settle kar diya", "ho gaya hai", "kar di thi", "bhej diya", "receipt",
+]
+
+# Future/ability phrasing is not a past payment
+PAID_KEYWORD_EXCLUSIONS = [
+    "nahi kar sakta", "nahi de sakta", "karna chahta", "kar sakta hoon",
+    "kar sakta", "chahta hoon",
+]
+
+DISPUTE_KEYWORDS = [
+    "mera nahi hai", "nahi hai", "galat hai", "fraud", "wrong", "mistake hai",
+    "nahi liya", "nahi kiya", "nahi sign", "nahi approve", "meri nahi",
+]
+
+# Denial keywords about payment ability are not disputes
+FINANCIAL_HARDSHIP_INDICATORS = [
+    "pay kar sakta", "payment kar sakta", "de sakta", "afford", "paise",
+    "financial", "financially", "income", "salary", "funds", "savings",
+    "naukri", "job", "struggling", "weak", "unstable", "crisis", "problem",
+    "khatam", "bandh", "nahi hain", "available nahi", "resources"
+]
+
+UNABLE_INDICATORS = [
+    "nahi de sakta", "nahi kar sakta", "pay nahi", "payment nahi",
+    "salary bandh", "income source", "savings khatam", "funds nahi",
+    "financial condition", "financial situation", "financially weak",
+    "financially unstable", "paise available nahi", "resources nahi"
+]
+
+# Inability phrasing with willingness signals is "willing"
+UNABLE_INDICATOR_EXCLUSIONS = [
+    "pay kar sakta", "payment kar sakta", "installment", "emi", "plan chahiye",
+    "options chahiye", "willing", "ready",
+]
+
+CALLBACK_KEYWORDS = [
+    "call karo", "call kar", "baad mein", "kal", "tomorrow", "next week",
+    "next month", "busy hoon", "available nahi", "time nahi", "call sakte",
+]
+
+WILLING_KEYWORDS = [
+    "pay kar sakta", "payment kar sakta", "emi", "installment", "plan chahiye",
+    "options chahiye", "karna chahta", "ready hoon", "willing", "chahta hoon",
+]
+
+
+# ------------------------------------------------------------------
+# Compilation
+# ------------------------------------------------------------------
+
+def _trie_pattern(phrases: list) -> str:
+    """
+    Regex alternation for a phrase list, factored through a prefix trie so
+    the regex engine never re-scans a shared prefix once per phrase.
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}  # end of phrase
+
+    def build(node: dict) -> str:
+        is_end = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not is_end:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if is_end else group
+
+    return build(trie)
+
+
+def compile_phrases(phrases: list) -> re.Pattern:
+    """
+    Compile a phrase list into one regex that matches any phrase as whole
+    words. (?<!\\w)/(?!\\w) are used instead of \\b so phrases ending in
+    punctuation ("kya?") still match at the end of the text.
+    """
+    unique = sorted({p.lower() for p in phrases})
+    return re.compile(r"(?<!\w)" + _trie_pattern(unique) + r"(?!\w)")
+
+
+_AMBIGUOUS_EXACT = frozenset(AMBIGUOUS_EXACT)
+_SHORT_GREETINGS = frozenset(["hi", "hello", "hey"])
+_SHORT_CONFIRMATIONS = frozenset(SHORT_CONFIRMATIONS)
+
+_QUESTION_WORDS = compile_phrases(QUESTION_WORDS)
+_WAIT = compile_phrases(WAIT_PHRASES)
+_CLARIFICATION = compile_phrases(CLARIFICATION_PHRASES)
+
+_PAID = compile_phrases(PAID_PHRASES)
+_UNABLE = compile_phrases(UNABLE_PHRASES)
+_DISPUTE = compile_phrases(DISPUTE_PHRASES)
+_FINANCIAL_HARDSHIP_CONTEXT = compile_phrases(FINANCIAL_HARDSHIP_CONTEXT)
+_LOAN_DENIAL = compile_phrases(LOAN_DENIAL_WORDS)
+_CALLBACK = compile_phrases(CALLBACK_PHRASES)
+_WILLING = compile_phrases(WILLING_PHRASES)
+
+_PAID_KEYWORDS = compile_phrases(PAID_KEYWORDS)
+_PAID_KEYWORD_EXCLUSIONS = compile_phrases(PAID_KEYWORD_EXCLUSIONS)
+_DISPUTE_KEYWORDS = compile_phrases(DISPUTE_KEYWORDS)
+_FINANCIAL_HARDSHIP_INDICATORS = compile_phrases(FINANCIAL_HARDSHIP_INDICATORS)
+_UNABLE_INDICATORS = compile_phrases(UNABLE_INDICATORS)
+_UNABLE_INDICATOR_EXCLUSIONS = compile_phrases(UNABLE_INDICATOR_EXCLUSIONS)
+_CALLBACK_KEYWORDS = compile_phrases(CALLBACK_KEYWORDS)
+_WILLING_KEYWORDS = compile_phrases(WILLING_KEYWORDS)
+
+
+# ------------------------------------------------------------------
+# Classification
+# ------------------------------------------------------------------
+
+def classify_with_confidence(prompt: str) -> tuple:
+    """
+    Tiered rule-based classification.
+    Returns (intent, confidence); see the CONFIDENCE_* constants.
+    """
+    text = prompt.lower().strip()
+
+    # Ambiguous inputs (greetings, bare questions, confirmations) are
+    # confidently "unknown" - no LLM can do better without context
+    if text in _AMBIGUOUS_EXACT:
+        return "unknown", CONFIDENCE_EXACT
+
+    words = text.split()
+    if len(words) <= 3:
+        if text in _SHORT_GREETINGS or text in _SHORT_CONFIRMATIONS:
+            return "unknown", CONFIDENCE_EXACT
+        if text.endswith("?") and len(words) <= 2 and _QUESTION_WORDS.search(text):
+            return "unknown", CONFIDENCE_EXACT
+        if _WAIT.search(text) or _CLARIFICATION.search(text):
+            return "unknown", CONFIDENCE_EXACT
+
+    # Strong phrase tier (order matters: hardship is checked before dispute
+    # to avoid false positives)
+    if _PAID.search(text):
+        return "paid", CONFIDENCE_PHRASE
+
+    if _UNABLE.search(text):
+        return "unable", CONFIDENCE_PHRASE
+
+    if _DISPUTE.search(text):
+        # Skip only when it is clearly about financial condition, not loan denial
+        if not _FINANCIAL_HARDSHIP_CONTEXT.search(text) or _LOAN_DENIAL.search(text):
+            return "disputed", CONFIDENCE_PHRASE
+
+    if _CALLBACK.search(text):
+        return "callback", CONFIDENCE_PHRASE
+
+    if _WILLING.search(text):
+        return "willing", CONFIDENCE_PHRASE
+
+    # Loose keyword tier
+    if _PAID_KEYWORDS.search(text) and not _PAID_KEYWORD_EXCLUSIONS.search(text):
+        return "paid", CONFIDENCE_KEYWORD
+
+    if _DISPUTE_KEYWORDS.search(text) and not _FINANCIAL_HARDSHIP_INDICATORS.search(text):
+        return "disputed", CONFIDENCE_KEYWORD
+
+    if _UNABLE_INDICATORS.search(text) and not _UNABLE_INDICATOR_EXCLUSIONS.search(text):
+        return "unable", CONFIDENCE_KEYWORD
+
+    if _CALLBACK_KEYWORDS.search(text):
+        return "callback", CONFIDENCE_KEYWORD
+
+    if _WILLING_KEYWORDS.search(text):
+        return "willing", CONFIDENCE_KEYWORD
+
+    return "unknown", CONFIDENCE_NONE
@@ -6,13 +6,44 @@ Supports Hinglish (Hindi-English mix) for Indian customers.
 """
 
 from dotenv import load_dotenv
+import asyncio
+import hashlib
+import json
 import os
+import textwrap
+import threading
+import time
+import weakref
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field, ValidationError
 
 # Disable LangSmith tracing to avoid rate limits
 os.environ['LANGCHAIN_TRACING_V2'] = 'false'
 
 load_dotenv()
 
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .deployment_router import Deployment, DeploymentRouter, parse_deployments
+from .intent_cache import TTLCache, normalize_utterance
+from .intent_model import IntentModel
+from .metrics import counter, histogram
+from .plan_cache import PlanCache
+from .plan_engine import build_payment_plans
+from .prompt_budget import count_message_tokens, record_token_usage
+from .rate_limiter import RateLimiter, RateLimitExceeded, service_clock
+from .retry import RetryPolicy, acall_with_retries, call_with_retries, is_transient_failure, retry_reason
+from .single_flight import FlightTimeout, SingleFlight
+from .intent_rules import classify_with_confidence
+from .llm_provider import LLMProvider, LocalLLMProvider
+from .log import get_logger
+from .sqlite_store import get_sqlite_store, hash_key
+
+log = get_logger("llm")
+intent_log = get_logger("intent")
+plans_log = get_logger("plans")
+
 # ------------------------------------------------------------------
 # Configuration
 # ------------------------------------------------------------------
@@ -20,10 +51,101 @@ load_dotenv()
 # Azure OpenAI configuration
 AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT", "https://llm-3rdparty.cognitiveservices.azure.com/")
 AZURE_OPENAI_DEPLOYMENT = os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4.1-mini")
+
+# Where chat completions come from: "azure" or "local" (offline, see llm_provider.py)
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "azure").strip().lower()
 AZURE_OPENAI_MODEL = os.getenv("AZURE_OPENAI_MODEL", "gpt-4.1-mini")
 AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
 AZURE_OPENAI_API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION", "2024-12-01-preview")
 
+# Several endpoint/deployment pairs to route between (JSON list, see
+# deployment_router.py). Unset = the single deployment above.
+AZURE_OPENAI_DEPLOYMENTS = os.getenv("AZURE_OPENAI_DEPLOYMENTS", "").strip()
+LLM_ROUTER_EWMA_ALPHA = float(os.getenv("LLM_ROUTER_EWMA_ALPHA", "0.3"))
+LLM_ROUTER_ERROR_PENALTY = float(os.getenv("LLM_ROUTER_ERROR_PENALTY", "10"))
+LLM_ROUTER_DECAY_SECONDS = float(os.getenv("LLM_ROUTER_DECAY_SECONDS", "30"))
+
+# Client-side rate limit matched to the deployment's Azure quota (0 = off; per
+# routed deployment via "rpm"/"tpm"), see rate_limiter.py. Azure enforces the
+# quota over 1 s (or 10 s) windows and a bucket admits one burst on top of its
+# rate, so set the limits ~10% under the quota. Calls queue for up to
+# LLM_RATE_LIMIT_MAX_WAIT seconds (and never past the turn's deadline), then
+# fall back. LLM_RATE_LIMIT_DB shares
+# the quota between the workers on the host (SQLite file, may be
+# INTENT_CACHE_DB); unset = each process applies the full quota.
+AZURE_OPENAI_RPM_LIMIT = float(os.getenv("AZURE_OPENAI_RPM_LIMIT", "0"))
+AZURE_OPENAI_TPM_LIMIT = float(os.getenv("AZURE_OPENAI_TPM_LIMIT", "0"))
+LLM_RATE_LIMIT_BURST_SECONDS = float(os.getenv("LLM_RATE_LIMIT_BURST_SECONDS", "0.1"))
+LLM_RATE_LIMIT_MAX_WAIT = float(os.getenv("LLM_RATE_LIMIT_MAX_WAIT", "5"))
+LLM_RATE_LIMIT_DB = os.getenv("LLM_RATE_LIMIT_DB")
+
+# Intent cache configuration
+INTENT_CACHE_ENABLED = os.getenv("INTENT_CACHE_ENABLED", "true").strip().lower() == "true"
+INTENT_CACHE_SIZE = int(os.getenv("INTENT_CACHE_SIZE", "10000"))
+INTENT_CACHE_TTL_SECONDS = float(os.getenv("INTENT_CACHE_TTL_SECONDS", "86400"))
+
+# Rule matches at or above this confidence skip the LLM (see intent_rules.py)
+RULE_CONFIDENCE_THRESHOLD = float(os.getenv("RULE_CONFIDENCE_THRESHOLD", "0.75"))
+
+# Payment plan cache: LLM plans reused for every customer in the same amount
+# bucket and loan type, with rupee figures rescaled to the exact amount.
+# The persistent tier defaults to the intent cache's SQLite file.
+PLAN_CACHE_ENABLED = os.getenv("PLAN_CACHE_ENABLED", "true").strip().lower() == "true"
+PLAN_CACHE_SIZE = int(os.getenv("PLAN_CACHE_SIZE", "1000"))
+PLAN_CACHE_TTL_SECONDS = float(os.getenv("PLAN_CACHE_TTL_SECONDS", "86400"))
+PLAN_CACHE_BUCKET_RATIO = float(os.getenv("PLAN_CACHE_BUCKET_RATIO", "1.25"))
+PLAN_CACHE_DB = os.getenv("PLAN_CACHE_DB", os.getenv("INTENT_CACHE_DB"))
+PLAN_CACHE_DB_TTL_SECONDS = float(os.getenv("PLAN_CACHE_DB_TTL_SECONDS", str(30 * 86400)))
+
+# Identical chat completions already in flight are awaited and shared, not repeated
+LLM_SINGLE_FLIGHT = os.getenv("LLM_SINGLE_FLIGHT", "true").strip().lower() == "true"
+
+# Structured output for plan generation: "json_schema" (schema-constrained) or
+# "json_object" (JSON mode, for deployments without schema support)
+PLANS_RESPONSE_FORMAT = os.getenv("PLANS_RESPONSE_FORMAT", "json_schema").strip().lower()
+
+# Combined turn mode: one structured "turn" call returns the intent, the
+# commitment slots (amount, date, plan choice) and the draft reply (plus the
+# plans, when the turn needs LLM plans) instead of separate classify/plans/
+# negotiate calls. Uses PLANS_RESPONSE_FORMAT too.
+LLM_COMBINED_TURN = os.getenv("LLM_COMBINED_TURN", "false").strip().lower() == "true"
+
+# Local statistical model consulted after the rules and before Azure OpenAI
+# (trained by scripts/train_intent_model.py; empty path = disabled)
+INTENT_MODEL_PATH = os.getenv(
+    "INTENT_MODEL_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "models", "intent_model.json"),
+)
+INTENT_MODEL_THRESHOLD = float(os.getenv("INTENT_MODEL_THRESHOLD", "0.8"))
+
+# Optional persistent tier shared by all workers on the host (unset = disabled)
+INTENT_CACHE_DB = os.getenv("INTENT_CACHE_DB")
+INTENT_CACHE_DB_TTL_SECONDS = float(os.getenv("INTENT_CACHE_DB_TTL_SECONDS", str(30 * 86400)))
+INTENT_CACHE_DB_PRELOAD = int(os.getenv("INTENT_CACHE_DB_PRELOAD", "5000"))
+
+# Circuit breaker shared by every Azure OpenAI call on this worker: opens when
+# too many recent calls fail or are slow, then rejects calls (callers fall back
+# to rules/templates immediately) until the cooldown has passed
+LLM_BREAKER_FAILURE_RATE = float(os.getenv("LLM_BREAKER_FAILURE_RATE", "0.5"))
+LLM_BREAKER_SLOW_CALL_SECONDS = float(os.getenv("LLM_BREAKER_SLOW_CALL_SECONDS", "10"))
+LLM_BREAKER_SLOW_CALL_RATE = float(os.getenv("LLM_BREAKER_SLOW_CALL_RATE", "0.8"))
+LLM_BREAKER_WINDOW = int(os.getenv("LLM_BREAKER_WINDOW", "20"))
+LLM_BREAKER_MIN_CALLS = int(os.getenv("LLM_BREAKER_MIN_CALLS", "5"))
+LLM_BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "30"))
+
+# A call is not attempted with less than this much of the turn's budget left
+# (the caller uses its rule/template fallback instead)
+LLM_MIN_CALL_SECONDS = float(os.getenv("LLM_MIN_CALL_SECONDS", "0.3"))
+
+# Retries of throttled (429) and transient (5xx/timeout/connection) failures.
+# Jittered exponential backoff, Retry-After honoured, never past the deadline
+# (or LLM_RETRY_MAX_ELAPSED_SECONDS for calls without one). The SDK's own
+# retries are disabled so there is exactly one retry layer.
+LLM_RETRY_MAX_ATTEMPTS = int(os.getenv("LLM_RETRY_MAX_ATTEMPTS", "3"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.25"))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "4"))
+LLM_RETRY_MAX_ELAPSED_SECONDS = float(os.getenv("LLM_RETRY_MAX_ELAPSED_SECONDS", "15"))
+
 # Valid payment intent classifications
 ALLOWED_INTENTS = [
     "paid",
@@ -38,53 +160,672 @@ ALLOWED_INTENTS = [
 # Azure OpenAI integration (PRIMARY CLASSIFIER)
 # ------------------------------------------------------------------
 
+# Shared HTTP transport of the Azure OpenAI clients. The defaults keep idle
+# connections long enough to survive the pauses between a customer's turns
+# (httpx drops them after 5 s) and keep as many idle as may be busy at once.
+AZURE_OPENAI_MAX_CONNECTIONS = int(os.getenv("AZURE_OPENAI_MAX_CONNECTIONS", "100"))
+AZURE_OPENAI_MAX_KEEPALIVE = int(os.getenv("AZURE_OPENAI_MAX_KEEPALIVE", str(AZURE_OPENAI_MAX_CONNECTIONS)))
+AZURE_OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("AZURE_OPENAI_KEEPALIVE_EXPIRY", "120"))
+AZURE_OPENAI_CONNECT_TIMEOUT = float(os.getenv("AZURE_OPENAI_CONNECT_TIMEOUT", "5"))
+AZURE_OPENAI_HTTP2 = os.getenv("AZURE_OPENAI_HTTP2", "false").strip().lower() == "true"  # needs httpx[http2]
+
+_http_transport = None
+
 _client_cache = None
+_client_lock = threading.Lock()
+
+# Cached result of the last warm-up probe (exposed on /health)
+_readiness = {
+    "status": "cold",  # cold | warming | ready | failed
+    "checked_at": None,
+    "latency_ms": None,
+    "error": None,
+}
+_readiness_lock = threading.Lock()
+
+
+def _http2_enabled() -> bool:
+    if not AZURE_OPENAI_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        log.warning("AZURE_OPENAI_HTTP2 needs httpx[http2]; using HTTP/1.1")
+        return False
+    return True
+
+
+def _http_transport_options() -> dict:
+    """Pool, keep-alive and protocol settings shared by the sync and async transports."""
+    import httpx
+
+    return {
+        "limits": httpx.Limits(
+            max_connections=AZURE_OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=AZURE_OPENAI_MAX_KEEPALIVE,
+            keepalive_expiry=AZURE_OPENAI_KEEPALIVE_EXPIRY,
+        ),
+        "http2": _http2_enabled(),
+    }
+
+
+def get_http_transport():
+    """
+    The process-wide httpx transport (connection pool) of the sync client.
+    Thread-safe, so every worker thread reuses the same kept-alive
+    connections. Caller holds _client_lock on first use.
+    """
+    global _http_transport
+    if _http_transport is None:
+        import httpx
+
+        _http_transport = httpx.HTTPTransport(**_http_transport_options())
+    return _http_transport
+
+
+def _http_timeout():
+    import httpx
+
+    # openai's default; calls with a turn deadline pass their own (_request_timeout)
+    return httpx.Timeout(600.0, connect=AZURE_OPENAI_CONNECT_TIMEOUT)
+
+
+def _new_azure_openai_client(endpoint: str, api_key: str, api_version: str):
+    """A sync client on the shared transport. Caller holds _client_lock."""
+    try:
+        import httpx
+        from openai import AzureOpenAI
+    except ImportError:
+        raise RuntimeError("openai package not installed. Run: pip install openai")
+
+    if not api_key:
+        raise RuntimeError(f"No Azure OpenAI API key for {endpoint}")
+
+    return AzureOpenAI(
+        api_key=api_key,
+        api_version=api_version,
+        azure_endpoint=endpoint,
+        http_client=httpx.Client(transport=get_http_transport(), timeout=_http_timeout()),
+        max_retries=0,  # retried by _create_chat_completion()
+    )
+
 
 def get_azure_openai_client():
     """
     Initialize and cache Azure OpenAI client (singleton pattern).
-    Tests connection on first call.
+    Creation is lock-protected so concurrent first requests share one client.
+    No network call is made here; see warm_up_azure_openai().
     """
     global _client_cache
     
     if _client_cache is not None:
         return _client_cache
     
-    try:
-        from openai import AzureOpenAI
-    except ImportError:
-        raise RuntimeError("openai package not installed. Run: pip install openai")
+    with _client_lock:
+        # Another thread may have created it while we waited
+        if _client_cache is not None:
+            return _client_cache
 
-    if not AZURE_OPENAI_API_KEY:
-        raise RuntimeError("AZURE_OPENAI_API_KEY not set")
+        if not AZURE_OPENAI_API_KEY:
+            raise RuntimeError("AZURE_OPENAI_API_KEY not set")
+
+        log.info("Initializing client with endpoint %s, deployment %s", AZURE_OPENAI_ENDPOINT, AZURE_OPENAI_DEPLOYMENT)
+
+        _client_cache = _new_azure_openai_client(AZURE_OPENAI_ENDPOINT, AZURE_OPENAI_API_KEY, AZURE_OPENAI_API_VERSION)
+        return _client_cache
+
+
+# Sync clients of the routed deployments, by deployment name. They share the
+# one transport, whose pool keeps connections per endpoint.
+_deployment_clients = {}
+
+
+def get_deployment_client(deployment: Deployment):
+    """The sync client of one routed deployment (created on first use)."""
+    client = _deployment_clients.get(deployment.name)
+    if client is not None:
+        return client
+    with _client_lock:
+        if deployment.name not in _deployment_clients:
+            log.info("Initializing client with endpoint %s, deployment %s", deployment.endpoint, deployment.deployment)
+            _deployment_clients[deployment.name] = _new_azure_openai_client(
+                deployment.endpoint, deployment.api_key, deployment.api_version)
+        return _deployment_clients[deployment.name]
+
+
+def _set_readiness(**fields) -> None:
+    with _readiness_lock:
+        _readiness.update(fields)
+
+
+def get_llm_readiness() -> dict:
+    """Return a copy of the cached warm-up result."""
+    with _readiness_lock:
+        return dict(_readiness)
+
+
+def warm_up_azure_openai() -> dict:
+    """
+    Create the client and make one tiny completion so the first customer
+    turn on this worker doesn't pay for TLS setup and a cold deployment.
+    Meant to run in the background at startup. Returns the readiness record.
+    """
+    _set_readiness(status="warming", error=None)
+    start = time.perf_counter()
 
     try:
-        print(f"[AZURE_OPENAI] Initializing client with endpoint: {AZURE_OPENAI_ENDPOINT}")
-        print(f"[AZURE_OPENAI] Using deployment: {AZURE_OPENAI_DEPLOYMENT}")
-        
-        client = AzureOpenAI(
-            api_key=AZURE_OPENAI_API_KEY,
-            api_version=AZURE_OPENAI_API_VERSION,
-            azure_endpoint=AZURE_OPENAI_ENDPOINT
-        )
-        
+        client = _provider.get_client()
+
         # Test connection with simple request
-        test_response = client.chat.completions.create(
-            model=AZURE_OPENAI_DEPLOYMENT,
+        test_response = _create_chat_completion(
+            client,
+            "probe",
+            model=_provider.model,
             messages=[{"role": "user", "content": "Say 'ok'"}],
             max_tokens=5
         )
-        
-        if test_response and test_response.choices and len(test_response.choices) > 0:
-            print(f"[AZURE_OPENAI] OK: Successfully initialized client")
-            _client_cache = client
-            return _client_cache
-        else:
+
+        if not (test_response and test_response.choices and len(test_response.choices) > 0):
             raise RuntimeError("Test response was empty")
-            
+
+        latency_ms = (time.perf_counter() - start) * 1000
+        log.info("Warm-up probe succeeded in %.0f ms", latency_ms)
+        _set_readiness(status="ready", checked_at=time.time(), latency_ms=round(latency_ms, 1))
+
+    except Exception as e:
+        log.error("Warm-up probe failed: %s", str(e)[:200])
+        _set_readiness(status="failed", checked_at=time.time(), latency_ms=None, error=str(e)[:200])
+
+    return get_llm_readiness()
+
+
+# One AsyncAzureOpenAI client (and its pooled HTTP connections) per event loop.
+# httpx async connection pools cannot be shared across loops, and a worker
+# normally runs a single loop, so in practice this is one client per worker.
+# Every loop's pool is built with the same settings as the sync transport;
+# the clients of routed deployments on a loop share that loop's pool.
+_async_clients = weakref.WeakKeyDictionary()
+_async_transports = weakref.WeakKeyDictionary()
+_async_deployment_clients = weakref.WeakKeyDictionary()  # loop -> {deployment name: client}
+
+
+def _new_async_azure_openai_client(endpoint: str, api_key: str, api_version: str):
+    """An async client on the running loop's transport."""
+    try:
+        import httpx
+        from openai import AsyncAzureOpenAI
+    except ImportError:
+        raise RuntimeError("openai package not installed. Run: pip install openai")
+
+    if not api_key:
+        raise RuntimeError(f"No Azure OpenAI API key for {endpoint}")
+
+    loop = asyncio.get_running_loop()
+    transport = _async_transports.get(loop)
+    if transport is None:
+        transport = _async_transports[loop] = httpx.AsyncHTTPTransport(**_http_transport_options())
+
+    return AsyncAzureOpenAI(
+        api_key=api_key,
+        api_version=api_version,
+        azure_endpoint=endpoint,
+        http_client=httpx.AsyncClient(transport=transport, timeout=_http_timeout()),
+        max_retries=0,  # retried by _acreate_chat_completion()
+    )
+
+
+def get_async_azure_openai_client():
+    """
+    Return the AsyncAzureOpenAI client for the running event loop.
+    All async LLM helpers share it, so concurrent calls reuse one connection
+    pool instead of each holding an OS thread while waiting on the network.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is not None:
+        return client
+
+    if not AZURE_OPENAI_API_KEY:
+        raise RuntimeError("AZURE_OPENAI_API_KEY not set")
+
+    client = _new_async_azure_openai_client(AZURE_OPENAI_ENDPOINT, AZURE_OPENAI_API_KEY, AZURE_OPENAI_API_VERSION)
+    _async_clients[loop] = client
+    return client
+
+
+def get_async_deployment_client(deployment: Deployment):
+    """The async client of one routed deployment on the running event loop."""
+    clients = _async_deployment_clients.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(deployment.name)
+    if client is None:
+        client = clients[deployment.name] = _new_async_azure_openai_client(
+            deployment.endpoint, deployment.api_key, deployment.api_version)
+    return client
+
+
+def _request_cost(request: dict) -> int:
+    """Tokens Azure counts against the TPM quota at admission: estimated prompt plus max_tokens."""
+    return count_message_tokens(request.get("messages", [])) + (request.get("max_tokens") or 0)
+
+
+def _rate_limit_max_wait(request: dict) -> float:
+    """How long a call may queue for the rate limiter, leaving time for the call itself."""
+    timeout = request.get("timeout")
+    if timeout is None:
+        return LLM_RATE_LIMIT_MAX_WAIT
+    return max(min(LLM_RATE_LIMIT_MAX_WAIT, timeout - LLM_MIN_CALL_SECONDS), 0.0)
+
+
+def _admit(limiter: RateLimiter, request: dict) -> None:
+    """
+    Wait until `limiter` admits the request and take the wait off its
+    timeout. Raises RateLimitExceeded when it would have to wait too long.
+    """
+    if limiter is None:
+        return
+    waited = limiter.acquire(_request_cost(request), _rate_limit_max_wait(request))
+    if waited and request.get("timeout") is not None:
+        request["timeout"] -= waited
+
+
+async def _aadmit(limiter: RateLimiter, request: dict) -> None:
+    """Async twin of _admit()."""
+    if limiter is None:
+        return
+    waited = await limiter.aacquire(_request_cost(request), _rate_limit_max_wait(request))
+    if waited and request.get("timeout") is not None:
+        request["timeout"] -= waited
+
+
+def _routed_request(request: dict, deployment: Deployment, timeout) -> dict:
+    """The request as sent to one routed deployment, with what is left of its timeout."""
+    routed = {**request, "model": deployment.deployment}
+    if timeout is not None:
+        routed["timeout"] = timeout
+    return routed
+
+
+class AzureOpenAIProvider(LLMProvider):
+    """
+    Azure OpenAI, through the shared sync client and the per-loop async
+    client; or, given a DeploymentRouter (AZURE_OPENAI_DEPLOYMENTS), through
+    the clients of the deployment the router picks for each call. Calls
+    first pass the deployment's rate limiter, if it has one.
+    """
+
+    name = "azure"
+
+    def __init__(self, router: DeploymentRouter = None, limiter: RateLimiter = None):
+        self.router = router
+        self.limiter = limiter  # of the single deployment; routed ones carry their own
+        self.model = router.model if router is not None else AZURE_OPENAI_DEPLOYMENT
+
+    def _check_router(self) -> DeploymentRouter:
+        missing = [d.name for d in self.router.deployments if not d.api_key]
+        if missing:
+            raise RuntimeError(f"No Azure OpenAI API key for deployment(s): {', '.join(missing)}")
+        return self.router
+
+    def get_client(self):
+        if self.router is not None:
+            return self._check_router()
+        return get_azure_openai_client()
+
+    def get_async_client(self):
+        if self.router is not None:
+            return self._check_router()
+        return get_async_azure_openai_client()
+
+    def create(self, client, kind: str, **request):
+        if self.router is None:
+            _admit(self.limiter, request)
+            return client.chat.completions.create(**request)
+
+        def send(deployment: Deployment, timeout):
+            routed = _routed_request(request, deployment, timeout)
+            _admit(deployment.limiter, routed)
+            return get_deployment_client(deployment).chat.completions.create(**routed)
+
+        return self.router.call(send, request.get("timeout"))
+
+    async def acreate(self, client, kind: str, **request):
+        if self.router is None:
+            await _aadmit(self.limiter, request)
+            return await client.chat.completions.create(**request)
+
+        async def send(deployment: Deployment, timeout):
+            routed = _routed_request(request, deployment, timeout)
+            await _aadmit(deployment.limiter, routed)
+            return await get_async_deployment_client(deployment).chat.completions.create(**routed)
+
+        return await self.router.acall(send, request.get("timeout"))
+
+
+# Shared by the process-wide breaker and the breakers of routed deployments
+_breaker_settings = {
+    "failure_rate_threshold": LLM_BREAKER_FAILURE_RATE,
+    "slow_call_seconds": LLM_BREAKER_SLOW_CALL_SECONDS,
+    "slow_call_rate_threshold": LLM_BREAKER_SLOW_CALL_RATE,
+    "window_size": LLM_BREAKER_WINDOW,
+    "min_calls": LLM_BREAKER_MIN_CALLS,
+    "cooldown_seconds": LLM_BREAKER_COOLDOWN_SECONDS,
+}
+
+
+def _create_rate_limiter(name: str, rpm: float, tpm: float):
+    """A RateLimiter for one deployment's quota, or None when it has no limits."""
+    if rpm <= 0 and tpm <= 0:
+        return None
+    store = get_sqlite_store(LLM_RATE_LIMIT_DB) if LLM_RATE_LIMIT_DB else None
+    log.info("Rate limiting %s to %g RPM / %g TPM%s", name, rpm, tpm, " (shared)" if store else "")
+    return RateLimiter(name, rpm, tpm, burst_seconds=LLM_RATE_LIMIT_BURST_SECONDS, store=store)
+
+
+def _create_router():
+    """The DeploymentRouter for AZURE_OPENAI_DEPLOYMENTS, or None when it is unset."""
+    if not AZURE_OPENAI_DEPLOYMENTS:
+        return None
+    defaults = {"deployment": AZURE_OPENAI_DEPLOYMENT, "api_key": AZURE_OPENAI_API_KEY,
+                "api_version": AZURE_OPENAI_API_VERSION, "rpm": AZURE_OPENAI_RPM_LIMIT,
+                "tpm": AZURE_OPENAI_TPM_LIMIT}
+    deployments = []
+    for settings in parse_deployments(AZURE_OPENAI_DEPLOYMENTS, defaults):
+        limiter = _create_rate_limiter(settings["name"], settings.pop("rpm"), settings.pop("tpm"))
+        breaker = CircuitBreaker(f"azure_openai:{settings['name']}", **_breaker_settings)
+        deployments.append(Deployment(breaker=breaker, limiter=limiter, **settings))
+    log.info("Routing between %d deployments: %s", len(deployments),
+             ", ".join(f"{d.name} (weight {d.weight:g})" for d in deployments))
+    return DeploymentRouter(deployments, alpha=LLM_ROUTER_EWMA_ALPHA, error_penalty=LLM_ROUTER_ERROR_PENALTY,
+                            decay_seconds=LLM_ROUTER_DECAY_SECONDS, min_call_seconds=LLM_MIN_CALL_SECONDS)
+
+
+def _create_provider(name: str) -> LLMProvider:
+    if name == "azure":
+        router = _create_router()
+        if router is not None:
+            return AzureOpenAIProvider(router)
+        return AzureOpenAIProvider(limiter=_create_rate_limiter(
+            AZURE_OPENAI_DEPLOYMENT, AZURE_OPENAI_RPM_LIMIT, AZURE_OPENAI_TPM_LIMIT))
+    if name == "local":
+        log.info("Using the local offline provider (no Azure OpenAI calls)")
+        return LocalLLMProvider.from_env()
+    raise ValueError(f"Unknown LLM_PROVIDER: {name!r} (expected 'azure' or 'local')")
+
+
+_provider = _create_provider(LLM_PROVIDER)
+
+
+def get_llm_provider() -> LLMProvider:
+    """The provider this process sends chat completions to."""
+    return _provider
+
+
+# With routed deployments this sees a call's outcome after failover: it opens
+# only when every deployment keeps failing.
+_azure_breaker = CircuitBreaker("azure_openai", **_breaker_settings)
+
+
+def get_llm_breaker_status() -> dict:
+    """State of the Azure OpenAI circuit breaker (exposed on /health)."""
+    return _azure_breaker.snapshot()
+
+
+def get_llm_deployment_status():
+    """Routing state of each deployment (exposed on /health), or None without AZURE_OPENAI_DEPLOYMENTS."""
+    router = getattr(_provider, "router", None)
+    return router.snapshot() if router is not None else None
+
+
+_budget_exhausted = counter(
+    "llm_turn_budget_exhausted_total", "LLM calls skipped because the turn's latency budget was spent"
+)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised instead of calling Azure OpenAI when the turn's budget is spent."""
+
+
+class InvalidLLMResponse(Exception):
+    """A completion arrived but was blocked, truncated or could not be parsed."""
+
+
+# Per-call instrumentation, labelled by call kind (classify/negotiate/plans/turn/probe),
+# deployment and outcome (ok, blocked, throttled, server_error, timeout,
+# connection, rejected by the breaker, deadline, rate_limited, error).
+# Fallback reasons use the same labels, plus invalid_response and
+# client_unavailable.
+_llm_calls = counter("llm_calls_total", "Chat completion calls by kind, deployment and outcome",
+                     ("kind", "deployment", "outcome"))
+_llm_call_duration = histogram(
+    "llm_call_duration_seconds", "Chat completion latency including retries, by kind, deployment and outcome",
+    ("kind", "deployment", "outcome"),
+)
+_llm_fallbacks = counter("llm_fallbacks_total", "LLM results replaced by a rule/template fallback",
+                         ("kind", "reason"))
+
+
+def _call_outcome(error: Exception = None, response=None) -> str:
+    """Outcome label for a finished chat completion call."""
+    if error is not None:
+        if isinstance(error, CircuitOpenError):
+            return "rejected"
+        if isinstance(error, DeadlineExceeded):
+            return "deadline"
+        if isinstance(error, RateLimitExceeded):
+            return "rate_limited"
+        if isinstance(error, (InvalidLLMResponse, json.JSONDecodeError)):
+            return "invalid_response"
+        reason = retry_reason(error)
+        if reason is not None:
+            return reason
+        return "timeout" if isinstance(error, TimeoutError) else "error"
+
+    choices = getattr(response, "choices", None)
+    if not choices or getattr(choices[0], "finish_reason", None) == "content_filter":
+        return "blocked"
+    return "ok"
+
+
+def _observe_call(kind: str, request: dict, start: float, outcome: str) -> None:
+    deployment = request.get("model") or ""
+    _llm_calls.inc(kind=kind, deployment=deployment, outcome=outcome)
+    _llm_call_duration.observe(time.perf_counter() - start, kind=kind, deployment=deployment, outcome=outcome)
+
+
+def _record_fallback(kind: str, reason: str) -> None:
+    """Count an LLM result that was replaced by a fallback."""
+    _llm_fallbacks.inc(kind=kind, reason=reason)
+
+
+def _request_timeout(deadline: float = None):
+    """
+    Seconds left for a call that must finish by `deadline` (epoch time), or
+    None when there is no deadline. Raises DeadlineExceeded when too little
+    is left for a call to be worth making.
+    """
+    if deadline is None:
+        return None
+    remaining = deadline - time.time()
+    if remaining < LLM_MIN_CALL_SECONDS:
+        _budget_exhausted.inc()
+        raise DeadlineExceeded(f"Turn latency budget exhausted ({max(remaining, 0):.2f}s left)")
+    return remaining
+
+
+_retry_policy = RetryPolicy(
+    max_attempts=LLM_RETRY_MAX_ATTEMPTS,
+    base_delay=LLM_RETRY_BASE_DELAY,
+    max_delay=LLM_RETRY_MAX_DELAY,
+    max_elapsed=LLM_RETRY_MAX_ELAPSED_SECONDS,
+    min_attempt_seconds=LLM_MIN_CALL_SECONDS,
+)
+
+
+def _record_outcome(start: float, error: Exception = None) -> None:
+    """
+    Report one attempt to the circuit breaker. Only transient failures (5xx,
+    timeout, connection) count as failures: a 429 or another 4xx, such as a
+    content-filtered prompt, means the service is up and answering. A call
+    the rate limiter refused never reached it and is not counted at all.
+    `start` is a service_clock() reading, so the time the call queued for
+    the rate limiter does not count as latency.
+    """
+    if isinstance(error, RateLimitExceeded):
+        return
+    latency = service_clock() - start
+    if error is None or not is_transient_failure(error):
+        _azure_breaker.record_success(latency)
+    else:
+        _azure_breaker.record_failure(latency, error)
+
+
+def _record_tokens(kind: str, request: dict, response) -> None:
+    """Record a call's token counts (estimated when the response has no usage)."""
+    try:
+        completion_text = response.choices[0].message.content or ""
+    except (AttributeError, IndexError, TypeError):
+        completion_text = ""
+    record_token_usage(kind, request.get("model") or "", request.get("messages", []),
+                       getattr(response, "usage", None), completion_text)
+
+
+_single_flights = {kind: SingleFlight(f"llm_{kind}") for kind in ("classify", "negotiate", "plans", "turn", "probe")}
+
+
+def get_single_flight_stats() -> dict:
+    """Leader/coalesced counts of the chat completion single-flights, by call kind."""
+    return {kind: flight.stats() for kind, flight in _single_flights.items()}
+
+
+def _flight_key(kind: str, request: dict) -> str:
+    """Identifies identical requests: whitespace-normalised messages plus every parameter but the timeout."""
+    messages = [{**m, "content": " ".join(str(m.get("content") or "").split())} for m in request.get("messages", [])]
+    params = {k: v for k, v in request.items() if k not in ("messages", "timeout")}
+    return hash_key(kind, json.dumps([messages, params], sort_keys=True, ensure_ascii=False, default=str))
+
+
+def _flight_timeout(deadline: float = None):
+    """How long a follower may wait for the in-flight call: the rest of its own turn."""
+    return None if deadline is None else max(deadline - time.time(), 0.0)
+
+
+def _out_of_time(error: Exception) -> bool:
+    """A deadline or timeout error: it says how long the caller had, not how the service is doing."""
+    return isinstance(error, TimeoutError) or retry_reason(error) == "timeout"
+
+
+def _create_chat_completion(client, kind: str, deadline: float = None, **request):
+    """
+    _call_chat_completion(), coalesced with an identical call already in
+    flight (LLM_SINGLE_FLIGHT). A follower shares the leader's response or
+    error, waiting no longer than its own deadline allows. The leader's
+    call runs under the leader's deadline, so when it ends in a deadline
+    or timeout error a follower makes its own call with its own budget.
+    """
+    flight = _single_flights.get(kind) if LLM_SINGLE_FLIGHT else None
+    if flight is None:
+        return _call_chat_completion(client, kind, deadline, request)
+    led = []
+
+    def call():
+        led.append(True)
+        return _call_chat_completion(client, kind, deadline, request)
+
+    try:
+        return flight.do(_flight_key(kind, request), call, _flight_timeout(deadline))
+    except FlightTimeout as e:
+        _budget_exhausted.inc()
+        raise DeadlineExceeded(str(e)) from e
     except Exception as e:
-        print(f"[AZURE_OPENAI] ERROR: Failed to initialize: {str(e)[:200]}")
-        raise RuntimeError(f"Azure OpenAI initialization failed: {e}")
+        if led or not _out_of_time(e):
+            raise
+    return _call_chat_completion(client, kind, deadline, request)
+
+
+async def _acreate_chat_completion(client, kind: str, deadline: float = None, **request):
+    """Async twin of _create_chat_completion(). Streams are never coalesced."""
+    flight = _single_flights.get(kind) if LLM_SINGLE_FLIGHT and not request.get("stream") else None
+    if flight is None:
+        return await _acall_chat_completion(client, kind, deadline, request)
+    led = []
+
+    async def call():
+        led.append(True)
+        return await _acall_chat_completion(client, kind, deadline, request)
+
+    try:
+        return await flight.ado(_flight_key(kind, request), call, _flight_timeout(deadline))
+    except FlightTimeout as e:
+        _budget_exhausted.inc()
+        raise DeadlineExceeded(str(e)) from e
+    except Exception as e:
+        if led or not _out_of_time(e):
+            raise
+    return await _acall_chat_completion(client, kind, deadline, request)
+
+
+def _call_chat_completion(client, kind: str, deadline: float, request: dict):
+    """
+    Make one chat completion through the retry policy and circuit breaker,
+    bounded by the turn's deadline. Raises DeadlineExceeded or
+    CircuitOpenError without touching the network when the call cannot or
+    should not be made. Latency, outcome and tokens are recorded under
+    `kind` (classify/negotiate/plans/turn/probe).
+    """
+    def attempt():
+        timeout = _request_timeout(deadline)
+        if timeout is not None:
+            request["timeout"] = timeout
+        _azure_breaker.check()
+        start = service_clock()
+        try:
+            response = _provider.create(client, kind, **request)
+        except Exception as e:
+            _record_outcome(start, e)
+            raise
+        _record_outcome(start)
+        return response
+
+    start = time.perf_counter()
+    try:
+        response = call_with_retries(attempt, _retry_policy, deadline)
+    except Exception as e:
+        _observe_call(kind, request, start, _call_outcome(e))
+        raise
+    _observe_call(kind, request, start, _call_outcome(response=response))
+    _record_tokens(kind, request, response)
+    return response
+
+
+async def _acall_chat_completion(client, kind: str, deadline: float, request: dict):
+    """
+    Async twin of _call_chat_completion(). A stream is recorded by
+    _astream_chat_completion() once it has been read.
+    """
+    async def attempt():
+        timeout = _request_timeout(deadline)
+        if timeout is not None:
+            request["timeout"] = timeout
+        _azure_breaker.check()
+        start = service_clock()
+        try:
+            response = await _provider.acreate(client, kind, **request)
+        except Exception as e:
+            _record_outcome(start, e)
+            raise
+        _record_outcome(start)
+        return response
+
+    start = time.perf_counter()
+    try:
+        response = await acall_with_retries(attempt, _retry_policy, deadline)
+    except Exception as e:
+        _observe_call(kind, request, start, _call_outcome(e))
+        raise
+    if not request.get("stream"):
+        _observe_call(kind, request, start, _call_outcome(response=response))
+        _record_tokens(kind, request, response)
+    return response
 
 
 def safe_get_response_text(response):
@@ -95,11 +836,11 @@ def safe_get_response_text(response):
     try:
         # Azure OpenAI response structure
         if not response or not hasattr(response, 'choices'):
-            print("[AZURE_OPENAI] No choices in response")
+            log.warning("No choices in response")
             return None, True
         
         if len(response.choices) == 0:
-            print("[AZURE_OPENAI] Empty choices list")
+            log.warning("Empty choices list")
             return None, True
         
         choice = response.choices[0]
@@ -108,7 +849,7 @@ def safe_get_response_text(response):
         if hasattr(choice, 'finish_reason'):
             finish_reason = choice.finish_reason
             if finish_reason and finish_reason not in ['stop', 'length']:
-                print(f"[AZURE_OPENAI] Unexpected finish reason: {finish_reason}")
+                log.warning("Unexpected finish reason: %s", finish_reason)
                 # Don't treat as blocked, but log it
         
         # Extract text from message content
@@ -117,140 +858,207 @@ def safe_get_response_text(response):
             if text and len(text.strip()) > 0:
                 return text.strip(), False
         
-        print("[AZURE_OPENAI] No text found in response")
+        log.warning("No text found in response")
         return None, True
         
     except Exception as e:
-        print(f"[AZURE_OPENAI] Unexpected error extracting text: {type(e).__name__} - {e}")
+        log.warning("Unexpected error extracting text: %s - %s", type(e).__name__, e)
         return None, True
 
 
-def classify_intent_with_azure_openai(prompt: str) -> str:
+def _unavailable_fallback_intent(prompt: str) -> str:
     """
-    Use Azure OpenAI to intelligently classify customer intent.
-    Returns one of the ALLOWED_INTENTS.
+    Fallback classification when the Azure OpenAI client cannot be created.
     """
-    
-    try:
-        client = get_azure_openai_client()
-    except Exception as e:
-        print(f"Error initializing Azure OpenAI: {e}")
-        # Apply smart fallback when Azure OpenAI is unavailable
-        rule_intent = classify_intent_rule_based(prompt)
-        if rule_intent != "unknown":
-            return rule_intent
-        
-        # Smart fallback: check for common patterns
-        text_lower = prompt.lower()
-        # Check for dispute patterns
-        dispute_keywords = ["nahi hai", "nahi liya", "galat", "fraud", "wrong", "mistake", "not mine", "never took"]
-        if any(kw in text_lower for kw in dispute_keywords):
-            return "disputed"
-        
-        # Check for payment-related patterns
-        if any(phrase in text_lower for phrase in ["pay", "payment", "emi", "installment", "plan"]):
-            if any(phrase in text_lower for phrase in ["full", "nahi de sakta", "can't"]):
-                return "willing"
-            return "willing"
-        
-        # Check for callback patterns (but only if explicit)
-        if any(phrase in text_lower for phrase in ["call karo", "call kar", "call me", "call back", "baad mein call", "kal call"]):
-            return "callback"
-        
-        # Default fallback - ambiguous inputs should be "unknown"
-        return "unknown"
+    rule_intent = classify_intent_rule_based(prompt)
+    if rule_intent != "unknown":
+        return rule_intent
 
-    # Simplified prompt to avoid safety filters - Updated for Hinglish
-    llm_prompt = f"""Classify this customer response in a debt collection call (customer may respond in Hinglish/Hindi/English).
+    # Smart fallback: check for common patterns
+    text_lower = prompt.lower()
+    # Check for dispute patterns
+    dispute_keywords = ["nahi hai", "nahi liya", "galat", "fraud", "wrong", "mistake", "not mine", "never took"]
+    if any(kw in text_lower for kw in dispute_keywords):
+        return "disputed"
 
-Response: "{prompt}"
+    # Check for payment-related patterns
+    if any(phrase in text_lower for phrase in ["pay", "payment", "emi", "installment", "plan"]):
+        return "willing"
 
-Categories (choose the best match):
-- paid: Customer claims they already made payment (e.g., "I paid", "already cleared", "payment done", "transferred", "main ne pay kar diya", "payment ho gaya")
+    # Check for callback patterns (but only if explicit)
+    if any(phrase in text_lower for phrase in ["call karo", "call kar", "call me", "call back", "baad mein call", "kal call"]):
+        return "callback"
+
+    # Default fallback - ambiguous inputs should be "unknown"
+    return "unknown"
+
+
+def _smart_fallback_intent(prompt: str) -> str:
+    """
+    Fallback classification when an Azure OpenAI call fails or is blocked.
+    """
+    rule_intent = classify_intent_rule_based(prompt)
+
+    # If rule-based found something, use it
+    if rule_intent != "unknown":
+        return rule_intent
+
+    # Smart fallback: check for common patterns
+    text_lower = prompt.lower()
+    dispute_keywords = ["not right", "doesnt seem", "doesn't seem", "wrong", "mistake", "not mine", "never took", "didn't take"]
+    if any(kw in text_lower for kw in dispute_keywords):
+        return "disputed"
+
+    # If they mention payment but can't pay full, they're willing to negotiate
+    if any(phrase in text_lower for phrase in ["can't pay", "cant pay", "cannot pay", "pay", "payment"]):
+        if any(phrase in text_lower for phrase in ["full", "all", "complete", "entire"]):
+            return "willing"  # Willing to pay partial/negotiate
+
+    # Default to unknown for ambiguous inputs
+    return "unknown"
+
+
+# Intent definitions, shared by the classification and combined turn prompts
+_INTENT_CATEGORIES = """- paid: Customer claims they already made payment (e.g., "I paid", "already cleared", "payment done", "transferred", "main ne pay kar diya", "payment ho gaya")
 - disputed: Customer denies the debt or says it's wrong/not theirs (e.g., "never took", "not mine", "fraud", "wrong", "maine liya hi nahi", "yeh mera nahi hai")
 - callback: Customer explicitly wants to be called back later (e.g., "call me later", "busy now", "not available", "out of town", "baad mein call karo", "abhi busy hoon")
 - unable: Customer has no money/can't afford anything (e.g., "lost job", "no money", "can't afford", "struggling", "paise nahi hain", "afford nahi kar sakta")
 - willing: Customer wants to pay but needs options (e.g., "can't pay full", "installment", "payment plan", "will pay", "ready to pay", "EMI chahiye", "payment plan de do", "pay kar sakta hoon")
-- unknown: For ambiguous responses like greetings ("Hi", "Hello"), simple questions ("Kya?", "Kya hua?"), confirmations without context ("Haan", "Nahi", "Ok"), or requests for clarification ("Samajh nahi aaya", "Explain kar sakte hain?")
+- unknown: For ambiguous responses like greetings ("Hi", "Hello"), simple questions ("Kya?", "Kya hua?"), confirmations without context ("Haan", "Nahi", "Ok"), or requests for clarification ("Samajh nahi aaya", "Explain kar sakte hain?")"""
 
-Important: 
-- If customer says they want to pay but can't pay full amount, classify as "willing" (not "unable").
+_INTENT_NOTES = """- If customer says they want to pay but can't pay full amount, classify as "willing" (not "unable").
 - If customer says they already paid, classify as "paid" (not "willing").
-- For ambiguous responses (greetings, simple questions, confirmations without payment context), classify as "unknown" (not "callback", "disputed", or "unable").
+- For ambiguous responses (greetings, simple questions, confirmations without payment context), classify as "unknown" (not "callback", "disputed", or "unable")."""
+
+
+def _build_classification_prompt(prompt: str) -> str:
+    """Build the intent classification prompt for a customer utterance."""
+    # Simplified prompt to avoid safety filters - Updated for Hinglish
+    return f"""Classify this customer response in a debt collection call (customer may respond in Hinglish/Hindi/English).
+
+Response: "{prompt}"
+
+Categories (choose the best match):
+{_INTENT_CATEGORIES}
+
+Important: 
+{_INTENT_NOTES}
 
 Return ONE word only: paid, disputed, callback, unable, willing, or unknown
 
 Classification:"""
 
-    try:
-        response = client.chat.completions.create(
-            model=AZURE_OPENAI_DEPLOYMENT,
-            messages=[{"role": "user", "content": llm_prompt}],
-            temperature=0.1,
-            max_tokens=10
+
+def _parse_classification(response, prompt: str) -> tuple:
+    """
+    Turn a classification response into one of the ALLOWED_INTENTS.
+    Returns (intent, from_llm); from_llm is False when a fallback answered.
+    """
+    text, was_blocked = safe_get_response_text(response)
+
+    if was_blocked or not text:
+        intent_log.warning("Azure OpenAI classification blocked, using rule-based fallback")
+        return _smart_fallback_intent(prompt), False
+
+    intent = text.strip().lower()
+
+    # Validate response
+    if intent in ALLOWED_INTENTS:
+        return intent, True
+
+    # Try to extract valid intent from response
+    for valid_intent in ALLOWED_INTENTS:
+        if valid_intent in intent:
+            return valid_intent, True
+
+    # Fallback
+    intent_log.warning("Azure OpenAI returned unexpected intent %r", intent)
+    rule_intent = classify_intent_rule_based(prompt)
+    return (rule_intent if rule_intent != "unknown" else "disputed"), False
+
+
+def _checked_classification(response, prompt: str) -> tuple:
+    """_parse_classification(), counting answers that needed a fallback."""
+    intent, from_llm = _parse_classification(response, prompt)
+    if not from_llm:
+        outcome = _call_outcome(response=response)
+        _record_fallback("classify", "invalid_response" if outcome == "ok" else outcome)
+    return intent, from_llm
+
+
+def _classify_with_azure_openai(prompt: str, deadline: float = None) -> tuple:
+    """
+    Classify with Azure OpenAI.
+    Returns (intent, from_llm); from_llm is False when a fallback answered.
+    """
+    try:
+        client = _provider.get_client()
+    except Exception as e:
+        log.error("Error initializing Azure OpenAI: %s", e)
+        _record_fallback("classify", "client_unavailable")
+        # Apply smart fallback when Azure OpenAI is unavailable
+        return _unavailable_fallback_intent(prompt), False
+
+    try:
+        response = _create_chat_completion(
+            client,
+            "classify",
+            deadline=deadline,
+            model=_provider.model,
+            messages=[{"role": "user", "content": _build_classification_prompt(prompt)}],
+            temperature=0.1,
+            max_tokens=10
         )
-        
-        text, was_blocked = safe_get_response_text(response)
-        
-        if was_blocked or not text:
-            print("Azure OpenAI classification blocked, using rule-based fallback")
-            rule_intent = classify_intent_rule_based(prompt)
-            
-            # If rule-based found something, use it
-            if rule_intent != "unknown":
-                return rule_intent
-            
-            # Smart fallback for blocked cases
-            text_lower = prompt.lower()
-            dispute_keywords = ["not right", "doesnt seem", "doesn't seem", "wrong", "mistake", "not mine", "never took", "didn't take"]
-            if any(kw in text_lower for kw in dispute_keywords):
-                return "disputed"
-            
-            # If they mention payment but can't pay full, they're willing to negotiate
-            if any(phrase in text_lower for phrase in ["can't pay", "cant pay", "cannot pay", "pay", "payment"]):
-                if any(phrase in text_lower for phrase in ["full", "all", "complete", "entire"]):
-                    return "willing"  # Willing to pay partial/negotiate
-            
-            # Default to unknown for ambiguous inputs
-            return "unknown"
-        
-        intent = text.strip().lower()
-        
-        # Validate response
-        if intent in ALLOWED_INTENTS:
-            return intent
-        
-        # Try to extract valid intent from response
-        for valid_intent in ALLOWED_INTENTS:
-            if valid_intent in intent:
-                return valid_intent
-        
-        # Fallback
-        print(f"Warning: Azure OpenAI returned unexpected intent '{intent}'")
-        rule_intent = classify_intent_rule_based(prompt)
-        return rule_intent if rule_intent != "unknown" else "disputed"
-        
     except Exception as e:
-        print(f"Error in Azure OpenAI classification: {e}")
-        rule_intent = classify_intent_rule_based(prompt)
-        
-        # If rule-based found something, use it
-        if rule_intent != "unknown":
-            return rule_intent
-        
-        # Smart fallback: check for common patterns
-        text_lower = prompt.lower()
-        dispute_keywords = ["not right", "doesnt seem", "doesn't seem", "wrong", "mistake", "not mine", "never took", "didn't take"]
-        if any(kw in text_lower for kw in dispute_keywords):
-            return "disputed"
-        
-        # If they mention payment but can't pay full, they're willing to negotiate
-        if any(phrase in text_lower for phrase in ["can't pay", "cant pay", "cannot pay", "pay", "payment"]):
-            if any(phrase in text_lower for phrase in ["full", "all", "complete", "entire"]):
-                return "willing"  # Willing to pay partial/negotiate
-        
-        # Default to unknown for ambiguous inputs
-        return "unknown"
+        intent_log.warning("Error in Azure OpenAI classification: %s", e)
+        _record_fallback("classify", _call_outcome(e))
+        return _smart_fallback_intent(prompt), False
+
+    return _checked_classification(response, prompt)
+
+
+def classify_intent_with_azure_openai(prompt: str, deadline: float = None) -> str:
+    """
+    Use Azure OpenAI to intelligently classify customer intent.
+    Returns one of the ALLOWED_INTENTS. With a deadline (epoch time) the
+    call is bounded by the remaining turn budget.
+    """
+    return _classify_with_azure_openai(prompt, deadline)[0]
+
+
+async def _aclassify_with_azure_openai(prompt: str, deadline: float = None) -> tuple:
+    """Async twin of _classify_with_azure_openai(). Returns (intent, from_llm)."""
+    try:
+        client = _provider.get_async_client()
+    except Exception as e:
+        log.error("Error initializing async Azure OpenAI: %s", e)
+        _record_fallback("classify", "client_unavailable")
+        return _unavailable_fallback_intent(prompt), False
+
+    try:
+        response = await _acreate_chat_completion(
+            client,
+            "classify",
+            deadline=deadline,
+            model=_provider.model,
+            messages=[{"role": "user", "content": _build_classification_prompt(prompt)}],
+            temperature=0.1,
+            max_tokens=10
+        )
+    except Exception as e:
+        intent_log.warning("Error in Azure OpenAI classification: %s", e)
+        _record_fallback("classify", _call_outcome(e))
+        return _smart_fallback_intent(prompt), False
+
+    return _checked_classification(response, prompt)
+
+
+async def aclassify_intent_with_azure_openai(prompt: str, deadline: float = None) -> str:
+    """
+    Async twin of classify_intent_with_azure_openai().
+    Awaits the shared AsyncAzureOpenAI client instead of holding a thread.
+    """
+    return (await _aclassify_with_azure_openai(prompt, deadline))[0]
 
 
 # ------------------------------------------------------------------
@@ -260,464 +1068,776 @@ Classification:"""
 def classify_intent_rule_based(prompt: str) -> str:
     """
     Fast rule-based classification for obvious cases.
-    Returns 'unknown' if uncertain - Gemini will handle these.
+    Returns 'unknown' if nothing matched. Used directly by the fallbacks;
+    classify_intent() also looks at the confidence of the match.
     """
+    return classify_with_confidence(prompt)[0]
 
-    text = prompt.lower().strip()
-    
-    # First, check for ambiguous/unknown inputs (greetings, questions, confirmations)
-    # These should be classified as "unable" (which maps to unknown) before checking other patterns
-    ambiguous_patterns = [
-        # Simple greetings
-        "hi", "hello", "hey",
-        # Simple questions (single word or very short)
-        "kya?", "kaise?", "kyun?", "kahan?", "kab?", "kaun?", "kya hua?", "kya baat hai?",
-        # Confirmation words (without context)
-        "haan", "nahi", "theek hai", "achha", "ok", "okay",
-        # Requests for clarification
-        "samajh nahi aaya", "aap kya keh rahe hain?", "aap kya bol rahe hain?",
-        "explain kar sakte hain?", "kya matlab hai?", "mujhe samajh nahi aaya",
-        # Wait phrases
-        "wait", "ruko", "thoda ruko", "ek minute", "just a moment",
-        # Generic responses
-        "batao", "suno", "dekho",
-        # Identity questions
-        "yeh kaun hai?"
-    ]
-    
-    # Check if input is exactly one of these ambiguous patterns
-    if text in ambiguous_patterns:
-        return "unknown"
-    
-    # Check if input is very short (1-3 words) and matches ambiguous patterns
-    words = text.split()
-    if len(words) <= 3:
-        # Check if it's a simple greeting
-        if text in ["hi", "hello", "hey"]:
-            return "unknown"
-        # Check if it's a simple confirmation without payment context
-        if text in ["haan", "nahi", "ok", "okay", "theek hai", "achha"]:
-            return "unknown"
-        # Check for single-word questions
-        if text.endswith("?") and len(words) <= 2:
-            question_words = ["kya", "kaise", "kyun", "kahan", "kab", "kaun", "kya hua", "kya baat hai"]
-            if any(qw in text for qw in question_words):
-                return "unknown"
-        # Check for wait phrases
-        if any(phrase in text for phrase in ["wait", "ruko", "thoda ruko", "ek minute", "just a moment"]):
-            return "unknown"
-        # Check for clarification requests
-        if any(phrase in text for phrase in ["samajh nahi", "kya matlab", "explain", "yeh kaun hai"]):
-            return "unknown"
-
-    # Very clear "already paid" signals (including Hinglish)
-    if any(phrase in text for phrase in [
-        "already paid", "already made payment", "already cleared",
-        "payment done", "payment made", "payment cleared", "payment completed",
-        "i paid", "i've paid", "i have paid", "i made payment", "i cleared",
-        "paid last week", "paid yesterday", "paid today", "paid it",
-        "made the payment", "cleared the payment", "settled the payment",
-        "transferred", "transferred the amount", "sent the money",
-        "payment was made", "payment is done", "already settled",
-        "cleared my dues", "paid my dues", "settled my account",
-        # Hinglish phrases - expanded patterns
-        "main ne pay kar diya", "payment ho gaya", "payment kar diya",
-        "main ne payment kar di", "payment clear ho gaya", "dues clear kar di",
-        "main ne transfer kar diya", "amount transfer ho gaya", "paise bhej diye",
-        "main ne pehle hi payment kar diya", "pehle hi payment", "pehle hi pay",
-        "payment ho gaya hai", "payment kar diya hai", "payment kar di thi",
-        "transfer kar diya", "amount transfer", "transfer ho chuka",
-        "dues clear ho gaye", "clear ho gaye hain", "dues clear",
-        "sab paise de diye", "full amount pay kar diya", "loan clear kar diya",
-        "pehle hi settle kar diya", "settle kar diya", "settle ho gaya",
-        "payment receipt bhej di", "receipt bhej di", "proof bhej diya",
-        "payement successfull ho gya", "payment successful ho gaya", "payment success ho gaya",
-        "upi se transfer", "bank se payment", "cheque bhej diya",
-        "online payment kar diya", "payment done hai", "emi pay kar di",
-        "account clear ho gaya", "payment process ho gaya", "payment confirm",
-        "amount deduct ho gaya", "payment kar di thi kal", "receipt mil gaya",
-        # Additional patterns for successful payments
-        "transaction complete ho gaya", "payment successful ho gaya",
-        "transaction complete", "payment successful", "payment successful hai",
-        "transaction successful", "transaction successful hai", "complete ho gaya",
-        "successful ho gaya", "successfully done", "successfully completed"
-    ]):
-        return "paid"
-
-    # Very clear financial hardship signals (including Hinglish)
-    # Check this BEFORE dispute to avoid false positives
-    if any(phrase in text for phrase in [
-        "lost my job", "lost job", "no job", "unemployed", "jobless",
-        "no money", "no funds", "no cash", "broke", "out of money",
-        "can't afford", "cant afford", "cannot afford", "unable to afford",
-        "financial crisis", "financial difficulty", "financial trouble",
-        "struggling", "struggling financially", "going through tough times",
-        "difficult situation", "hard time", "tough time",
-        "no income", "no salary", "no earnings", "no source of income",
-        "medical emergency", "family emergency", "emergency expenses",
-        # Hinglish phrases - expanded patterns
-        "naukri chali gayi", "job nahi hai", "paise nahi hain",
-        "afford nahi kar sakta", "paisa nahi hai", "financial problem hai",
-        "mushkil mein hoon", "paise ki problem hai", "income nahi hai",
-        # Additional patterns for inability to pay
-        "kuch bhi pay nahi kar sakta", "kuch nahi de sakta", "kuch bhi nahi de sakta",
-        "paise nahi de sakta", "pay nahi kar sakta", "payment nahi kar sakta",
-        "salary bandh ho gayi", "salary bandh", "income source bandh",
-        "savings khatam ho gayi", "savings khatam", "funds khatam",
-        "financial condition theek nahi", "financial situation kharab",
-        "financial condition kharab", "financial situation theek nahi",
-        "financially weak", "financially unstable", "financially unable",
-        "funds available nahi", "resources nahi hain", "money available nahi",
-        "paise de sakta right now", "abhi paise nahi", "right now paise nahi",
-        "job chali gayi", "naukri chali gayi hai", "income source bandh ho gayi",
-        "mere paas funds nahi", "mere paas money nahi", "mere paas paise nahi",
-        "main financially struggling", "main financially weak", "main financially unstable"
-    ]):
-        return "unable"
-
-    # Very clear dispute signals (including Hinglish)
-    # IMPORTANT: Exclude financial hardship phrases to avoid false positives
-    dispute_phrases = [
-        "never took", "never borrowed", "never applied", "never had",
-        "haven't taken", "havent taken", "didn't take", "didnt take",
-        "not my loan", "not my account", "not my debt", "not mine",
-        "don't owe", "dont owe", "do not owe", "i don't owe",
-        "this is wrong", "this is incorrect", "this is not mine",
-        "this is not my", "this doesn't belong", "this is fraud",
-        "i didn't take", "i never took", "i never borrowed",
-        "doesn't seem right", "doesnt seem right", "does not seem right",
-        "not right", "seems wrong", "looks wrong", "appears wrong",
-        "mistake", "error", "fraud", "fraudulent", "identity theft",
-        "someone else", "wrong person", "not me", "i don't know about this",
-        "i never applied", "i never signed", "unauthorized", "not authorized",
-        # Hinglish phrases - expanded patterns
-        "maine liya hi nahi", "yeh mera nahi hai", "yeh galat hai",
-        "maine kabhi nahi liya", "yeh meri loan nahi hai", "yeh fraud hai",
-        "mujhe nahi pata", "galat person", "yeh mera account nahi hai",
-        "yeh loan mera nahi", "loan mera nahi hai", "yeh loan kabhi nahi liya",
-        "yeh galat hai mujhe", "kuch nahi dena", "fraud lagta hai",
-        "yeh mera account nahi", "loan apply nahi kiya", "kabhi yeh loan nahi",
-        "yeh mistake hai", "wrong person hai", "yeh debt nahi liya",
-        "unauthorized transaction", "loan sign nahi kiya", "identity theft lagta",
-        "loan approve nahi kiya", "meri responsibility nahi", "loan accept nahi",
-        "error hai system", "loan acknowledge nahi", "meri liability nahi",
-        "loan authorize nahi", "fake loan hai", "loan verify nahi",
-        "meri mistake nahi", "loan process nahi", "wrong account hai",
-        "loan document nahi sign", "meri fault nahi", "loan agree nahi",
-        "incorrect information hai"
-    ]
-    
-    if any(phrase in text for phrase in dispute_phrases):
-        # Exclude if it's clearly about financial hardship/condition (not loan denial)
-        financial_hardship_context = [
-            "financial condition", "financial situation", "financial problem",
-            "financially", "income", "salary", "funds", "savings", "paise",
-            "naukri", "job", "struggling", "weak", "unstable", "crisis"
-        ]
-        # Only exclude if the phrase is clearly about financial condition AND doesn't contain loan denial words
-        if any(context in text for context in financial_hardship_context):
-            # Check if it's actually about loan denial (contains loan/debt/account denial words)
-            loan_denial_words = ["loan", "debt", "account", "mera nahi", "meri nahi", 
-                                "liya", "kiya", "sign", "approve", "apply"]
-            if not any(word in text for word in loan_denial_words):
-                # This is about financial condition, not loan denial - skip dispute check
-                pass
-            else:
-                return "disputed"
-        else:
-            return "disputed"
-
-    # Very clear callback signals (including Hinglish)
-    if any(phrase in text for phrase in [
-        "call later", "call me later", "call back", "callback",
-        "call me next week", "call me next month", "call me tomorrow",
-        "call me next time", "call me some other time",
-        "call you back", "call back later", "call back tomorrow",
-        "next week", "next month", "tomorrow", "some other time",
-        "busy now", "busy right now", "busy at the moment", "busy currently",
-        "not available", "not available now", "not available right now",
-        "out of town", "currently out", "away", "travelling", "traveling",
-        "can't talk now", "cant talk now", "cannot talk now",
-        "not a good time", "bad time", "inconvenient time",
-        "later please", "please call later", "call me when convenient",
-        # Hinglish phrases - expanded patterns
-        "baad mein call karo", "abhi busy hoon", "abhi available nahi hoon",
-        "kal call karo", "baad mein baat karte hain", "abhi time nahi hai",
-        "ghar se bahar hoon", "travel kar raha hoon", "abhi baat nahi kar sakta",
-        "aap baad mein call kar sakte", "baad mein call kar sakte hain",
-        "abhi busy hoon kal", "available nahi hoon next week", "next week call karo",
-        "out of town hoon", "next month call karo", "baat nahi kar sakta baad mein",
-        "kal call karo please", "office mein hoon", "next week call kar lena",
-        "time nahi hai evening", "travel kar raha hoon baad mein", "meeting mein hoon",
-        "tomorrow call karo", "abhi driving kar raha", "weekend mein call karo",
-        "convenient nahi hai", "baad mein call kar lena", "ghar par nahi hoon",
-        "discuss nahi kar sakta", "kal subah call karo", "hospital mein hoon",
-        "evening mein call karo", "baat karne ka time nahi", "available rahunga",
-        "family ke saath hoon", "baad mein call kar lena please", "busy hoon later",
-        "tomorrow evening call karo", "important work mein hoon", "next week call"
-    ]):
-        return "callback"
 
-    # Very clear willingness to pay (including partial payment willingness and Hinglish)
-    if any(phrase in text for phrase in [
-        "i want to pay", "i will pay", "i can pay", "i'd like to pay",
-        "ready to pay", "willing to pay", "prepared to pay",
-        "installment", "installments", "monthly payment", "monthly installments",
-        "payment plan", "payemnt plan", "pay plan", "repayment plan",
-        "can i pay in", "can pay in", "pay in installments", "pay in parts",
-        "emi", "equated monthly installment", "monthly emi",
-        "work out a plan", "work out payment", "work something out",
-        "can't pay full", "cant pay full", "cannot pay full",
-        "can't pay in full", "cant pay in full", "cannot pay in full",
-        "can't pay the full", "cant pay the full", "cannot pay the full",
-        "can't pay full amount", "cant pay full amount", "cannot pay full amount",
-        "can pay partial", "can pay some", "can pay part", "can pay portion",
-        "partial payment", "pay partial", "pay some", "pay part",
-        "pay later", "pay next month", "pay after", "pay when",
-        "let's work", "let us work", "we can work", "we can arrange",
-        "interested in paying", "want to settle", "want to clear",
-        "can manage", "can arrange", "can figure out", "can work something out",
-        # Payment options requests
-        "payment options", "payment option", "show payment options", "show me payment options",
-        "i'd like to see payment options", "i would like to see payment options",
-        "i want to see payment options", "want to see payment options",
-        "can i see payment options", "can you show payment options",
-        "what are my options", "what options do i have", "what are the options",
-        "options please", "show options", "show me options",
-        "what can you offer", "can you offer", "do you have options",
-        "i'd like options", "i would like options", "want options",
-        # Hinglish phrases - expanded patterns
-        "main pay kar sakta hoon", "emi chahiye", "payment plan de do",
-        "installment mein pay kar sakta hoon", "monthly pay kar sakta hoon",
-        "full amount nahi de sakta", "thoda thoda pay kar sakta hoon",
-        "payment options dikhao", "kya options hain", "payment kar sakta hoon",
-        "settle kar sakta hoon", "clear kar sakta hoon", "manage kar sakta hoon",
-        "pay karna chahta hoon", "pay karne ko ready", "pay karne ko willing",
-        "installments mein pay", "kya main installments mein", "monthly installments de sakta",
-        "payment options dikhao", "kya options hain", "monthly basis par pay",
-        "thoda thoda pay", "payment karne ko ready", "emi plan chahiye",
-        "pay kar sakta hoon but installments", "payment options kya hain",
-        "settle kar sakta hoon but plan", "monthly pay kar sakta",
-        "kya main payment plan le sakta", "pay karne ko interested",
-        "payment options batao", "monthly emi de sakta", "payment plan choose",
-        "monthly basis par", "settle kar sakta installment mein",
-        "payment plan select", "options chahiye", "payment plan ke liye ready"
-    ]):
-        return "willing"
+# ------------------------------------------------------------------
+# Local statistical model (SECOND SHORTCUT)
+# ------------------------------------------------------------------
 
-    # Additional flexible keyword-based checks for better coverage
-    # Check for paid keywords (past tense indicators)
-    paid_keywords = ["pay kar diya", "payment kar diya", "transfer kar diya", "clear kar diya", 
-                     "settle kar diya", "ho gaya hai", "kar di thi", "bhej diya", "receipt"]
-    if any(keyword in text for keyword in paid_keywords):
-        # Exclude if it's about future payment or asking about payment
-        if not any(phrase in text for phrase in ["nahi kar sakta", "nahi de sakta", "karna chahta", 
-                                                  "kar sakta hoon", "kar sakta", "chahta hoon"]):
-            return "paid"
-    
-    # Check for dispute keywords (denial patterns)
-    # IMPORTANT: Exclude financial hardship phrases to avoid false positives
-    dispute_keywords = ["mera nahi hai", "nahi hai", "galat hai", "fraud", "wrong", "mistake hai", 
-                        "nahi liya", "nahi kiya", "nahi sign", "nahi approve", "meri nahi"]
-    if any(keyword in text for keyword in dispute_keywords):
-        # Exclude if it's about payment ability, financial hardship, or financial condition
-        financial_hardship_indicators = [
-            "pay kar sakta", "payment kar sakta", "de sakta", "afford", "paise",
-            "financial", "financially", "income", "salary", "funds", "savings",
-            "naukri", "job", "struggling", "weak", "unstable", "crisis", "problem",
-            "khatam", "bandh", "nahi hain", "available nahi", "resources"
-        ]
-        if not any(phrase in text for phrase in financial_hardship_indicators):
-            return "disputed"
-    
-    # Additional check for "unable" patterns that might have been missed
-    # This catches phrases that indicate inability to pay but weren't caught earlier
-    unable_indicators = [
-        "nahi de sakta", "nahi kar sakta", "pay nahi", "payment nahi",
-        "salary bandh", "income source", "savings khatam", "funds nahi",
-        "financial condition", "financial situation", "financially weak",
-        "financially unstable", "paise available nahi", "resources nahi"
-    ]
-    if any(indicator in text for indicator in unable_indicators):
-        # Make sure it's not about willingness to pay (which would be "willing")
-        if not any(phrase in text for phrase in ["pay kar sakta", "payment kar sakta", 
-                                                   "installment", "emi", "plan chahiye", 
-                                                   "options chahiye", "willing", "ready"]):
-            return "unable"
-    
-    # Check for callback keywords (time/deferral patterns)
-    callback_keywords = ["call karo", "call kar", "baad mein", "kal", "tomorrow", "next week", 
-                         "next month", "busy hoon", "available nahi", "time nahi", "call sakte"]
-    if any(keyword in text for keyword in callback_keywords):
-        return "callback"
-    
-    # Check for willing keywords (payment-related but not already paid)
-    willing_keywords = ["pay kar sakta", "payment kar sakta", "emi", "installment", "plan chahiye", 
-                         "options chahiye", "karna chahta", "ready hoon", "willing", "chahta hoon"]
-    if any(keyword in text for keyword in willing_keywords):
-        return "willing"
+_intent_model = None
+_intent_model_loaded = False
+_intent_model_lock = threading.Lock()
 
-    return "unknown"
+
+def _get_intent_model():
+    """Load the model artifact on first use. Returns None if absent or disabled."""
+    global _intent_model, _intent_model_loaded
+
+    if _intent_model_loaded:
+        return _intent_model
+
+    with _intent_model_lock:
+        if not _intent_model_loaded:
+            if INTENT_MODEL_PATH and os.path.exists(INTENT_MODEL_PATH):
+                try:
+                    _intent_model = IntentModel.load(INTENT_MODEL_PATH)
+                    intent_log.info("Loaded local model %s (%d training examples)",
+                                    INTENT_MODEL_PATH, _intent_model.trained_examples)
+                except Exception as e:
+                    intent_log.warning("Local model unavailable (%s), skipping that tier", e)
+            _intent_model_loaded = True
+    return _intent_model
+
+
+def classify_intent_with_model(prompt: str):
+    """
+    Intent from the local model if it is confident enough, else None.
+    "unknown" is never accepted here; uncertain inputs go to Azure OpenAI.
+    """
+    model = _get_intent_model()
+    if model is None:
+        return None
+
+    intent, probability = model.predict(prompt)
+    if intent != "unknown" and probability >= INTENT_MODEL_THRESHOLD:
+        intent_log.debug("Local model: %s (p=%.3f)", intent, probability)
+        return intent
+    return None
 
 
 # ------------------------------------------------------------------
-# Unified classifier (RULES → AZURE OPENAI)
+# Unified classifier (CACHE → RULES → LOCAL MODEL → AZURE OPENAI)
 # ------------------------------------------------------------------
 
-def classify_intent(prompt: str) -> str:
+# Cache of paid LLM classifications (rule-based answers are cheap and not cached)
+_intent_cache = TTLCache("intent", maxsize=INTENT_CACHE_SIZE, ttl=INTENT_CACHE_TTL_SECONDS)
+
+# Identifies the classification prompt + deployment; part of every cache key,
+# so editing the prompt or switching model never serves stale answers
+INTENT_PROMPT_VERSION = hashlib.sha1(
+    f"{_provider.model}|{_build_classification_prompt('{utterance}')}".encode("utf-8")
+).hexdigest()[:12]
+
+
+_intent_store = None
+_intent_store_lock = threading.Lock()
+
+
+def intent_cache_key(prompt: str) -> str:
+    """Cache key for an utterance: hash of prompt version + normalised text."""
+    return hash_key(INTENT_PROMPT_VERSION, normalize_utterance(prompt))
+
+
+def _get_intent_store():
+    """
+    Open the persistent tier on first use (if configured) and warm the
+    in-memory cache with its most recent entries in one batched read.
+    """
+    global _intent_store
+
+    if not INTENT_CACHE_DB or _intent_store is not None:
+        return _intent_store
+
+    with _intent_store_lock:
+        if _intent_store is None:
+            try:
+                store = get_sqlite_store(INTENT_CACHE_DB)
+                rows = store.preload("intent", INTENT_PROMPT_VERSION, INTENT_CACHE_DB_PRELOAD,
+                                     max_age=INTENT_CACHE_DB_TTL_SECONDS)
+                for key, intent in reversed(rows):
+                    _intent_cache.set(key, intent)
+                intent_log.info("Persistent cache %s: preloaded %d entries", INTENT_CACHE_DB, len(rows))
+                _intent_store = store
+            except Exception as e:
+                intent_log.warning("Persistent cache unavailable (%s), continuing in-memory only", e)
+                return None
+    return _intent_store
+
+
+def get_intent_cache_stats() -> dict:
+    """Hit/miss counters and size of the classification cache."""
+    return _intent_cache.stats()
+
+
+def _cached_intent(cache_key: str):
+    """Look the utterance up in memory, then in the persistent tier."""
+    if not INTENT_CACHE_ENABLED:
+        return None
+
+    # Opening the store preloads recent entries, so do it before the memory lookup
+    store = _get_intent_store()
+
+    intent = _intent_cache.get(cache_key)
+    if intent is not None:
+        return intent
+
+    if store is not None:
+        try:
+            intent = store.get("intent", cache_key, max_age=INTENT_CACHE_DB_TTL_SECONDS)
+        except Exception as e:
+            intent_log.warning("Persistent cache read failed: %s", e)
+            intent = None
+        if intent is not None:
+            _intent_cache.set(cache_key, intent)
+    return intent
+
+
+def _remember_intent(cache_key: str, prompt: str, intent: str) -> None:
+    """Store a paid LLM classification in both cache tiers."""
+    if not INTENT_CACHE_ENABLED:
+        return
+
+    _intent_cache.set(cache_key, intent)
+    store = _get_intent_store()
+    if store is not None:
+        store.put("intent", cache_key, intent, version=INTENT_PROMPT_VERSION,
+                  source_text=normalize_utterance(prompt))
+
+
+def _shortcut_intent(prompt: str, cache_key: str):
+    """
+    The intent from the cache, a high-confidence rule match or the local
+    model, or None when only the LLM can tell.
+    """
+    cached_intent = _cached_intent(cache_key)
+    if cached_intent is not None:
+        intent_log.debug("Cached: %s", cached_intent)
+        return cached_intent
+
+    # Try rule-based first (fast)
+    rule_intent, confidence = classify_with_confidence(prompt)
+
+    if confidence >= RULE_CONFIDENCE_THRESHOLD:
+        intent_log.debug("Rule-based: %s (confidence %s)", rule_intent, confidence)
+        return rule_intent
+
+    return classify_intent_with_model(prompt)
+
+
+def classify_intent(prompt: str, deadline: float = None) -> str:
     """
     Unified intent classifier with hybrid approach.
     
     Strategy:
-    1. Try fast rule-based classification for obvious cases
-    2. If uncertain, use Azure OpenAI for intelligent classification
-    3. Always return a valid intent
+    1. Reuse a cached LLM classification of the same utterance
+    2. Accept a high-confidence rule-based match (microseconds, no tokens)
+    3. Accept a confident prediction from the local model (sub-millisecond)
+    4. If still uncertain, use Azure OpenAI for intelligent classification
+       (bounded by the turn's deadline, if one is given)
+    5. Always return a valid intent
     """
-    # Try rule-based first (fast)
-    rule_intent = classify_intent_rule_based(prompt)
-    
-    if rule_intent in ALLOWED_INTENTS:
-        print(f"[INTENT] Rule-based: {rule_intent}")
-        return rule_intent
+    cache_key = intent_cache_key(prompt)
+    shortcut_intent = _shortcut_intent(prompt, cache_key)
+    if shortcut_intent is not None:
+        return shortcut_intent
     
     # Fall back to LLM for complex cases
-    print(f"[INTENT] Using Azure OpenAI for: '{prompt[:50]}...'")
-    azure_intent = classify_intent_with_azure_openai(prompt)
-    print(f"[INTENT] Azure OpenAI classified as: {azure_intent}")
+    intent_log.debug("Using Azure OpenAI for: %r", prompt[:50])
+    azure_intent, from_llm = _classify_with_azure_openai(prompt, deadline)
+    intent_log.debug("Azure OpenAI classified as: %s", azure_intent)
+
+    # Only cache real LLM answers; fallbacks would pin a degraded result
+    if from_llm:
+        _remember_intent(cache_key, prompt, azure_intent)
     
     return azure_intent
 
 
+async def aclassify_intent(prompt: str, deadline: float = None) -> str:
+    """
+    Async twin of classify_intent().
+    Same strategy, but the Azure OpenAI call is awaited.
+    """
+    cache_key = intent_cache_key(prompt)
+    shortcut_intent = _shortcut_intent(prompt, cache_key)
+    if shortcut_intent is not None:
+        return shortcut_intent
+
+    intent_log.debug("Using Azure OpenAI for: %r", prompt[:50])
+    azure_intent, from_llm = await _aclassify_with_azure_openai(prompt, deadline)
+    intent_log.debug("Azure OpenAI classified as: %s", azure_intent)
+
+    if from_llm:
+        _remember_intent(cache_key, prompt, azure_intent)
+
+    return azure_intent
+
+
 # ------------------------------------------------------------------
 # Response generation (for negotiation node)
 # ------------------------------------------------------------------
 
-def generate_negotiation_response(context: str) -> str:
+def _build_negotiation_prompt(context: str) -> str:
+    """Wrap negotiation context with the response instructions."""
+    # Simplified prompt to avoid safety filters
+    return f"""{context}
+
+Respond professionally in 2-3 sentences."""
+
+
+def _parse_negotiation_response(response) -> str:
+    """Validate a negotiation response. Raises if it is unusable."""
+    text, was_blocked = safe_get_response_text(response)
+    return _validate_negotiation_text(text, was_blocked)
+
+
+def _validate_negotiation_text(text: str, was_blocked: bool = False) -> str:
+    """Reject blocked or truncated negotiation text."""
+    # Validate response quality
+    if was_blocked or not text or len(text.strip()) < 20:
+        log.warning("Azure OpenAI response blocked or incomplete, using template")
+        raise InvalidLLMResponse("Blocked or incomplete response")
+
+    return text.strip()
+
+
+def generate_negotiation_response(context: str, deadline: float = None) -> str:
     """
     Generate conversational negotiation responses using Azure OpenAI.
-    Returns None if generation fails (triggers template fallback).
+    Returns None if generation fails or the turn's deadline would be missed
+    (triggers template fallback).
     """
     try:
-        client = get_azure_openai_client()
-        
-        # Simplified prompt to avoid safety filters
-        safe_prompt = f"""{context}
-
-Respond professionally in 2-3 sentences."""
+        client = _provider.get_client()
         
-        response = client.chat.completions.create(
-            model=AZURE_OPENAI_DEPLOYMENT,
-            messages=[{"role": "user", "content": safe_prompt}],
+        response = _create_chat_completion(
+            client,
+            "negotiate",
+            deadline=deadline,
+            model=_provider.model,
+            messages=[{"role": "user", "content": _build_negotiation_prompt(context)}],
             temperature=0.7,
             max_tokens=150
         )
-        
-        text, was_blocked = safe_get_response_text(response)
-        
-        # Validate response quality
-        if was_blocked or not text or len(text.strip()) < 20:
-            print("Warning: Azure OpenAI response blocked or incomplete, using template")
-            raise Exception("Blocked or incomplete response")
-        
-        return text
+        return _parse_negotiation_response(response)
         
     except Exception as e:
-        print(f"Error generating negotiation response: {e}")
+        log.warning("Error generating negotiation response: %s", e)
+        _record_fallback("negotiate", _call_outcome(e))
         return None
 
 
-def generate_payment_plans(outstanding_amount: float, customer_name: str) -> list:
+async def _astream_chat_completion(client, kind: str, on_token, deadline: float = None, **request) -> str:
     """
-    Generate 2-3 payment plan options using Azure OpenAI.
-    Falls back to rule-based plans if generation fails.
+    Streamed chat completion: on_token(text) is called for every content
+    delta as it arrives. Returns the full text. Reading the stream is also
+    bounded by the deadline.
     """
-    
+    start = time.perf_counter()
+    stream = await _acreate_chat_completion(
+        client, kind, deadline=deadline, stream=True, stream_options={"include_usage": True}, **request
+    )
+    parts = []
+    usage = None
+    blocked = False
+
+    async def consume():
+        nonlocal usage, blocked
+        async for chunk in stream:
+            usage = getattr(chunk, "usage", None) or usage
+            if not chunk.choices:
+                continue  # Azure's prompt filter results, and the final usage chunk
+            choice = chunk.choices[0]
+            if getattr(choice, "finish_reason", None) == "content_filter":
+                blocked = True
+                raise Exception("Streamed response blocked by content filter")
+            text = getattr(choice.delta, "content", None)
+            if text:
+                parts.append(text)
+                on_token(text)
+
     try:
-        client = get_azure_openai_client()
-        
-        # Safer prompt structure - Updated for Hinglish
-        prompt = f"""Create 2-3 payment plans for a debt of ₹{outstanding_amount:,.0f}. Plans should be in Hinglish (Hindi + English mix).
+        if deadline is None:
+            await consume()
+        else:
+            await asyncio.wait_for(consume(), timeout=max(deadline - time.time(), 0))
+    except Exception as e:
+        _observe_call(kind, request, start, "blocked" if blocked else _call_outcome(e))
+        raise
+    text = "".join(parts)
+    _observe_call(kind, request, start, "ok")
+    record_token_usage(kind, request["model"], request["messages"], usage, text)
+    return text
 
-Return JSON array only:
-[
-  {{"name": "Plan name", "description": "Details with amount and timeline in Hinglish"}}
-]
 
-Example: {{"name": "3-Month EMI Plan", "description": "3 mahine tak ₹X per month"}}
+async def agenerate_negotiation_response(context: str, deadline: float = None, on_token=None) -> str:
+    """
+    Async twin of generate_negotiation_response().
+    With on_token, the completion is streamed and on_token(text) receives
+    each token as it arrives. Returns None if generation fails (triggers
+    template fallback).
+    """
+    try:
+        client = _provider.get_async_client()
+        request = {
+            "model": _provider.model,
+            "messages": [{"role": "user", "content": _build_negotiation_prompt(context)}],
+            "temperature": 0.7,
+            "max_tokens": 150,
+        }
+
+        if on_token is not None:
+            text = await _astream_chat_completion(client, "negotiate", on_token, deadline, **request)
+            return _validate_negotiation_text(text)
+
+        response = await _acreate_chat_completion(client, "negotiate", deadline=deadline, **request)
+        return _parse_negotiation_response(response)
+
+    except Exception as e:
+        log.warning("Error generating negotiation response: %s", e)
+        _record_fallback("negotiate", _call_outcome(e))
+        return None
+
+
+def _build_plans_prompt(outstanding_amount: float) -> str:
+    """Build the payment plan generation prompt."""
+    # Safer prompt structure - Updated for Hinglish
+    return f"""Create 2-3 payment plans for a debt of ₹{outstanding_amount:,.0f}. Plans should be in Hinglish (Hindi + English mix).
+
+Return JSON: {{"plans": [{{"name": "Plan name", "description": "Details with amount and timeline in Hinglish"}}]}}
+
+Example plan: {{"name": "3-Month EMI Plan", "description": "3 mahine tak ₹X per month"}}
 
 Generate plans:"""
 
-        response = client.chat.completions.create(
-            model=AZURE_OPENAI_DEPLOYMENT,
-            messages=[{"role": "user", "content": prompt}],
+
+class GeneratedPlan(BaseModel):
+    """One LLM-generated payment plan."""
+    name: str = Field(min_length=1)
+    description: str = Field(min_length=1)
+
+
+class GeneratedPlans(BaseModel):
+    """The structured output of a plan generation call."""
+    plans: List[GeneratedPlan] = Field(min_length=1)
+
+
+_PLANS_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {"name": {"type": "string"}, "description": {"type": "string"}},
+        "required": ["name", "description"],
+        "additionalProperties": False,
+    },
+}
+
+
+def _plans_response_format() -> dict:
+    """response_format for plan generation calls (see PLANS_RESPONSE_FORMAT)."""
+    if PLANS_RESPONSE_FORMAT == "json_object":
+        return {"type": "json_object"}
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "payment_plans",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {"plans": _PLANS_SCHEMA},
+                "required": ["plans"],
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+_parse_failures = counter(
+    "llm_parse_failures_total", "LLM responses that could not be used (error=blocked|truncated|json|schema)",
+    ("kind", "error"),
+)
+_discarded_tokens = counter(
+    "llm_discarded_tokens_total", "Tokens paid for LLM responses that failed to parse", ("kind",)
+)
+
+
+def _record_parse_failure(kind: str, error: str, response) -> None:
+    _parse_failures.inc(kind=kind, error=error)
+    usage = getattr(response, "usage", None)
+    if usage is not None and getattr(usage, "prompt_tokens", None) is not None:
+        _discarded_tokens.inc(usage.prompt_tokens + (usage.completion_tokens or 0), kind=kind)
+
+
+def _validation_error(response, error: ValidationError) -> str:
+    """Parse failure label for structured output that did not validate."""
+    if getattr(response.choices[0], "finish_reason", None) == "length":
+        return "truncated"
+    return "json" if any(err["type"] == "json_invalid" for err in error.errors()) else "schema"
+
+
+def _parse_plans(response) -> list:
+    """Validate the structured plan generation output. Raises if unusable."""
+    text, was_blocked = safe_get_response_text(response)
+
+    if was_blocked or not text:
+        plans_log.warning("Plan generation blocked, using fallback")
+        _record_parse_failure("plans", "blocked", response)
+        raise InvalidLLMResponse("Response blocked")
+
+    try:
+        parsed = GeneratedPlans.model_validate_json(text)
+    except ValidationError as e:
+        error = _validation_error(response, e)
+        _record_parse_failure("plans", error, response)
+        raise InvalidLLMResponse(f"Invalid plans output ({error})")
+
+    plans_log.debug("Generated %d payment plans", len(parsed.plans))
+    return [plan.model_dump() for plan in parsed.plans]
+
+
+# Identifies the plans prompt + output format + deployment; part of every plan cache key
+PLANS_PROMPT_VERSION = hashlib.sha1(
+    f"{_provider.model}|{PLANS_RESPONSE_FORMAT}|{_build_plans_prompt(0)}".encode("utf-8")
+).hexdigest()[:12]
+
+_plan_cache = PlanCache(
+    PLANS_PROMPT_VERSION,
+    maxsize=PLAN_CACHE_SIZE,
+    ttl=PLAN_CACHE_TTL_SECONDS,
+    bucket_ratio=PLAN_CACHE_BUCKET_RATIO,
+    db_path=PLAN_CACHE_DB,
+    db_ttl=PLAN_CACHE_DB_TTL_SECONDS,
+)
+
+
+def get_plan_cache_stats() -> dict:
+    """Hit/miss counters and size of the in-memory plan cache."""
+    return _plan_cache.stats()
+
+
+def _cached_plans(outstanding_amount: float, loan_type: str = None):
+    """Plans from the cache, rescaled to this amount, or None."""
+    if not PLAN_CACHE_ENABLED:
+        return None
+    plans = _plan_cache.get(outstanding_amount, loan_type)
+    if plans is not None:
+        plans_log.debug("Cached plans for ₹%.0f (%s)", outstanding_amount, loan_type or "any loan")
+    return plans
+
+
+def _remember_plans(outstanding_amount: float, loan_type: str, plans: list) -> None:
+    """Cache LLM-generated plans (never the fallback plans)."""
+    if PLAN_CACHE_ENABLED:
+        _plan_cache.put(outstanding_amount, loan_type, plans)
+
+
+def generate_payment_plans(outstanding_amount: float, customer_name: str, deadline: float = None,
+                           loan_type: str = None) -> list:
+    """
+    Generate 2-3 payment plan options using Azure OpenAI.
+    Plans already generated for a similar amount and the same loan type are
+    reused from the plan cache. Falls back to rule-based plans if generation
+    fails or the turn's deadline would be missed.
+    """
+    plans = _cached_plans(outstanding_amount, loan_type)
+    if plans is not None:
+        return plans
+
+    try:
+        client = _provider.get_client()
+        
+        response = _create_chat_completion(
+            client,
+            "plans",
+            deadline=deadline,
+            model=_provider.model,
+            messages=[{"role": "user", "content": _build_plans_prompt(outstanding_amount)}],
+            response_format=_plans_response_format(),
             temperature=0.3,
             max_tokens=500
         )
+        plans = _parse_plans(response)
         
-        text, was_blocked = safe_get_response_text(response)
-        
-        if was_blocked or not text:
-            print("Warning: Plan generation blocked, using fallback")
-            raise Exception("Response blocked")
-        
-        # Extract JSON
-        import json
-        import re
-        
-        json_match = re.search(r'\[\s*\{.*?\}\s*\]', text, re.DOTALL)
-        if json_match:
-            json_str = json_match.group(0)
-            plans = json.loads(json_str)
-            
-            if isinstance(plans, list) and len(plans) > 0:
-                for plan in plans:
-                    if 'name' not in plan or 'description' not in plan:
-                        raise Exception("Invalid plan structure")
-                
-                print(f"[PLANS] Generated {len(plans)} payment plans")
-                return plans
-        
-        raise Exception("Could not extract valid JSON")
-        
     except Exception as e:
-        print(f"Error generating payment plans: {e}")
+        plans_log.warning("Error generating payment plans: %s", e)
+        _record_fallback("plans", _call_outcome(e))
+        return generate_fallback_plans(outstanding_amount)
+
+    _remember_plans(outstanding_amount, loan_type, plans)
+    return plans
+
+
+async def agenerate_payment_plans(outstanding_amount: float, customer_name: str,
+                                  deadline: float = None, loan_type: str = None) -> list:
+    """
+    Async twin of generate_payment_plans().
+    Falls back to rule-based plans if generation fails.
+    """
+    plans = _cached_plans(outstanding_amount, loan_type)
+    if plans is not None:
+        return plans
+
+    try:
+        client = _provider.get_async_client()
+
+        response = await _acreate_chat_completion(
+            client,
+            "plans",
+            deadline=deadline,
+            model=_provider.model,
+            messages=[{"role": "user", "content": _build_plans_prompt(outstanding_amount)}],
+            response_format=_plans_response_format(),
+            temperature=0.3,
+            max_tokens=500
+        )
+        plans = _parse_plans(response)
+
+    except Exception as e:
+        plans_log.warning("Error generating payment plans: %s", e)
+        _record_fallback("plans", _call_outcome(e))
         return generate_fallback_plans(outstanding_amount)
 
+    _remember_plans(outstanding_amount, loan_type, plans)
+    return plans
+
 
 def generate_fallback_plans(amount: float) -> list:
     """
     Generate fallback payment plans using rule-based logic.
-    Creates 2-3 standard plans based on amount.
+    Uses the plan engine with only the outstanding amount known.
     """
-    plans = []
-    
-    # Plan 1: Full payment with 5% discount
-    discount = int(amount * 0.05)
-    plans.append({
-        "name": "Immediate Settlement",
-        "description": f"7 din ke andar ₹{amount - discount:,.0f} (5% discount) full payment"
-    })
-    
-    # Plan 2: 3-month installment
-    monthly_3 = int(amount / 3)
-    plans.append({
-        "name": "3-Month EMI Plan",
-        "description": f"3 mahine tak ₹{monthly_3:,.0f} per month"
-    })
-    
-    # Plan 3: 6-month (large amounts) or 2-month (smaller amounts)
-    if amount > 30000:
-        monthly_6 = int(amount / 6)
-        plans.append({
-            "name": "6-Month EMI Plan",
-            "description": f"6 mahine tak ₹{monthly_6:,.0f} per month"
-        })
-    else:
-        monthly_2 = int(amount / 2)
-        plans.append({
-            "name": "2-Month EMI Plan",
-            "description": f"2 mahine tak ₹{monthly_2:,.0f} per month"
-        })
-    
-    print(f"[PLANS] Using fallback plans ({len(plans)} options)")
+    plans = build_payment_plans({"outstanding": amount})
+    plans_log.debug("Using fallback plans (%d options)", len(plans))
     return plans
+
+
+# ------------------------------------------------------------------
+# Combined turn analysis (LLM_COMBINED_TURN)
+# ------------------------------------------------------------------
+
+def _build_turn_prompt(context: str, classify: bool = True, reply: bool = True, plans_for: float = None) -> str:
+    """
+    Ask for a whole turn as one JSON object: the node's context (which
+    describes the reply it needs), then the fields to extract.
+    """
+    if classify:
+        intent = "- intent, the best match of:\n" + textwrap.indent(f"{_INTENT_CATEGORIES}\n{_INTENT_NOTES}", "  ")
+    else:
+        intent = "- intent: paid, disputed, callback, unable, willing or unknown"
+    reply = "your response to the customer, as described above" if reply else "null"
+    plans = ""
+    if plans_for is not None:
+        plans = (f"\n- plans: 2-3 payment plans for ₹{plans_for:,.0f} in Hinglish, e.g. "
+                 f'{{"name": "3-Month EMI Plan", "description": "3 mahine tak ₹X per month"}}')
+    return f"""{context}
+
+Return JSON analysing the customer's last message:
+{intent}
+- amount: rupee amount the customer commits to pay, or null
+- date: date the customer commits to pay on, as DD-MM-YYYY (today is {datetime.now():%d-%m-%Y}), or null
+- plan_choice: number of the offered plan the customer chose, or null
+- reply: {reply}{plans}"""
+
+
+class TurnAnalysis(BaseModel):
+    """The structured output of a combined turn call."""
+    intent: str
+    amount: Optional[float]
+    date: Optional[str]
+    plan_choice: Optional[int]
+    reply: Optional[str]
+    plans: List[GeneratedPlan] = Field(default_factory=list)
+
+
+def _turn_response_format(with_plans: bool) -> dict:
+    """response_format for combined turn calls (see PLANS_RESPONSE_FORMAT)."""
+    if PLANS_RESPONSE_FORMAT == "json_object":
+        return {"type": "json_object"}
+    properties = {
+        "intent": {"type": "string", "enum": ALLOWED_INTENTS},
+        "amount": {"type": ["number", "null"]},
+        "date": {"type": ["string", "null"]},
+        "plan_choice": {"type": ["integer", "null"]},
+        "reply": {"type": ["string", "null"]},
+    }
+    if with_plans:
+        properties["plans"] = _PLANS_SCHEMA
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "turn_analysis",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": properties,
+                "required": list(properties),
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+def _commitment_date(text: str):
+    """A DD-MM-YYYY date from 2020 on (earlier ones are dates of birth), or None."""
+    try:
+        date = datetime.strptime((text or "").strip(), "%d-%m-%Y")
+    except ValueError:
+        return None
+    return date.strftime("%d-%m-%Y") if date.year >= 2020 else None
+
+
+def _parse_turn_analysis(response) -> dict:
+    """
+    Validate a combined turn output. Raises if unusable; slots, reply and
+    plans that make no sense on their own come back as None.
+    """
+    text, was_blocked = safe_get_response_text(response)
+
+    if was_blocked or not text:
+        log.warning("Turn analysis blocked, using separate calls")
+        _record_parse_failure("turn", "blocked", response)
+        raise InvalidLLMResponse("Response blocked")
+
+    try:
+        parsed = TurnAnalysis.model_validate_json(text)
+    except ValidationError as e:
+        error = _validation_error(response, e)
+        _record_parse_failure("turn", error, response)
+        raise InvalidLLMResponse(f"Invalid turn output ({error})")
+
+    if parsed.intent not in ALLOWED_INTENTS:
+        _record_parse_failure("turn", "schema", response)
+        raise InvalidLLMResponse(f"Invalid turn output (intent {parsed.intent!r})")
+
+    reply = (parsed.reply or "").strip()
+    return {
+        "intent": parsed.intent,
+        "amount": parsed.amount if parsed.amount and parsed.amount > 0 else None,
+        "date": _commitment_date(parsed.date),
+        "plan_choice": parsed.plan_choice if parsed.plan_choice and parsed.plan_choice > 0 else None,
+        # Same bar as _validate_negotiation_text(): shorter replies are truncated or blocked
+        "reply": reply if len(reply) >= 20 else None,
+        "plans": [plan.model_dump() for plan in parsed.plans] or None,
+    }
+
+
+def _turn_request(context: str, classify: bool, reply: bool, plans_for: float = None) -> dict:
+    return {
+        "model": _provider.model,
+        "messages": [{"role": "user", "content": _build_turn_prompt(context, classify, reply, plans_for)}],
+        "response_format": _turn_response_format(plans_for is not None),
+        "temperature": 0.3,
+        "max_tokens": (250 if reply else 50) + (0 if plans_for is None else 500),
+    }
+
+
+def _turn_plans(analysis: dict, plans_for: float, loan_type: str) -> dict:
+    """Cache the plans the turn call was asked for; drop any it was not."""
+    if plans_for is None:
+        analysis["plans"] = None
+    elif analysis["plans"]:
+        _remember_plans(plans_for, loan_type, analysis["plans"])
+    return analysis
+
+
+def analyze_turn(context: str, deadline: float = None, classify: bool = True, reply: bool = True,
+                 plans_for: float = None, loan_type: str = None):
+    """
+    One structured call for a whole customer turn (LLM_COMBINED_TURN).
+    `context` is the node's prompt describing the reply it needs; with
+    `classify` the intent categories are spelled out, without `reply` no
+    reply is written, and with `plans_for` (the outstanding amount) plans
+    come back too, and are cached like generate_payment_plans(). Returns {"intent",
+    "amount", "date", "plan_choice", "reply", "plans"} (all but the intent
+    may be None), or None when the call failed and the caller should make
+    its separate calls instead.
+    """
+    try:
+        client = _provider.get_client()
+
+        response = _create_chat_completion(client, "turn", deadline=deadline,
+                                           **_turn_request(context, classify, reply, plans_for))
+        analysis = _parse_turn_analysis(response)
+
+    except Exception as e:
+        log.warning("Error in combined turn analysis: %s", e)
+        _record_fallback("turn", _call_outcome(e))
+        return None
+
+    return _turn_plans(analysis, plans_for, loan_type)
+
+
+async def aanalyze_turn(context: str, deadline: float = None, classify: bool = True, reply: bool = True,
+                        plans_for: float = None, loan_type: str = None):
+    """Async twin of analyze_turn()."""
+    try:
+        client = _provider.get_async_client()
+
+        response = await _acreate_chat_completion(client, "turn", deadline=deadline,
+                                                  **_turn_request(context, classify, reply, plans_for))
+        analysis = _parse_turn_analysis(response)
+
+    except Exception as e:
+        log.warning("Error in combined turn analysis: %s", e)
+        _record_fallback("turn", _call_outcome(e))
+        return None
+
+    return _turn_plans(analysis, plans_for, loan_type)
+
+
+def classify_turn(prompt: str, context: str, deadline: float = None, plans_for: float = None,
+                  loan_type: str = None) -> tuple:
+    """
+    classify_intent() for the combined turn mode. When none of the
+    shortcuts knows the intent and negotiation would need LLM plans for
+    `plans_for` (not in the plan cache), one turn call returns the intent,
+    the slots and the plans instead of a classify and a plans call. With
+    nothing to save, the plain classify call is made: it writes one word,
+    the turn call a JSON object. Returns (intent, analysis); analysis is
+    None unless the turn call was made and succeeded.
+    """
+    cache_key = intent_cache_key(prompt)
+    shortcut_intent = _shortcut_intent(prompt, cache_key)
+    if shortcut_intent is not None:
+        return shortcut_intent, None
+
+    analysis = None
+    if plans_for is not None and _cached_plans(plans_for, loan_type) is None:
+        analysis = analyze_turn(context, deadline, reply=False, plans_for=plans_for, loan_type=loan_type)
+    if analysis is not None:
+        intent, from_llm = analysis["intent"], True
+    else:
+        intent, from_llm = _classify_with_azure_openai(prompt, deadline)
+    intent_log.debug("Azure OpenAI classified as: %s", intent)
+
+    if from_llm:
+        _remember_intent(cache_key, prompt, intent)
+
+    return intent, analysis
+
+
+async def aclassify_turn(prompt: str, context: str, deadline: float = None, plans_for: float = None,
+                         loan_type: str = None) -> tuple:
+    """Async twin of classify_turn()."""
+    cache_key = intent_cache_key(prompt)
+    shortcut_intent = _shortcut_intent(prompt, cache_key)
+    if shortcut_intent is not None:
+        return shortcut_intent, None
+
+    analysis = None
+    if plans_for is not None and _cached_plans(plans_for, loan_type) is None:
+        analysis = await aanalyze_turn(context, deadline, reply=False, plans_for=plans_for, loan_type=loan_type)
+    if analysis is not None:
+        intent, from_llm = analysis["intent"], True
+    else:
+        intent, from_llm = await _aclassify_with_azure_openai(prompt, deadline)
+    intent_log.debug("Azure OpenAI classified as: %s", intent)
+
+    if from_llm:
+        _remember_intent(cache_key, prompt, intent)
+
+    return intent, analysis
@@ -0,0 +1,207 @@
+"""
+LLM providers.
+
+Every chat completion in llm.py goes through the provider selected for the
+process by LLM_PROVIDER:
+
+- "azure" (default): Azure OpenAI, see AzureOpenAIProvider in llm.py;
+- "local": LocalLLMProvider below, a deterministic offline stand-in that
+  answers from the prompt with canned replies after a configurable,
+  seeded latency. Full conversations can be run and benchmarked with no
+  network and no API key.
+
+A provider hands out OpenAI-compatible clients and makes the actual
+create() call; retries, the circuit breaker, deadlines and metrics stay in
+llm.py and apply to every provider alike.
+"""
+
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+from .intent_rules import classify_with_confidence
+from .plan_engine import build_payment_plans
+from .prompt_budget import approximate_tokens
+
+
+# Latency of the local provider: fixed:MS | uniform:LOW_MS,HIGH_MS |
+# normal:MEAN_MS,STD_MS | lognormal:MEDIAN_MS,SIGMA. LOCAL_LLM_LATENCY_<KIND>
+# (CLASSIFY, NEGOTIATE, PLANS, TURN, PROBE) overrides it for one call kind.
+LOCAL_LLM_LATENCY = os.getenv("LOCAL_LLM_LATENCY", "lognormal:250,0.4")
+LOCAL_LLM_SEED = int(os.getenv("LOCAL_LLM_SEED", "0"))
+LOCAL_LLM_ANSWERS = os.getenv("LOCAL_LLM_ANSWERS")  # JSON file {kind: reply text}, optional
+
+DEFAULT_NEGOTIATION_REPLY = (
+    "Main samajh sakta hoon. Kya aap bata sakte hain ki aap pehli payment kis date tak kar payenge?"
+)
+
+
+class LLMProvider:
+    """Source of chat completions. Subclasses set name and model."""
+
+    name = "base"
+    model = ""
+
+    def get_client(self):
+        """Client for synchronous calls (passed back to create())."""
+        return None
+
+    def get_async_client(self):
+        """Client for async calls on the running event loop (passed back to acreate())."""
+        return None
+
+    def create(self, client, kind: str, **request):
+        return client.chat.completions.create(**request)
+
+    async def acreate(self, client, kind: str, **request):
+        return await client.chat.completions.create(**request)
+
+
+def parse_latency(spec: str):
+    """A sampler returning seconds, from a LOCAL_LLM_LATENCY spec."""
+    distribution, _, params = spec.strip().partition(":")
+    values = [float(v) for v in params.split(",") if v.strip()]
+
+    if distribution == "fixed":
+        return lambda rng: values[0] / 1000
+    if distribution == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if distribution == "normal":
+        return lambda rng: max(rng.gauss(values[0], values[1]), 0.0) / 1000
+    if distribution == "lognormal":
+        return lambda rng: values[0] * math.exp(rng.gauss(0, values[1])) / 1000
+    raise ValueError(f"Unknown latency distribution: {spec!r}")
+
+
+def _plans_for(amount: str) -> list:
+    """The plan engine's plans for an amount quoted in a prompt ("45,000"), as name/description pairs."""
+    plans = build_payment_plans({"outstanding": float(amount.replace(",", ""))})
+    return [{"name": p["name"], "description": p["description"]} for p in plans]
+
+
+def _response(text: str, prompt_tokens: int):
+    message = SimpleNamespace(role="assistant", content=text)
+    usage = SimpleNamespace(
+        prompt_tokens=prompt_tokens,
+        completion_tokens=approximate_tokens(text),
+        total_tokens=prompt_tokens + approximate_tokens(text),
+    )
+    return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")], usage=usage)
+
+
+def _chunk(text: str = None, finish_reason: str = None, usage=None):
+    choices = [] if usage is not None else [
+        SimpleNamespace(delta=SimpleNamespace(content=text), finish_reason=finish_reason)
+    ]
+    return SimpleNamespace(choices=choices, usage=usage)
+
+
+class LocalLLMProvider(LLMProvider):
+    """
+    Offline provider with canned answers:
+    - classify: the rule-based intent of the quoted customer response;
+    - plans: the plan engine's plans for the amount in the prompt, as {"plans": [...]};
+    - negotiate: a fixed Hinglish reply; probe: "ok";
+    - turn: the rule-based intent of the customer's last message, no slots,
+      and, when asked for, the fixed reply and the plan engine's plans.
+    Answers can be overridden per kind. Latency is sampled per call from a
+    seeded random generator, so runs are reproducible.
+    """
+
+    name = "local"
+    model = "local"
+
+    def __init__(self, latency: str = "fixed:0", latencies: dict = None, answers: dict = None, seed: int = 0):
+        self._default_latency = parse_latency(latency)
+        self._latencies = {kind: parse_latency(spec) for kind, spec in (latencies or {}).items()}
+        self._answers = dict(answers or {})
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "LocalLLMProvider":
+        latencies = {}
+        for kind in ("classify", "negotiate", "plans", "turn", "probe"):
+            spec = os.getenv(f"LOCAL_LLM_LATENCY_{kind.upper()}")
+            if spec:
+                latencies[kind] = spec
+        answers = {}
+        if LOCAL_LLM_ANSWERS:
+            with open(LOCAL_LLM_ANSWERS, "r", encoding="utf-8") as f:
+                answers = json.load(f)
+        return cls(LOCAL_LLM_LATENCY, latencies, answers, LOCAL_LLM_SEED)
+
+    def sample_latency(self, kind: str) -> float:
+        sampler = self._latencies.get(kind, self._default_latency)
+        with self._rng_lock:
+            return sampler(self._rng)
+
+    def answer(self, kind: str, prompt: str) -> str:
+        if kind in self._answers:
+            return self._answers[kind]
+        if kind == "classify":
+            match = re.search(r'Response: "(.*)"', prompt)
+            return classify_with_confidence(match.group(1) if match else prompt)[0]
+        if kind == "plans":
+            match = re.search(r"₹([\d,]+)", prompt)
+            return json.dumps({"plans": _plans_for(match.group(1) if match else "0")}, ensure_ascii=False)
+        if kind == "turn":
+            said = re.search(r'Customer ne kaha: "(.*)"', prompt)
+            answer = {
+                "intent": classify_with_confidence(said.group(1) if said else prompt)[0],
+                "amount": None, "date": None, "plan_choice": None,
+                "reply": None if "- reply: null" in prompt else DEFAULT_NEGOTIATION_REPLY,
+            }
+            plans = re.search(r"- plans: .* for ₹([\d,]+)", prompt)
+            if plans:
+                answer["plans"] = _plans_for(plans.group(1))
+            return json.dumps(answer, ensure_ascii=False)
+        if kind == "negotiate":
+            return DEFAULT_NEGOTIATION_REPLY
+        return "ok"
+
+    def _plan_call(self, kind: str, request: dict) -> tuple:
+        """(reply text, prompt tokens, latency, timed_out) for a request."""
+        messages = request.get("messages", [])
+        prompt = "\n".join(str(m.get("content") or "") for m in messages)
+        latency = self.sample_latency(kind)
+        timeout = request.get("timeout")
+        timed_out = timeout is not None and latency > timeout
+        prompt_tokens = approximate_tokens(prompt) + 4 * len(messages) + 3
+        return self.answer(kind, prompt), prompt_tokens, (timeout if timed_out else latency), timed_out
+
+    def create(self, client, kind: str, **request):
+        text, prompt_tokens, latency, timed_out = self._plan_call(kind, request)
+        time.sleep(latency)
+        if timed_out:
+            raise TimeoutError(f"Local LLM did not answer within {latency:.2f}s")
+        return _response(text, prompt_tokens)
+
+    async def acreate(self, client, kind: str, **request):
+        text, prompt_tokens, latency, timed_out = self._plan_call(kind, request)
+        if not request.get("stream"):
+            await asyncio.sleep(latency)
+            if timed_out:
+                raise TimeoutError(f"Local LLM did not answer within {latency:.2f}s")
+            return _response(text, prompt_tokens)
+
+        # Streamed: half the latency before the first token, the rest spread over the tokens
+        await asyncio.sleep(latency / 2)
+        if timed_out:
+            raise TimeoutError(f"Local LLM did not answer within {latency:.2f}s")
+        words = text.split(" ")
+
+        async def chunks():
+            for i, word in enumerate(words):
+                await asyncio.sleep(latency / 2 / len(words))
+                yield _chunk(word if i == 0 else " " + word)
+            yield _chunk(finish_reason="stop")
+            yield _chunk(usage=_response(text, prompt_tokens).usage)
+
+        return chunks()
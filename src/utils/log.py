@@ -0,0 +1,150 @@
+"""
+Structured logging for the agent.
+
+Replaces the print() tracing of the graph nodes, the LLM layer and the
+routes. print() formatted every line eagerly and wrote it to stdout on the
+calling thread, so under load every turn serialised on the stdout lock.
+
+- get_logger("intent") returns the "agent.intent" logger; its records are
+  tagged [INTENT] like the old prints. Per-turn tracing is DEBUG, so it is
+  off by default (LOG_LEVEL=INFO).
+- Messages take %-style arguments, formatted only when the record is
+  emitted: a disabled debug line costs one cached level check. Guard
+  arguments that are themselves expensive with log.isEnabledFor(DEBUG).
+- LOG_DEBUG_SAMPLE_RATE keeps that share of DEBUG records (1.0 = all), for
+  tracing a busy worker without logging every turn.
+- LOG_QUEUE (default on): records are put on a queue and formatted and
+  written by one background thread (QueueListener), never by the thread
+  serving the request. Pending records are flushed at exit.
+- LOG_FORMAT: "text" ("time LEVEL [TAG] message key=value") or "json"
+  (one object per line). Structured fields go in extra={"fields": {...}}.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").strip().upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").strip().lower()  # "text" or "json"
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0"))
+LOG_QUEUE = os.getenv("LOG_QUEUE", "true").strip().lower() == "true"
+
+ROOT_LOGGER = "agent"
+
+_listener = None
+_configured = False
+_configure_lock = threading.Lock()
+
+
+def _tag(record: logging.LogRecord) -> str:
+    return record.name.rpartition(".")[2].upper()
+
+
+class TextFormatter(logging.Formatter):
+    """time LEVEL [TAG] message key=value ..."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = (f"{self.formatTime(record, '%Y-%m-%d %H:%M:%S')} {record.levelname:<7} "
+                f"[{_tag(record)}] {record.getMessage()}")
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": _tag(record).lower(),
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RecordQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queues records unformatted. QueueHandler.prepare() would format the
+    message and traceback on the calling thread (and fold the traceback
+    into the message, so JSON records lost their "exception" field). The
+    queue is in-process, so records need not be picklable: args and
+    exc_info go to the listener as they are.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class DebugSampler(logging.Filter):
+    """Passes every record above DEBUG and `rate` of the DEBUG ones."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or self.rate >= 1.0 or random.random() < self.rate
+
+
+def configure_logging(level: str = None, fmt: str = None, sample_rate: float = None,
+                      use_queue: bool = None, stream=None) -> None:
+    """
+    (Re)configure the agent loggers; arguments default to the LOG_* settings.
+    Called on first use of get_logger(); call again to change the setup.
+    """
+    global _listener, _configured
+    with _configure_lock:
+        root = logging.getLogger(ROOT_LOGGER)
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(JSONFormatter() if (fmt or LOG_FORMAT) == "json" else TextFormatter())
+
+        if LOG_QUEUE if use_queue is None else use_queue:
+            records = queue.SimpleQueue()
+            handler = RecordQueueHandler(records)
+            _listener = logging.handlers.QueueListener(records, output)
+            _listener.start()
+        else:
+            handler = output
+
+        handler.addFilter(DebugSampler(LOG_DEBUG_SAMPLE_RATE if sample_rate is None else sample_rate))
+        root.addHandler(handler)
+        root.setLevel(level or LOG_LEVEL)
+        root.propagate = False
+        _configured = True
+
+
+def get_logger(name: str) -> logging.Logger:
+    """The logger for one component (tag), e.g. get_logger("negotiation")."""
+    if not _configured:
+        configure_logging()
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def _flush_at_exit() -> None:
+    if _listener is not None:
+        _listener.stop()
+
+
+atexit.register(_flush_at_exit)
@@ -0,0 +1,136 @@
+"""
+Cache of LLM-generated payment plans, reusable across customers.
+
+The generated plans only really depend on the outstanding amount and the
+loan type: "3 mahine tak ₹15,000 per month" for ₹45,000 is the same offer
+as "3 mahine tak ₹15,667 per month" for ₹47,000. So plans are cached per
+(prompt version, amount bucket, loan type) as a template in which every
+rupee figure is stored as a ratio of the amount it was generated for, and
+rendered for each customer by multiplying the ratios with their exact
+outstanding amount.
+
+- Amount buckets are geometric (PLAN_CACHE_BUCKET_RATIO wide), so
+  structural choices the LLM makes by size (EMI tenure etc.) still fit.
+- The in-memory tier is a TTLCache named "plans"; the optional persistent
+  tier is the shared SQLite store, namespace "plans".
+"""
+
+import json
+import math
+import re
+import threading
+
+from .intent_cache import TTLCache
+from .log import get_logger
+from .sqlite_store import get_sqlite_store, hash_key
+
+log = get_logger("plan_cache")
+
+
+# Rupee figures as written by the LLM and by generate_fallback_plans()
+_RUPEE_AMOUNT = re.compile(r"(₹|Rs\.?|INR)\s?(\d[\d,]*(?:\.\d+)?)")
+
+
+def amount_bucket(amount: float, bucket_ratio: float) -> int:
+    """Geometric bucket index: amounts within a factor of bucket_ratio share a bucket."""
+    return int(math.floor(math.log(max(amount, 1.0)) / math.log(bucket_ratio)))
+
+
+def _field_template(text: str, amount: float) -> dict:
+    """Split text into literal parts and rupee figures expressed as ratios of `amount`."""
+    parts, ratios, prefixes = [], [], []
+    position = 0
+    for match in _RUPEE_AMOUNT.finditer(text):
+        parts.append(text[position:match.start()])
+        prefixes.append(match.group(1))
+        ratios.append(float(match.group(2).replace(",", "")) / amount)
+        position = match.end()
+    parts.append(text[position:])
+    return {"parts": parts, "prefixes": prefixes, "ratios": ratios}
+
+
+def _render_field(template: dict, amount: float) -> str:
+    out = [template["parts"][0]]
+    for prefix, ratio, part in zip(template["prefixes"], template["ratios"], template["parts"][1:]):
+        out.append(f"{prefix}{round(ratio * amount):,.0f}")
+        out.append(part)
+    return "".join(out)
+
+
+def plans_to_template(plans: list, amount: float) -> list:
+    """Amount-independent form of a plan list."""
+    return [
+        {field: _field_template(str(plan[field]), amount) for field in ("name", "description")}
+        for plan in plans
+    ]
+
+
+def render_plans(template: list, amount: float) -> list:
+    """Plans for a customer's exact amount from a cached template."""
+    return [{field: _render_field(plan[field], amount) for field in ("name", "description")} for plan in template]
+
+
+class PlanCache:
+    """Two-tier cache of plan templates keyed by amount bucket and loan type."""
+
+    def __init__(self, version: str, maxsize: int = 1000, ttl: float = 86400, bucket_ratio: float = 1.25,
+                 db_path: str = None, db_ttl: float = None):
+        self.version = version
+        self.bucket_ratio = bucket_ratio
+        self.db_path = db_path
+        self.db_ttl = db_ttl
+        self._memory = TTLCache("plans", maxsize=maxsize, ttl=ttl)
+        self._store = None
+        self._store_failed = False
+        self._store_lock = threading.Lock()
+
+    def key(self, amount: float, loan_type: str = None) -> str:
+        return hash_key(self.version, f"{amount_bucket(amount, self.bucket_ratio)}|{(loan_type or '').lower()}")
+
+    def _get_store(self):
+        """Open the persistent tier on first use, if configured."""
+        if not self.db_path or self._store is not None or self._store_failed:
+            return self._store
+        with self._store_lock:
+            if self._store is None and not self._store_failed:
+                try:
+                    self._store = get_sqlite_store(self.db_path)
+                except Exception as e:
+                    log.warning("Persistent cache unavailable (%s), continuing in-memory only", e)
+                    self._store_failed = True
+        return self._store
+
+    def get(self, amount: float, loan_type: str = None):
+        """Plans rendered for `amount`, or None on a miss."""
+        key = self.key(amount, loan_type)
+        template = self._memory.get(key)
+
+        if template is None:
+            store = self._get_store()
+            if store is not None:
+                try:
+                    value = store.get("plans", key, max_age=self.db_ttl)
+                except Exception as e:
+                    log.warning("Persistent cache read failed: %s", e)
+                    value = None
+                if value is not None:
+                    template = json.loads(value)
+                    self._memory.set(key, template)
+
+        return render_plans(template, amount) if template is not None else None
+
+    def put(self, amount: float, loan_type: str, plans: list) -> None:
+        """Remember LLM-generated plans for every amount in the bucket."""
+        if amount <= 0:
+            return
+        key = self.key(amount, loan_type)
+        template = plans_to_template(plans, amount)
+        self._memory.set(key, template)
+
+        store = self._get_store()
+        if store is not None:
+            store.put("plans", key, json.dumps(template, ensure_ascii=False), version=self.version,
+                      source_text=f"{amount:.0f}|{loan_type or ''}")
+
+    def stats(self) -> dict:
+        return self._memory.stats()
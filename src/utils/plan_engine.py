@@ -0,0 +1,146 @@
+"""
+Deterministic payment plans computed from loan fields.
+
+Plans are typed dicts: the installment amount, number of months and
+discount are numeric fields, and the "name"/"description" shown to the
+customer are rendered from them. Negotiation reads a chosen plan's amount
+from installment_amount instead of parsing it back out of the text.
+
+- build_payment_plans(loan) works from a LOANS record (outstanding, emi,
+  principal, days_past_due, due_date) and needs no LLM call;
+- build_portfolio_plans() computes the plans for every loan in one pass.
+
+PLAN_SOURCE selects where negotiation gets its plans: "engine" (default)
+or "llm" (generate_payment_plans, with the plan cache and prefetch).
+"""
+
+import math
+import os
+from datetime import datetime
+from typing import Literal, Optional, TypedDict
+
+from ..data import LOANS
+
+
+PLAN_SOURCE = os.getenv("PLAN_SOURCE", "engine").strip().lower()  # "engine" or "llm"
+PLAN_SETTLEMENT_DAYS = int(os.getenv("PLAN_SETTLEMENT_DAYS", "7"))
+PLAN_MIN_INSTALLMENT = float(os.getenv("PLAN_MIN_INSTALLMENT", "1000"))
+PLAN_CARD_MIN_DUE_PERCENT = float(os.getenv("PLAN_CARD_MIN_DUE_PERCENT", "5"))
+
+# Settlement discount by delinquency: (minimum days past due, discount %), most overdue first
+SETTLEMENT_DISCOUNTS = ((90, 10.0), (60, 7.5), (0, 5.0))
+
+
+class PaymentPlan(TypedDict):
+    """A payment plan offered to the customer."""
+    kind: Literal["settlement", "installments"]
+    name: str  # Rendered from the fields below
+    description: str  # Rendered from the fields below
+    months: int  # Number of payments (1 for a settlement)
+    installment_amount: float  # Amount of each payment
+    total_amount: float  # Sum of all payments
+    discount_percent: float  # Discount on the outstanding amount
+    discount_amount: float
+    due_day: Optional[int]  # Day of the month installments fall due (from the loan's due_date)
+    due_within_days: Optional[int]  # Days allowed for a settlement payment
+
+
+def settlement_discount_percent(days_past_due: int) -> float:
+    """Discount offered for paying in full; larger for older delinquencies."""
+    for min_days, percent in SETTLEMENT_DISCOUNTS:
+        if days_past_due >= min_days:
+            return percent
+    return 0.0
+
+
+def minimum_installment(loan: dict) -> float:
+    """
+    Smallest monthly payment a plan may ask for: the contractual EMI, or
+    for loans without one (credit cards) the minimum due on the principal.
+    """
+    emi = float(loan.get("emi") or 0)
+    if emi > 0:
+        return emi
+    principal = float(loan.get("principal") or 0)
+    return max(PLAN_MIN_INSTALLMENT, principal * PLAN_CARD_MIN_DUE_PERCENT / 100)
+
+
+def _due_day(due_date: str = None):
+    if not due_date:
+        return None
+    try:
+        return datetime.strptime(due_date, "%Y-%m-%d").day
+    except ValueError:
+        return None
+
+
+def _tenures(outstanding: float, floor: float) -> list:
+    """Installment plan lengths, in months, that keep each payment at or above the floor."""
+    candidates = (3, 6) if outstanding > 30000 else (2, 3)
+    max_months = int(outstanding // floor) if floor > 0 else candidates[-1]
+    months = [m for m in candidates if m <= max_months]
+    if not months and max_months >= 2:
+        months = [max_months]
+    return months
+
+
+def render_plan_text(plan: PaymentPlan) -> tuple:
+    """(name, description) for a plan, in Hinglish."""
+    if plan["kind"] == "settlement":
+        return "Immediate Settlement", (
+            f"{plan['due_within_days']} din ke andar ₹{plan['installment_amount']:,.0f} "
+            f"({plan['discount_percent']:g}% discount) full payment"
+        )
+
+    description = f"{plan['months']} mahine tak ₹{plan['installment_amount']:,.0f} per month"
+    if plan["due_day"]:
+        description += f", har mahine {plan['due_day']} tarikh ko"
+    return f"{plan['months']}-Month EMI Plan", description
+
+
+def _plan(kind: str, months: int, installment_amount: float, total_amount: float,
+          discount_percent: float = 0.0, discount_amount: float = 0.0,
+          due_day: int = None, due_within_days: int = None) -> PaymentPlan:
+    plan = PaymentPlan(
+        kind=kind,
+        name="",
+        description="",
+        months=months,
+        installment_amount=installment_amount,
+        total_amount=total_amount,
+        discount_percent=discount_percent,
+        discount_amount=discount_amount,
+        due_day=due_day,
+        due_within_days=due_within_days,
+    )
+    plan["name"], plan["description"] = render_plan_text(plan)
+    return plan
+
+
+def build_payment_plans(loan: dict) -> list:
+    """
+    Plans for a loan record (see LOANS): a discounted full settlement plus
+    up to two installment plans. Only "outstanding" is required.
+    """
+    outstanding = float(loan["outstanding"])
+    if outstanding <= 0:
+        return []
+
+    percent = settlement_discount_percent(int(loan.get("days_past_due") or 0))
+    discount = float(round(outstanding * percent / 100))
+    plans = [
+        _plan("settlement", 1, outstanding - discount, outstanding - discount,
+              discount_percent=percent, discount_amount=discount, due_within_days=PLAN_SETTLEMENT_DAYS)
+    ]
+
+    due_day = _due_day(loan.get("due_date"))
+    for months in _tenures(outstanding, minimum_installment(loan)):
+        plans.append(_plan("installments", months, float(math.ceil(outstanding / months)), outstanding,
+                           due_day=due_day))
+    return plans
+
+
+def build_portfolio_plans(loans: dict = None) -> dict:
+    """Plans for every loan, keyed like `loans` (customer id); defaults to LOANS."""
+    loans = LOANS if loans is None else loans
+    return {key: build_payment_plans(loan) for key, loan in loans.items() if loan}
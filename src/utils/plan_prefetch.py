@@ -0,0 +1,160 @@
+"""
+Speculative payment plan prefetch.
+
+Without prefetch, the customer's "willing" turn pays for two LLM round trips
+back to back: payment_check classifies the intent, then negotiation
+generates the plans. The plans don't depend on that answer, so they are
+generated in the background as soon as the disclosure has been shown,
+while the customer is still reading and typing:
+
+- disclosure_node starts the prefetch, keyed by session id;
+- negotiation_node takes the result (waiting for it, within the turn's
+  deadline, if it is already running) instead of calling the LLM again;
+- payment_check_node discards it when the intent is not "willing".
+
+Unused prefetches expire after PLAN_PREFETCH_TTL_SECONDS. plan_prefetch_total
+counts each prefetch as a hit, as wasted (its LLM call was made for
+nothing) or as cancelled (dropped while still queued, before any call),
+and negotiations that had none as a miss.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from .llm import generate_payment_plans
+from .log import get_logger
+from .metrics import counter, gauge
+
+log = get_logger("plan_prefetch")
+
+
+PLAN_PREFETCH_ENABLED = os.getenv("PLAN_PREFETCH_ENABLED", "true").strip().lower() == "true"
+PLAN_PREFETCH_WORKERS = int(os.getenv("PLAN_PREFETCH_WORKERS", "16"))
+PLAN_PREFETCH_TTL_SECONDS = float(os.getenv("PLAN_PREFETCH_TTL_SECONDS", "600"))
+
+_prefetches = counter(
+    "plan_prefetch_total", "Speculative plan generations by outcome (started/hit/miss/wasted/cancelled)", ("result",)
+)
+_pending = gauge("plan_prefetch_pending", "Prefetched plan sets waiting to be used or discarded")
+
+_executor = ThreadPoolExecutor(max_workers=PLAN_PREFETCH_WORKERS, thread_name_prefix="plan-prefetch")
+_entries = {}  # session_id -> (started_at, amount, future)
+_lock = threading.Lock()
+
+
+def _drop(future) -> None:
+    """Give up on a prefetch: cancelled if it was still queued, otherwise its call was wasted."""
+    _prefetches.inc(result="cancelled" if future.cancel() else "wasted")
+
+
+def _expire_stale(now: float) -> None:
+    """Drop prefetches for sessions that never reached a decision. Caller holds the lock."""
+    for session_id in [sid for sid, (started, _a, _f) in _entries.items() if now - started > PLAN_PREFETCH_TTL_SECONDS]:
+        _drop(_entries.pop(session_id)[2])
+
+
+def start_plan_prefetch(session_id: str, outstanding_amount: float, customer_name: str,
+                        loan_type: str = None) -> bool:
+    """Begin generating plans for a session in the background. Returns True if started."""
+    if not PLAN_PREFETCH_ENABLED or not session_id:
+        return False
+
+    now = time.time()
+    with _lock:
+        _expire_stale(now)
+        if session_id in _entries:
+            return False
+        future = _executor.submit(generate_payment_plans, outstanding_amount, customer_name, loan_type=loan_type)
+        _entries[session_id] = (now, outstanding_amount, future)
+        _pending.set(len(_entries))
+
+    _prefetches.inc(result="started")
+    log.debug("Started for session %s", session_id[:8])
+    return True
+
+
+def _pop(session_id: str, outstanding_amount: float):
+    """Remove and return the prefetch future for a session, if it is usable."""
+    if not session_id:
+        return None
+    with _lock:
+        entry = _entries.pop(session_id, None)
+        _pending.set(len(_entries))
+    if entry is None:
+        _prefetches.inc(result="miss")
+        return None
+
+    _started, amount, future = entry
+    if amount != outstanding_amount:
+        _drop(future)
+        return None
+
+    # Still queued behind other prefetches: calling directly is faster than waiting
+    if future.cancel():
+        _prefetches.inc(result="cancelled")
+        return None
+    return future
+
+
+def _remaining(deadline: float = None):
+    return None if deadline is None else max(deadline - time.time(), 0)
+
+
+def take_prefetched_plans(session_id: str, outstanding_amount: float, deadline: float = None):
+    """
+    Plans prefetched for this session, or None (no prefetch, or it did not
+    finish before the deadline). Waits for a prefetch that is still running.
+    """
+    future = _pop(session_id, outstanding_amount)
+    if future is None:
+        return None
+    try:
+        plans = future.result(timeout=_remaining(deadline))
+    except FutureTimeoutError:
+        _prefetches.inc(result="wasted")
+        return None
+
+    _prefetches.inc(result="hit")
+    log.debug("Using prefetched plans for session %s", session_id[:8])
+    return plans
+
+
+async def atake_prefetched_plans(session_id: str, outstanding_amount: float, deadline: float = None):
+    """Async twin of take_prefetched_plans(); waits without blocking the event loop."""
+    future = _pop(session_id, outstanding_amount)
+    if future is None:
+        return None
+    try:
+        plans = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout=_remaining(deadline))
+    except asyncio.TimeoutError:
+        _prefetches.inc(result="wasted")
+        return None
+
+    _prefetches.inc(result="hit")
+    log.debug("Using prefetched plans for session %s", session_id[:8])
+    return plans
+
+
+def has_prefetched_plans(session_id: str) -> bool:
+    """Whether plans are being (or have been) prefetched for a session."""
+    with _lock:
+        return bool(session_id) and session_id in _entries
+
+
+def discard_prefetched_plans(session_id: str) -> None:
+    """Throw away a session's prefetch (the customer is not negotiating)."""
+    if not session_id:
+        return
+    with _lock:
+        entry = _entries.pop(session_id, None)
+        _pending.set(len(_entries))
+    if entry is not None:
+        _drop(entry[2])
+
+
+def shutdown_plan_prefetch() -> None:
+    """Release prefetch worker threads (called on application shutdown)."""
+    _executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,130 @@
+"""
+Token budgeting for LLM prompts.
+
+- approximate_tokens() estimates a text's token count locally (no
+  tokenizer download): letters in ~4-character pieces, digits in groups
+  of three, every other symbol (₹, punctuation, Devanagari) on its own.
+- roll_summary() folds conversation turns that have scrolled out of the
+  prompt's recent window into a short rolling summary, kept in CallState
+  so each turn only summarises the messages that are new since the last.
+- truncate_to_tokens() caps a single piece of text.
+- record_token_usage() counts prompt and completion tokens per LLM call,
+  from the API's usage field when present and estimated otherwise.
+"""
+
+import os
+import re
+
+from .metrics import counter, histogram
+
+
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "600"))
+PROMPT_RECENT_MESSAGES = int(os.getenv("PROMPT_RECENT_MESSAGES", "6"))
+PROMPT_MESSAGE_TOKENS = int(os.getenv("PROMPT_MESSAGE_TOKENS", "80"))
+PROMPT_SUMMARY_TOKENS = int(os.getenv("PROMPT_SUMMARY_TOKENS", "150"))
+PROMPT_SUMMARY_LINE_TOKENS = int(os.getenv("PROMPT_SUMMARY_LINE_TOKENS", "25"))
+
+TOKEN_BUCKETS = (10, 25, 50, 100, 250, 500, 1000, 2000, 4000, 8000)
+
+# Per-message overhead of the chat format (role, separators) and per request
+MESSAGE_OVERHEAD_TOKENS = 4
+REQUEST_OVERHEAD_TOKENS = 3
+
+_tokens_per_call = histogram(
+    "llm_tokens_per_call", "Tokens per LLM call by kind (type=prompt|completion)", ("kind", "type"),
+    buckets=TOKEN_BUCKETS,
+)
+_tokens_total = counter(
+    "llm_tokens_total", "LLM tokens by kind, deployment and type, from API usage or local estimate",
+    ("kind", "deployment", "type", "source"),
+)
+_trimmed = counter("llm_prompt_trimmed_total", "Prompts trimmed to fit the token budget", ("prompt",))
+
+_PIECE = re.compile(r"[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]")
+
+
+def approximate_tokens(text: str) -> int:
+    """Approximate token count of a text."""
+    if not text:
+        return 0
+    tokens = 0
+    for piece in _PIECE.findall(text):
+        if piece[0].isascii() and piece[0].isalpha():
+            tokens += (len(piece) + 3) // 4
+        elif piece.isascii():
+            tokens += 1
+        else:
+            tokens += max(1, len(piece.encode("utf-8")) // 2)
+    return tokens
+
+
+def count_message_tokens(messages: list) -> int:
+    """Approximate prompt tokens of a chat completion's messages."""
+    return REQUEST_OVERHEAD_TOKENS + sum(
+        MESSAGE_OVERHEAD_TOKENS + approximate_tokens(str(m.get("content") or "")) for m in messages
+    )
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text at a word boundary so it fits in max_tokens (marked with "...")."""
+    if approximate_tokens(text) <= max_tokens:
+        return text
+    kept, used = [], approximate_tokens("...")
+    for word in text.split():
+        cost = approximate_tokens(word)
+        if used + cost > max_tokens:
+            break
+        kept.append(word)
+        used += cost
+    return " ".join(kept) + "..."
+
+
+def _summary_line(message: dict) -> str:
+    role = "Agent" if message.get("role") == "assistant" else "Customer"
+    first_line = str(message.get("content") or "").strip().split("\n")[0]
+    return f"{role}: {truncate_to_tokens(first_line, PROMPT_SUMMARY_LINE_TOKENS)}"
+
+
+def roll_summary(messages: list, summary: str = None, summarized: int = 0,
+                 keep_recent: int = PROMPT_RECENT_MESSAGES) -> tuple:
+    """
+    Fold the messages older than the last `keep_recent` into the summary.
+    `summarized` is how many messages the summary already covers. Returns
+    (summary, summarized); the oldest lines go first when the summary
+    outgrows PROMPT_SUMMARY_TOKENS.
+    """
+    if summarized > len(messages):  # history was reset
+        summary, summarized = None, 0
+
+    fold = messages[summarized:max(len(messages) - keep_recent, summarized)]
+    if not fold:
+        return summary, summarized
+
+    lines = (summary.split("\n") if summary else []) + [_summary_line(m) for m in fold]
+    while len(lines) > 1 and approximate_tokens("\n".join(lines)) > PROMPT_SUMMARY_TOKENS:
+        lines.pop(0)
+    return "\n".join(lines), summarized + len(fold)
+
+
+def record_trim(prompt: str) -> None:
+    """Count a prompt that had to be trimmed to fit its budget."""
+    _trimmed.inc(prompt=prompt)
+
+
+def record_token_usage(kind: str, deployment: str, messages: list, usage=None, completion_text: str = "") -> tuple:
+    """
+    Record one call's prompt and completion tokens under its call kind
+    (classify/negotiate/plans/turn/probe) and deployment. Uses the response's
+    usage when the API returned it, the local estimate otherwise.
+    Returns (prompt_tokens, completion_tokens).
+    """
+    if usage is not None and getattr(usage, "prompt_tokens", None) is not None:
+        prompt, completion, source = usage.prompt_tokens, usage.completion_tokens or 0, "usage"
+    else:
+        prompt, completion, source = count_message_tokens(messages), approximate_tokens(completion_text), "estimate"
+
+    _tokens_per_call.observe(prompt, kind=kind, type="prompt")
+    _tokens_per_call.observe(completion, kind=kind, type="completion")
+    _tokens_total.inc(prompt, kind=kind, deployment=deployment, type="prompt", source=source)
+    _tokens_total.inc(completion, kind=kind, deployment=deployment, type="completion", source=source)
+    return prompt, completion
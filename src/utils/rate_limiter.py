@@ -0,0 +1,142 @@
+"""
+Client-side rate limiter matched to an Azure OpenAI deployment's quota.
+
+Azure enforces requests-per-minute (RPM) and tokens-per-minute (TPM) per
+deployment, over short windows rather than the whole minute, and counts a
+request's tokens at admission as its estimated prompt plus max_tokens. A
+burst above that is answered with 429s, which the callers turn into
+rule/template fallbacks. RateLimiter keeps the process (or, with a shared
+store, every worker on the host) under the quota instead:
+
+- two token buckets, requests and tokens, refilled continuously at
+  RPM/60 and TPM/60 per second and holding burst_seconds of quota. Over
+  any window of W seconds a bucket admits at most burst + rate x W, so for
+  Azure's 1 s windows the limits go a little under the quota and the
+  burst stays within the difference (e.g. 90% of the quota, 0.1 s);
+- a call reserves one request and its estimated tokens. When the buckets
+  are short it waits its turn (reservations queue in arrival order) for
+  at most `max_wait`; a call that would wait longer reserves nothing and
+  raises RateLimitExceeded at once;
+- with a SQLiteStore the bucket levels live in its shared_state table and
+  are updated in one transaction per call, so all workers draw from one
+  quota. Without one, each process gets the full quota.
+
+Waits are recorded in llm_rate_limit_wait_seconds, rejections in
+llm_rate_limit_rejected_total. service_clock() leaves them out of the
+latencies the breakers and the router attribute to a deployment.
+"""
+
+import asyncio
+import contextvars
+import json
+import threading
+import time
+
+from .metrics import counter, histogram
+
+_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0)
+
+_rate_limit_wait = histogram(
+    "llm_rate_limit_wait_seconds", "Time LLM calls queued for the client-side rate limiter", ("limiter",),
+    buckets=_WAIT_BUCKETS,
+)
+_rate_limit_rejected = counter(
+    "llm_rate_limit_rejected_total", "LLM calls the rate limiter could not admit within their wait limit",
+    ("limiter",),
+)
+
+
+# Seconds the current thread (or asyncio task) has queued in acquire()/aacquire()
+_queued = contextvars.ContextVar("rate_limit_queued_seconds", default=0.0)
+
+
+def service_clock() -> float:
+    """
+    time.perf_counter() minus the time the caller has spent queued for rate
+    limiters: it stands still while a call waits for admission, so a
+    latency measured with it is the deployment's alone.
+    """
+    return time.perf_counter() - _queued.get()
+
+
+class RateLimitExceeded(Exception):
+    """Raised instead of calling the deployment when its quota would be exceeded for too long."""
+
+
+class RateLimiter:
+    """Request and token buckets for one deployment. A limit <= 0 disables its bucket."""
+
+    def __init__(self, name: str, rpm: float = 0, tpm: float = 0, burst_seconds: float = 0.1, store=None):
+        self.name = name
+        self.store = store
+        # bucket -> (refill per second, capacity)
+        self._buckets = {
+            bucket: (limit / 60.0, max(limit / 60.0 * burst_seconds, 1.0))
+            for bucket, limit in (("requests", rpm), ("tokens", tpm)) if limit > 0
+        }
+        self._state = None  # in-process levels when there is no store
+        self._lock = threading.Lock()
+
+    def _reserve(self, state: dict, tokens: int, max_wait: float, now: float) -> tuple:
+        """
+        (new state, wait) after reserving one request and `tokens` from
+        `state`, or (refilled state, None) when the wait would exceed max_wait.
+        Levels may go negative: later calls then wait for this reservation too.
+        A call larger than a bucket's capacity goes out once the bucket is full.
+        """
+        elapsed = max(now - state["at"], 0.0) if state else 0.0
+        levels, wait = {"at": now}, 0.0
+        for bucket, (rate, capacity) in self._buckets.items():
+            level = capacity if not state else min(capacity, state[bucket] + rate * elapsed)
+            levels[bucket] = level
+            need = 1 if bucket == "requests" else tokens
+            if min(need, capacity) > level:
+                wait = max(wait, (min(need, capacity) - level) / rate)
+        if wait > max_wait:
+            return levels, None
+        for bucket in self._buckets:
+            levels[bucket] -= 1 if bucket == "requests" else tokens
+        return levels, wait
+
+    def _take(self, tokens: int, max_wait: float):
+        """Reserve capacity; return the wait before the call may go out, or None."""
+        now = time.time()
+        if self.store is not None:
+            def update(value):
+                state, wait = self._reserve(json.loads(value) if value else None, tokens, max_wait, now)
+                return json.dumps(state), wait
+            return self.store.update_state(f"rate_limit:{self.name}", update)
+
+        with self._lock:
+            self._state, wait = self._reserve(self._state, tokens, max_wait, now)
+        return wait
+
+    def _admitted(self, wait) -> float:
+        if wait is None:
+            _rate_limit_rejected.inc(limiter=self.name)
+            raise RateLimitExceeded(f"Rate limit of '{self.name}' would delay the call too long")
+        _rate_limit_wait.observe(wait, limiter=self.name)
+        _queued.set(_queued.get() + wait)
+        return wait
+
+    def acquire(self, tokens: int, max_wait: float) -> float:
+        """
+        Admit one call of `tokens` estimated tokens, sleeping until it may go
+        out. Returns the seconds waited; raises RateLimitExceeded when that
+        would exceed max_wait.
+        """
+        wait = self._admitted(self._take(tokens, max_wait))
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def aacquire(self, tokens: int, max_wait: float) -> float:
+        """Async twin of acquire(); the shared store is updated off the event loop."""
+        if self.store is not None:
+            wait = await asyncio.to_thread(self._take, tokens, max_wait)
+        else:
+            wait = self._take(tokens, max_wait)
+        wait = self._admitted(wait)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
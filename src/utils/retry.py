@@ -0,0 +1,163 @@
+"""
+Retry policy for Azure OpenAI calls.
+
+Throttling (429) and transient server errors (5xx, timeouts, dropped
+connections) are retried with full-jitter exponential backoff. A server
+supplied Retry-After / retry-after-ms header takes precedence over the
+computed delay. Retries never run past the call's deadline (or the
+policy's own time limit): if the next attempt could not start in time,
+the last error is raised and the caller falls back.
+
+Retries and give-ups are counted by reason, so throttling shows up as
+reason="throttled" and an outage as server_error/connection/timeout.
+"""
+
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+from .log import get_logger
+from .metrics import counter
+
+try:
+    import openai
+except ImportError:  # the callers report the missing package
+    openai = None
+
+log = get_logger("llm_retry")
+
+
+RETRYABLE_SERVER_STATUS = {500, 502, 503, 504}
+
+_retries = counter("llm_retries_total", "LLM call attempts that were retried, by reason", ("reason",))
+_giveups = counter(
+    "llm_retry_giveups_total", "Retryable LLM errors that were not retried (attempts or time exhausted)", ("reason",)
+)
+
+
+class RetryPolicy:
+    """Attempt limit plus backoff bounds."""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.25, max_delay: float = 4.0,
+                 max_elapsed: float = 15.0, min_attempt_seconds: float = 0.3):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_elapsed = max_elapsed                  # used when the call has no deadline
+        self.min_attempt_seconds = min_attempt_seconds  # time an attempt needs after the wait
+
+    def backoff(self, retry_number: int) -> float:
+        """Full jitter: uniform in [0, min(max_delay, base * 2**n)]."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** retry_number)))
+
+
+def _status_code(error: Exception):
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def retry_reason(error: Exception):
+    """Why an error is worth retrying ("throttled", "server_error", ...), or None."""
+    status = _status_code(error)
+    if status == 429:
+        return "throttled"
+    if status in RETRYABLE_SERVER_STATUS:
+        return "server_error"
+    if openai is not None:
+        if isinstance(error, openai.APITimeoutError):
+            return "timeout"
+        if isinstance(error, openai.APIConnectionError):
+            return "connection"
+    return None
+
+
+def is_transient_failure(error: BaseException) -> bool:
+    """
+    Whether an error says the service is unhealthy: a 5xx, timeout or
+    dropped connection. Throttling and other 4xx errors (a content-filtered
+    or malformed request) are answers from a working service.
+    """
+    return (retry_reason(error) in ("server_error", "timeout", "connection")
+            or isinstance(error, (TimeoutError, ConnectionError)))
+
+
+def retry_after_seconds(error: Exception):
+    """Delay requested by the server (retry-after-ms or Retry-After), or None."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(float(value) / 1000, 0.0)
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if value:
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            try:
+                return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+            except (TypeError, ValueError):
+                pass
+    return None
+
+
+def _next_delay(policy: RetryPolicy, error: Exception, retry_number: int, started: float, deadline: float):
+    """
+    Delay before the next attempt, or None if it should not be retried.
+    Counts the retry or give-up under the error's reason.
+    """
+    reason = retry_reason(error)
+    if reason is None:
+        return None
+
+    delay = retry_after_seconds(error)
+    if delay is None:
+        delay = policy.backoff(retry_number)
+
+    limit = deadline if deadline is not None else started + policy.max_elapsed
+    out_of_attempts = retry_number + 1 >= policy.max_attempts
+    if out_of_attempts or time.time() + delay + policy.min_attempt_seconds > limit:
+        _giveups.inc(reason=reason)
+        return None
+
+    _retries.inc(reason=reason)
+    log.info("%s (%s), retrying in %.2fs", reason, type(error).__name__, delay)
+    return delay
+
+
+def call_with_retries(attempt, policy: RetryPolicy, deadline: float = None):
+    """Call attempt() until it succeeds or the error is not worth retrying."""
+    started = time.time()
+    retry_number = 0
+    while True:
+        try:
+            return attempt()
+        except Exception as e:
+            delay = _next_delay(policy, e, retry_number, started, deadline)
+            if delay is None:
+                raise
+        time.sleep(delay)
+        retry_number += 1
+
+
+async def acall_with_retries(attempt, policy: RetryPolicy, deadline: float = None):
+    """Async twin of call_with_retries(); attempt() returns an awaitable."""
+    started = time.time()
+    retry_number = 0
+    while True:
+        try:
+            return await attempt()
+        except Exception as e:
+            delay = _next_delay(policy, e, retry_number, started, deadline)
+            if delay is None:
+                raise
+        await asyncio.sleep(delay)
+        retry_number += 1
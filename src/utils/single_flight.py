@@ -0,0 +1,131 @@
+"""
+Single-flight coalescing of identical in-flight calls.
+
+When a campaign starts, many sessions send the same utterance, or ask for
+plans for the same amount, at the same moment. A SingleFlight lets the
+first caller for a key (the leader) make the call while identical callers
+that arrive before it finishes (followers) wait for it and share its
+result, or its exception. Nothing is kept once the call has finished:
+this deduplicates concurrent work, it is not a cache.
+
+do() serves threads (sync graph nodes), ado() coroutines; async flights
+are per event loop. Followers can bound their wait with a timeout, after
+which they get FlightTimeout and the leader carries on. An async leader
+that is cancelled does not cancel the shared call.
+
+single_flight_requests_total{flight,result} counts each caller as a
+"leader" or as "coalesced".
+"""
+
+import asyncio
+import threading
+
+from .metrics import counter, gauge
+
+
+_requests = counter(
+    "single_flight_requests_total", "Calls by flight and result (leader/coalesced)", ("flight", "result")
+)
+_in_flight = gauge("single_flight_in_flight", "Distinct calls currently in flight", ("flight",))
+
+
+class FlightTimeout(TimeoutError):
+    """A follower gave up waiting for the in-flight call."""
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    # Followers may all have timed out; don't log "exception was never retrieved"
+    if not task.cancelled():
+        task.exception()
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights = {}  # key -> _Flight
+        self._tasks = {}  # (event loop, key) -> asyncio.Task
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def _count(self, leader: bool) -> None:
+        """Record a caller. Caller holds the lock."""
+        if leader:
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+        _requests.inc(flight=self.name, result="leader" if leader else "coalesced")
+        _in_flight.set(len(self._flights) + len(self._tasks), flight=self.name)
+
+    def _finish(self, table: dict, key) -> None:
+        with self._lock:
+            table.pop(key, None)
+            _in_flight.set(len(self._flights) + len(self._tasks), flight=self.name)
+
+    def do(self, key, fn, timeout: float = None):
+        """Return fn(), or the result of the identical call already running."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            self._count(leader)
+
+        if leader:
+            try:
+                flight.result = fn()
+                return flight.result
+            except BaseException as e:
+                flight.error = e
+                raise
+            finally:
+                self._finish(self._flights, key)
+                flight.done.set()
+
+        if not flight.done.wait(timeout):
+            raise FlightTimeout(f"Gave up after {timeout:.2f}s waiting for the in-flight {self.name} call")
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    async def ado(self, key, fn, timeout: float = None):
+        """Async twin of do(): fn is a coroutine function."""
+        loop = asyncio.get_running_loop()
+        task_key = (loop, key)
+        with self._lock:
+            task = self._tasks.get(task_key)
+            leader = task is None
+            if leader:
+                task = self._tasks[task_key] = loop.create_task(self._run(task_key, fn))
+                task.add_done_callback(_retrieve_exception)
+            self._count(leader)
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            raise FlightTimeout(f"Gave up after {timeout:.2f}s waiting for the in-flight {self.name} call")
+
+    async def _run(self, task_key, fn):
+        try:
+            return await fn()
+        finally:
+            self._finish(self._tasks, task_key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._flights) + len(self._tasks),
+            }
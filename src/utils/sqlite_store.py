@@ -0,0 +1,261 @@
+"""
+Persistent, cross-process cache tier backed by a local SQLite file.
+
+The in-memory caches are lost on every deploy and are not shared between
+uvicorn workers. This store keeps results that were already paid for in a
+WAL-mode SQLite file that every worker on the host reads concurrently.
+
+- Entries are namespaced ("intent", "plans", ...) and keyed by a hash of
+  the version + normalised input.
+- Writes are queued and flushed in batches by one background writer
+  thread, so callers never wait on disk.
+- Reads use one connection per thread; get_many() and preload() fetch
+  many keys in a single query.
+- update_state() is the one synchronous write: an atomic read-modify-write
+  of a small piece of state the workers share (e.g. rate limiter buckets).
+"""
+
+import atexit
+import hashlib
+import queue
+import sqlite3
+import threading
+import time
+
+from .log import get_logger
+from .metrics import counter
+
+log = get_logger("sqlite_store")
+
+
+_store_requests = counter(
+    "sqlite_store_requests_total", "Persistent store lookups by namespace and result", ("namespace", "result")
+)
+_store_writes = counter(
+    "sqlite_store_writes_total", "Entries written by the background writer", ("namespace",)
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    namespace   TEXT NOT NULL,
+    key         TEXT NOT NULL,
+    version     TEXT NOT NULL,
+    value       TEXT NOT NULL,
+    source_text TEXT,
+    created_at  REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS idx_cache_entries_recent
+    ON cache_entries (namespace, version, created_at);
+CREATE TABLE IF NOT EXISTS shared_state (
+    name        TEXT PRIMARY KEY,
+    value       TEXT NOT NULL,
+    updated_at  REAL NOT NULL
+);
+"""
+
+
+def hash_key(version: str, normalized: str) -> str:
+    """Stable key for a (version, normalised input) pair."""
+    return hashlib.sha256(f"{version}:{normalized}".encode("utf-8")).hexdigest()
+
+
+class SQLiteStore:
+    """WAL-mode SQLite key/value store with a batching background writer."""
+
+    def __init__(self, path: str, batch_size: int = 64, flush_interval: float = 0.5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._local = threading.local()
+        self._queue = queue.Queue()
+        self._closed = False
+
+        # Create schema and switch to WAL once, up front
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        conn.close()
+
+        self._writer = threading.Thread(target=self._write_loop, name="sqlite-store-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        """Per-thread read connection (SQLite connections are not thread-safe)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def get(self, namespace: str, key: str, max_age: float = None):
+        """Return the stored value for a key, or None."""
+        return self.get_many(namespace, [key], max_age).get(key)
+
+    def get_many(self, namespace: str, keys: list, max_age: float = None) -> dict:
+        """Fetch many keys in one query. Returns {key: value} for the hits."""
+        if not keys:
+            return {}
+
+        min_created = time.time() - max_age if max_age else 0
+        found = {}
+        conn = self._reader()
+        # Stay well under SQLite's bound-parameter limit
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT key, value FROM cache_entries "
+                f"WHERE namespace = ? AND created_at >= ? AND key IN ({placeholders})",
+                [namespace, min_created, *chunk],
+            ).fetchall()
+            found.update(rows)
+
+        _store_requests.inc(len(found), namespace=namespace, result="hit")
+        _store_requests.inc(len(keys) - len(found), namespace=namespace, result="miss")
+        return found
+
+    def preload(self, namespace: str, version: str, limit: int, max_age: float = None) -> list:
+        """Most recent (key, value) pairs for a version, for warming memory caches."""
+        min_created = time.time() - max_age if max_age else 0
+        return self._reader().execute(
+            "SELECT key, value FROM cache_entries "
+            "WHERE namespace = ? AND version = ? AND created_at >= ? "
+            "ORDER BY created_at DESC LIMIT ?",
+            (namespace, version, min_created, limit),
+        ).fetchall()
+
+    def iter_entries(self, namespace: str, version: str = None):
+        """Yield (source_text, value) rows, e.g. as labelled training data."""
+        sql = "SELECT source_text, value FROM cache_entries WHERE namespace = ?"
+        params = [namespace]
+        if version:
+            sql += " AND version = ?"
+            params.append(version)
+        yield from self._reader().execute(sql, params)
+
+    # ------------------------------------------------------------------
+    # Shared state (synchronous, atomic across processes)
+    # ------------------------------------------------------------------
+
+    def update_state(self, name: str, update):
+        """
+        Atomically replace the state stored under `name`: update(current
+        value or None) returns (new value, result), and result is returned.
+        The read and write happen in one IMMEDIATE transaction, so
+        concurrent workers are serialised.
+        """
+        conn = self._reader()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT value FROM shared_state WHERE name = ?", (name,)).fetchone()
+            value, result = update(row[0] if row else None)
+            conn.execute(
+                "INSERT OR REPLACE INTO shared_state (name, value, updated_at) VALUES (?, ?, ?)",
+                (name, value, time.time()),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return result
+
+    # ------------------------------------------------------------------
+    # Writes (queued, flushed by the background writer)
+    # ------------------------------------------------------------------
+
+    def put(self, namespace: str, key: str, value: str, version: str, source_text: str = None) -> None:
+        """Queue an entry for the background writer. Never blocks on disk."""
+        if not self._closed:
+            self._queue.put((namespace, key, version, value, source_text, time.time()))
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            if item is None:
+                self._queue.task_done()
+                break
+
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.task_done()
+                    stopping = True  # after this batch
+                    break
+                batch.append(item)
+
+            try:
+                self._write_batch(conn, batch)
+            except Exception:
+                log.error("Failed to write %d entries", len(batch), exc_info=True)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        conn.close()
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: list) -> None:
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT OR REPLACE INTO cache_entries "
+                "(namespace, key, version, value, source_text, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                batch,
+            )
+            conn.execute("COMMIT")
+            for entry in batch:
+                _store_writes.inc(namespace=entry[0])
+        except sqlite3.Error as e:
+            log.error("Failed to write %d entries: %s", len(batch), e)
+            try:
+                conn.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+
+    def flush(self) -> None:
+        """
+        Block until every queued write has been committed, or until the
+        writer has stopped (the store was closed or the thread died).
+        """
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks and self._writer.is_alive():
+                self._queue.all_tasks_done.wait(self.flush_interval)
+
+    def close(self) -> None:
+        """Flush pending writes and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join(timeout=5)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_sqlite_store(path: str) -> SQLiteStore:
+    """Shared store per file path (one writer thread per process per file)."""
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = SQLiteStore(path)
+            atexit.register(store.close)
+        return store
@@ -0,0 +1,22 @@
+# tests/conftest.py
+
+from types import SimpleNamespace
+
+import pytest
+
+import src.utils.llm as llm
+
+
+@pytest.fixture
+def azure_client(monkeypatch):
+    """
+    Install a fake Azure OpenAI client: azure_client(create) returns a client
+    whose chat.completions.create is `create` and makes it the one
+    llm.get_azure_openai_client() hands out.
+    """
+    def install(create):
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        monkeypatch.setattr(llm, "get_azure_openai_client", lambda: client)
+        return client
+
+    return install
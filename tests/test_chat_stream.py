@@ -0,0 +1,68 @@
+# tests/test_chat_stream.py
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import httpx
+
+import src.utils.llm as llm
+from backend.app import app
+
+
+REPLY = "Samajh sakta hoon. Kya aap 3-Month EMI Plan se shuru kar sakte hain?"
+
+
+def _chunk(text=None, finish_reason=None):
+    delta = SimpleNamespace(content=text)
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason=finish_reason)])
+
+
+class _StreamingCompletions:
+    async def create(self, stream=False, **kwargs):
+        assert stream, "negotiation replies should be streamed"
+
+        async def chunks():
+            yield SimpleNamespace(choices=[])  # Azure prompt filter results
+            for word in REPLY.split(" "):
+                yield _chunk(word + " ")
+            yield _chunk(finish_reason="stop")
+
+        return chunks()
+
+
+def _parse_events(body: str) -> list:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+async def _run_conversation() -> list:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        session_id = (await client.post("/api/init", json={"phone": "+919876543210"})).json()["session_id"]
+        for user_input in ["Yes", "Main installments mein pay kar sakta hoon"]:
+            (await client.post("/api/chat", json={"session_id": session_id, "user_input": user_input})).raise_for_status()
+
+        response = await client.post(
+            "/api/chat/stream", json={"session_id": session_id, "user_input": "Thoda aur time chahiye"}
+        )
+        assert response.headers["content-type"].startswith("text/event-stream")
+        return _parse_events(response.text)
+
+
+def test_stream_emits_tokens_then_final_state(monkeypatch):
+    fake_client = SimpleNamespace(chat=SimpleNamespace(completions=_StreamingCompletions()))
+    monkeypatch.setattr(llm, "get_async_azure_openai_client", lambda: fake_client)
+    monkeypatch.setattr(llm, "get_azure_openai_client", lambda: (_ for _ in ()).throw(RuntimeError("no sync client")))
+
+    events = asyncio.run(_run_conversation())
+
+    tokens = [data["text"] for event, data in events if event == "token"]
+    assert len(tokens) > 1
+    event, final = events[-1]
+    assert event == "done"
+    assert final["stage"] == "negotiation"
+    assert final["messages"][-1]["content"] == "".join(tokens).strip()
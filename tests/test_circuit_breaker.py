@@ -0,0 +1,73 @@
+# tests/test_circuit_breaker.py
+
+import time
+
+import src.utils.llm as llm
+from src.utils.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+
+def test_opens_on_failure_rate_and_recovers_after_cooldown():
+    breaker = CircuitBreaker("test", failure_rate_threshold=0.5, min_calls=4, cooldown_seconds=0.05)
+    for _ in range(2):
+        breaker.record_success(0.1)
+    for _ in range(2):
+        breaker.record_failure(0.1)
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+
+    time.sleep(0.06)
+    assert breaker.allow_request()       # the single trial call
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow_request()   # others are still rejected
+    breaker.record_success(0.1)
+    assert breaker.state == CLOSED
+
+
+def test_opens_on_slow_calls_and_failed_trial_reopens():
+    breaker = CircuitBreaker("test", slow_call_seconds=1.0, slow_call_rate_threshold=0.8,
+                             min_calls=5, cooldown_seconds=0.05)
+    for _ in range(5):
+        breaker.record_success(2.0)
+    assert breaker.state == OPEN
+
+    time.sleep(0.06)
+    assert breaker.allow_request()
+    breaker.record_failure(0.1)
+    assert breaker.state == OPEN
+
+
+def test_open_breaker_falls_back_without_calling_azure(monkeypatch, azure_client):
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        raise TimeoutError("Request timed out")
+
+    azure_client(create)
+    monkeypatch.setattr(llm, "_azure_breaker", CircuitBreaker("azure_openai", min_calls=2, cooldown_seconds=60))
+
+    for _ in range(2):
+        llm.generate_payment_plans(30000, "Test")
+    assert len(calls) == 2
+    assert llm.get_llm_breaker_status()["state"] == OPEN
+
+    plans = llm.generate_payment_plans(30000, "Test")
+    assert plans == llm.generate_fallback_plans(30000)
+    assert llm.classify_intent_with_azure_openai("Main ne payment kar diya hai") == "paid"
+    assert len(calls) == 2
+
+
+def test_client_errors_do_not_open_the_breaker(monkeypatch, azure_client):
+    class ContentFilterError(Exception):
+        status_code = 400
+
+    def create(**kwargs):
+        raise ContentFilterError("The response was filtered due to the prompt triggering content management policy")
+
+    azure_client(create)
+    monkeypatch.setattr(llm, "_azure_breaker", CircuitBreaker("azure_openai", min_calls=2, cooldown_seconds=60))
+
+    for _ in range(3):
+        llm.classify_intent_with_azure_openai("Main ne payment kar diya hai")
+    status = llm.get_llm_breaker_status()
+    assert (status["state"], status["recent_calls"], status["failure_rate"]) == (CLOSED, 3, 0.0)
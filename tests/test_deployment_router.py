@@ -0,0 +1,111 @@
+# tests/test_deployment_router.py
+
+from types import SimpleNamespace
+
+import pytest
+
+import src.utils.llm as llm
+from src.utils.deployment_router import (
+    Deployment, DeploymentRouter, parse_deployments, _deployment_failovers
+)
+
+
+class FakeStatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def _router(*names, **options):
+    return DeploymentRouter([Deployment(name, f"https://{name}.example/", "gpt-4.1-mini") for name in names],
+                            **options)
+
+
+def test_slow_and_failing_deployments_are_avoided():
+    router = _router("fast", "slow", "failing")
+    fast, slow, failing = router.deployments
+    for _ in range(3):
+        router._finish(fast, router._start(fast) - 0.2)
+        router._finish(slow, router._start(slow) - 2.0)
+        router._finish(failing, router._start(failing) - 0.2, FakeStatusError(503))
+
+    assert router.score(fast) < router.score(slow) < router.score(failing)
+    assert {router.choose().name for _ in range(50)} <= {"fast", "slow"}
+    assert router.choose(exclude=[slow, failing]) is fast
+
+
+def test_retryable_error_fails_over_with_the_remaining_time():
+    router = _router("eastus", "westus", decay_seconds=0)
+    eastus, westus = router.deployments
+    eastus.latency_samples, westus.latency, westus.latency_samples = 1, 1.0, 1  # eastus is tried first
+    before = _deployment_failovers.value(deployment="eastus", reason="throttled")
+    calls = []
+
+    def send(deployment, timeout):
+        calls.append((deployment.name, timeout))
+        if deployment is eastus:
+            raise FakeStatusError(429)
+        return "ok"
+
+    assert router.call(send, timeout=5.0) == "ok"
+    assert [name for name, _ in calls] == ["eastus", "westus"]
+    assert 4.0 < calls[1][1] <= 5.0
+    assert eastus.error_rate > 0 and eastus.in_flight == westus.in_flight == 0
+    assert _deployment_failovers.value(deployment="eastus", reason="throttled") == before + 1
+
+
+def test_client_errors_and_exhausted_deployments_raise():
+    router = _router("eastus", "westus")
+
+    def bad_request(deployment, timeout):
+        raise FakeStatusError(400)
+
+    def unavailable(deployment, timeout):
+        raise FakeStatusError(503)
+
+    with pytest.raises(FakeStatusError) as error:
+        router.call(bad_request)
+    assert error.value.status_code == 400
+    assert sum(d.error_rate > 0 for d in router.deployments) == 1
+    assert all(d.breaker.snapshot()["failure_rate"] == 0 for d in router.deployments)
+
+    with pytest.raises(FakeStatusError) as error:
+        router.call(unavailable)
+    assert error.value.status_code == 503
+
+
+def test_parse_deployments_fills_in_defaults(monkeypatch):
+    monkeypatch.setenv("WESTUS_KEY", "west-key")
+    spec = ('[{"endpoint": "https://eastus.example/", "weight": 2},'
+            ' {"endpoint": "https://westus.example/", "deployment": "gpt-4.1", "api_key_env": "WESTUS_KEY"}]')
+
+    eastus, westus = parse_deployments(spec, {"deployment": "gpt-4.1-mini", "api_key": "key", "api_version": "v1"})
+
+    assert (eastus["name"], eastus["weight"], eastus["api_key"]) == ("eastus.example/gpt-4.1-mini", 2.0, "key")
+    assert (westus["name"], westus["deployment"], westus["api_key"]) == ("westus.example/gpt-4.1", "gpt-4.1", "west-key")
+    with pytest.raises(ValueError):
+        parse_deployments('[{"deployment": "gpt-4.1-mini"}]', {})
+
+
+def test_azure_provider_sends_each_call_to_the_routed_deployment(monkeypatch, azure_client):
+    router = _router("eastus", "westus")
+    for deployment in router.deployments:
+        deployment.api_key = "key"
+    models = []
+
+    def reply(**request):
+        models.append(request["model"])
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="ok"), finish_reason="stop")])
+
+    def failing(**request):
+        raise FakeStatusError(503)
+
+    monkeypatch.setattr(llm, "_provider", llm.AzureOpenAIProvider(router))
+    monkeypatch.setattr(llm, "_deployment_clients", {"eastus": azure_client(failing), "westus": azure_client(reply)})
+
+    response = llm._create_chat_completion(llm._provider.get_client(), "probe", model=llm._provider.model,
+                                           messages=[{"role": "user", "content": "Say 'ok'"}], max_tokens=5)
+
+    assert response.choices[0].message.content == "ok"
+    assert models == ["gpt-4.1-mini"]
+    assert llm.get_llm_deployment_status()[1]["name"] == "westus"
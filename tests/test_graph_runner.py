@@ -0,0 +1,71 @@
+# tests/test_graph_runner.py
+
+import asyncio
+import time
+
+import backend.graph_runner as graph_runner
+from backend.graph_runner import run_graph, stream_graph
+
+
+class SlowGraph:
+    """Graph stand-in whose invoke blocks like a synchronous LLM call."""
+
+    def invoke(self, state, config):
+        time.sleep(0.2)
+        return {**state, "done": True}
+
+
+def test_graph_runs_do_not_block_each_other():
+    async def run_many():
+        start = time.perf_counter()
+        results = await asyncio.gather(*[run_graph(SlowGraph(), {"n": i}) for i in range(8)])
+        return results, time.perf_counter() - start
+
+    results, elapsed = asyncio.run(run_many())
+
+    assert all(r["done"] for r in results)
+    # Serial execution would take 8 * 0.2s
+    assert elapsed < 0.8
+
+
+class AsyncGraph:
+    async def ainvoke(self, state, config):
+        await asyncio.sleep(0.01)
+        return {**state, "done": True}
+
+
+def test_each_event_loop_gets_its_own_semaphore(monkeypatch):
+    monkeypatch.setattr(graph_runner, "GRAPH_EXECUTION_MODE", "async")
+
+    async def run_queued():
+        turns = graph_runner.GRAPH_MAX_CONCURRENCY + 1  # enough to wait on the semaphore
+        return await asyncio.gather(*[run_graph(AsyncGraph(), {"n": i}) for i in range(turns)])
+
+    # A semaphore shared across loops fails the second run with "bound to a different event loop"
+    for _ in range(2):
+        assert all(r["done"] for r in asyncio.run(run_queued()))
+
+
+class StreamingGraph:
+    async def astream(self, state, config, stream_mode):
+        for token in ("Theek ", "hai"):
+            yield "custom", {"token": token}
+        yield "values", {**state, "done": True}
+
+
+def test_slow_stream_reader_does_not_hold_a_graph_slot(monkeypatch):
+    monkeypatch.setattr(graph_runner, "GRAPH_EXECUTION_MODE", "async")
+    monkeypatch.setattr(graph_runner, "GRAPH_MAX_CONCURRENCY", 1)
+
+    async def run():
+        stream = stream_graph(StreamingGraph(), {"n": 0})
+        first = await stream.__anext__()
+        # The reader has not got further; the only slot must be free for the next turn
+        other = await asyncio.wait_for(run_graph(AsyncGraph(), {"n": 1}), timeout=1)
+        rest = [event async for event in stream]
+        return [first, *rest], other
+
+    events, other = asyncio.run(run())
+
+    assert events == [("token", "Theek "), ("token", "hai"), ("state", {"n": 0, "done": True})]
+    assert other["done"]
@@ -0,0 +1,44 @@
+# tests/test_health.py
+
+import asyncio
+
+import httpx
+
+import backend.app as app_module
+import src.utils.llm as llm
+
+
+def test_worker_stays_warming_until_every_warmup_attempt_failed(monkeypatch):
+    monkeypatch.setattr(llm, "_readiness", {"status": "cold", "checked_at": None, "latency_ms": None, "error": None})
+    monkeypatch.setattr(app_module, "LLM_WARMUP_ON_STARTUP", True)
+    monkeypatch.setattr(app_module, "LLM_WARMUP_ATTEMPTS", 2)
+    monkeypatch.setattr(app_module, "_warmup_attempts_left", 2)
+    attempts = []
+
+    def failing_warm_up():
+        attempts.append(1)
+        llm._set_readiness(status="failed", error="Connection refused")
+        return llm.get_llm_readiness()
+
+    monkeypatch.setattr(app_module, "warm_up_azure_openai", failing_warm_up)
+
+    async def health():
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/health")
+            return response.status_code, response.json()["status"]
+
+    async def run():
+        warmup = asyncio.create_task(app_module.warm_up_llm())
+        while not attempts:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        between_attempts = await health()  # first attempt failed, retry in 2 s
+        warmup.cancel()
+        app_module._warmup_attempts_left = 0
+        return between_attempts, await health()
+
+    between_attempts, exhausted = asyncio.run(run())
+
+    assert between_attempts == (503, "warming")
+    assert exhausted == (200, "degraded")
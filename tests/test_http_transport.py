@@ -0,0 +1,39 @@
+# tests/test_http_transport.py
+
+import asyncio
+import sys
+
+import src.utils.llm as llm
+
+
+def test_sync_client_uses_the_shared_transport(monkeypatch):
+    monkeypatch.setattr(llm, "AZURE_OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(llm, "_client_cache", None)
+    monkeypatch.setattr(llm, "_http_transport", None)
+    monkeypatch.setattr(llm, "AZURE_OPENAI_KEEPALIVE_EXPIRY", 90.0)
+
+    client = llm.get_azure_openai_client()
+    transport = llm.get_http_transport()
+
+    assert client._client._transport is transport
+    assert transport._pool._keepalive_expiry == 90.0
+    assert transport._pool._max_keepalive_connections == llm.AZURE_OPENAI_MAX_KEEPALIVE
+
+
+def test_http2_without_h2_falls_back_to_http1(monkeypatch):
+    monkeypatch.setattr(llm, "AZURE_OPENAI_HTTP2", True)
+    monkeypatch.setitem(sys.modules, "h2", None)
+    assert llm._http_transport_options()["http2"] is False
+
+
+def test_async_clients_share_settings_per_event_loop(monkeypatch):
+    monkeypatch.setattr(llm, "AZURE_OPENAI_API_KEY", "test-key")
+
+    async def pool():
+        client = llm.get_async_azure_openai_client()
+        assert llm.get_async_azure_openai_client() is client
+        return client._client._transport._pool
+
+    first, second = asyncio.run(pool()), asyncio.run(pool())
+    assert first is not second
+    assert first._keepalive_expiry == second._keepalive_expiry == llm.AZURE_OPENAI_KEEPALIVE_EXPIRY
@@ -0,0 +1,33 @@
+# tests/test_intent_cache.py
+
+import time
+
+from src.utils.intent_cache import TTLCache, normalize_utterance
+
+
+def test_normalize_utterance():
+    assert normalize_utterance("  Payment  HO gaya hai!! ") == "payment ho gaya hai"
+    # Question marks change meaning for the classifier and are kept
+    assert normalize_utterance("Kya?") == "kya?"
+
+
+def test_lru_eviction_and_counters():
+    cache = TTLCache("test_lru", maxsize=2, ttl=60)
+    cache.set("a", "paid")
+    cache.set("b", "callback")
+    assert cache.get("a") == "paid"  # "a" is now most recently used
+    cache.set("c", "willing")        # evicts "b"
+
+    assert cache.get("b") is None
+    assert cache.get("c") == "willing"
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+    assert len(cache) == 2
+
+
+def test_ttl_expiry():
+    cache = TTLCache("test_ttl", maxsize=10, ttl=0.05)
+    cache.set("a", "paid")
+    assert cache.get("a") == "paid"
+    time.sleep(0.06)
+    assert cache.get("a") is None
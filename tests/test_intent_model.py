@@ -0,0 +1,53 @@
+# tests/test_intent_model.py
+
+import src.utils.llm as llm
+from src.utils.intent_model import IntentModel
+from tests.test_cases_comprehensive import TEST_CASES
+from tests.run_comprehensive_tests import WORKFLOW_STATUS_MAP
+
+
+def _train(epochs=10):
+    examples = [(text, WORKFLOW_STATUS_MAP[w]) for w, texts in TEST_CASES.items() for text in texts]
+    return IntentModel().fit(examples, epochs=epochs)
+
+
+def test_save_load_round_trip(tmp_path):
+    model = _train()
+    path = tmp_path / "intent_model.json"
+    model.save(str(path))
+    loaded = IntentModel.load(str(path))
+
+    for text in ["Maine UPI se transfer kar diya", "Kal call karna", "kuch bhi"]:
+        intent, probability = model.predict(text)
+        loaded_intent, loaded_probability = loaded.predict(text)
+        assert loaded_intent == intent
+        assert abs(loaded_probability - probability) < 1e-3
+
+
+def test_generalises_to_spelling_variants():
+    model = _train()
+    assert model.predict("maine payment kr di thi")[0] == "paid"
+
+
+def test_classify_intent_uses_model_below_rule_threshold(monkeypatch):
+    class FixedModel:
+        def predict(self, text):
+            return "callback", 0.97
+
+    monkeypatch.setattr(llm, "_intent_model", FixedModel())
+    monkeypatch.setattr(llm, "_intent_model_loaded", True)
+    monkeypatch.setattr(llm, "INTENT_CACHE_ENABLED", False)
+    monkeypatch.setattr(llm, "_classify_with_azure_openai", lambda prompt, deadline=None: ("unknown", True))
+
+    # No rule matches this, so it would otherwise go to Azure OpenAI
+    assert llm.classify_intent("zzz qqq") == "callback"
+
+
+def test_model_unknown_is_not_accepted(monkeypatch):
+    class UnsureModel:
+        def predict(self, text):
+            return "unknown", 0.99
+
+    monkeypatch.setattr(llm, "_intent_model", UnsureModel())
+    monkeypatch.setattr(llm, "_intent_model_loaded", True)
+    assert llm.classify_intent_with_model("zzz qqq") is None
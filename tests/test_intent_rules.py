@@ -0,0 +1,24 @@
+# tests/test_intent_rules.py
+
+from src.utils.intent_rules import classify_with_confidence, CONFIDENCE_NONE
+from tests.test_cases_comprehensive import TEST_CASES
+from tests.run_comprehensive_tests import WORKFLOW_STATUS_MAP
+
+
+def test_comprehensive_suite():
+    for workflow, texts in TEST_CASES.items():
+        for text in texts:
+            intent, _confidence = classify_with_confidence(text)
+            assert intent == WORKFLOW_STATUS_MAP[workflow], text
+
+
+def test_phrases_match_whole_words_only():
+    # "emi" inside "premium" and "kal" inside "kalyan" are not matches
+    assert classify_with_confidence("premium payment") == ("unknown", CONFIDENCE_NONE)
+    assert classify_with_confidence("kalyan se hoon") == ("unknown", CONFIDENCE_NONE)
+
+
+def test_unmatched_input_is_left_to_the_llm():
+    intent, confidence = classify_with_confidence("I cannot pay right now")
+    assert intent == "unknown"
+    assert confidence == CONFIDENCE_NONE
@@ -0,0 +1,85 @@
+# tests/test_llm_metrics.py
+
+from types import SimpleNamespace
+
+import src.utils.llm as llm
+from src.utils.metrics import Registry
+
+
+def _reply(text, prompt_tokens=120, completion_tokens=30):
+    message = SimpleNamespace(content=text)
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=message, finish_reason="stop")],
+        usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens),
+    )
+
+
+def _labels(kind, outcome):
+    return {"kind": kind, "deployment": llm.AZURE_OPENAI_DEPLOYMENT or "", "outcome": outcome}
+
+
+def test_successful_call_records_latency_outcome_and_tokens(azure_client):
+    text = "Samajh sakta hoon. Kya aap 3-Month EMI Plan se shuru kar sakte hain?"
+    azure_client(lambda **kwargs: _reply(text))
+    labels = _labels("negotiate", "ok")
+    calls = llm._llm_calls.value(**labels)
+    observed = llm._llm_call_duration.count(**labels)
+
+    assert llm.generate_negotiation_response("context") == text
+    assert llm._llm_calls.value(**labels) == calls + 1
+    assert llm._llm_call_duration.count(**labels) == observed + 1
+
+
+def test_blocked_response_is_counted_with_its_fallback(azure_client):
+    blocked = SimpleNamespace(choices=[])
+    azure_client(lambda **kwargs: blocked)
+    calls = llm._llm_calls.value(**_labels("classify", "blocked"))
+    fallbacks = llm._llm_fallbacks.value(kind="classify", reason="blocked")
+
+    llm.classify_intent_with_azure_openai("Main ne payment kar diya hai")
+    assert llm._llm_calls.value(**_labels("classify", "blocked")) == calls + 1
+    assert llm._llm_fallbacks.value(kind="classify", reason="blocked") == fallbacks + 1
+
+
+def test_unparseable_plans_fall_back(monkeypatch, azure_client):
+    monkeypatch.setattr(llm, "PLAN_CACHE_ENABLED", False)
+    azure_client(lambda **kwargs: _reply("no plans here"))
+    fallbacks = llm._llm_fallbacks.value(kind="plans", reason="invalid_response")
+
+    assert llm.generate_payment_plans(45000, "Rajesh") == llm.generate_fallback_plans(45000)
+    assert llm._llm_fallbacks.value(kind="plans", reason="invalid_response") == fallbacks + 1
+
+
+def test_plans_request_structured_output_and_parse_it(monkeypatch, azure_client):
+    requests = []
+
+    def create(**kwargs):
+        requests.append(kwargs)
+        return _reply('{"plans": [{"name": "2-Month EMI Plan", "description": "2 mahine tak ₹22,500 per month"}]}')
+
+    monkeypatch.setattr(llm, "PLAN_CACHE_ENABLED", False)
+    azure_client(create)
+
+    plans = llm.generate_payment_plans(45000, "Rajesh")
+    assert plans == [{"name": "2-Month EMI Plan", "description": "2 mahine tak ₹22,500 per month"}]
+    assert requests[0]["response_format"]["type"] == "json_schema"
+    assert requests[0]["response_format"]["json_schema"]["strict"] is True
+
+
+def test_plans_failing_schema_count_discarded_tokens(monkeypatch, azure_client):
+    monkeypatch.setattr(llm, "PLAN_CACHE_ENABLED", False)
+    reply = _reply('{"plans": [{"name": "Settlement"}]}', prompt_tokens=90, completion_tokens=12)
+    azure_client(lambda **kwargs: reply)
+    failures = llm._parse_failures.value(kind="plans", error="schema")
+    discarded = llm._discarded_tokens.value(kind="plans")
+
+    assert llm.generate_payment_plans(45000, "Rajesh") == llm.generate_fallback_plans(45000)
+    assert llm._parse_failures.value(kind="plans", error="schema") == failures + 1
+    assert llm._discarded_tokens.value(kind="plans") == discarded + 102
+
+
+def test_label_values_are_escaped_in_the_exposition_format():
+    registry = Registry()
+    registry.counter("test_calls_total", "Calls", ("deployment",)).inc(deployment='east "us"\\primary\nbackup')
+
+    assert 'test_calls_total{deployment="east \\"us\\"\\\\primary\\nbackup"} 1' in registry.render_prometheus()
@@ -0,0 +1,46 @@
+# tests/test_llm_provider.py
+
+import asyncio
+import time
+
+import src.utils.llm as llm
+from src.utils.llm_provider import DEFAULT_NEGOTIATION_REPLY, LocalLLMProvider
+from src.utils.plan_engine import build_payment_plans
+
+
+def test_local_provider_answers_every_call_kind(monkeypatch):
+    monkeypatch.setattr(llm, "_provider", LocalLLMProvider())
+    monkeypatch.setattr(llm, "PLAN_CACHE_ENABLED", False)
+
+    assert llm.classify_intent_with_azure_openai("Main ne payment kar diya hai") == "paid"
+    plans = llm.generate_payment_plans(45000, "Rajesh")
+    assert [p["name"] for p in plans] == [p["name"] for p in build_payment_plans({"outstanding": 45000})]
+    assert llm.generate_negotiation_response("context") == DEFAULT_NEGOTIATION_REPLY
+    assert llm.warm_up_azure_openai()["status"] == "ready"
+
+
+def test_latency_is_seeded_and_per_kind():
+    first = LocalLLMProvider("lognormal:200,0.5", {"classify": "fixed:20"}, seed=7)
+    second = LocalLLMProvider("lognormal:200,0.5", {"classify": "fixed:20"}, seed=7)
+
+    samples = [first.sample_latency("negotiate") for _ in range(5)]
+    assert samples == [second.sample_latency("negotiate") for _ in range(5)]
+    assert len(set(samples)) == 5
+    assert first.sample_latency("classify") == 0.02
+
+
+def test_slow_local_provider_respects_the_deadline(monkeypatch):
+    monkeypatch.setattr(llm, "_provider", LocalLLMProvider("fixed:2000"))
+
+    start = time.time()
+    assert llm.generate_negotiation_response("context", time.time() + 0.5) is None
+    assert time.time() - start < 1
+
+
+def test_local_provider_streams_tokens(monkeypatch):
+    monkeypatch.setattr(llm, "_provider", LocalLLMProvider("fixed:20", answers={"negotiate": "Theek hai, hum 5 tarikh note kar lete hain."}))
+    tokens = []
+
+    reply = asyncio.run(llm.agenerate_negotiation_response("context", on_token=tokens.append))
+    assert reply == "Theek hai, hum 5 tarikh note kar lete hain."
+    assert len(tokens) > 1 and "".join(tokens) == reply
@@ -0,0 +1,71 @@
+# tests/test_log.py
+
+import io
+import json
+import logging
+
+import pytest
+
+from src.utils import log as agent_log
+
+
+class _Expensive:
+    formatted = 0
+
+    def __str__(self):
+        _Expensive.formatted += 1
+        return "expensive"
+
+
+@pytest.fixture
+def output():
+    stream = io.StringIO()
+    yield stream
+    agent_log.configure_logging()
+
+
+def test_disabled_debug_is_never_formatted(output):
+    agent_log.configure_logging(level="INFO", use_queue=False, stream=output)
+    log = agent_log.get_logger("test")
+
+    log.debug("Value: %s", _Expensive())
+    log.info("Turn done: %s", _Expensive())
+
+    assert _Expensive.formatted == 1
+    assert output.getvalue().rstrip().endswith("INFO    [TEST] Turn done: expensive")
+
+
+def test_queued_json_records_carry_fields(output):
+    agent_log.configure_logging(level="DEBUG", fmt="json", use_queue=True, stream=output)
+    agent_log.get_logger("negotiation").info("PTP saved", extra={"fields": {"ptp_id": "PTP-1"}})
+    agent_log.configure_logging(level="DEBUG", use_queue=False, stream=io.StringIO())  # flushes the queue
+
+    entry = json.loads(output.getvalue())
+    assert entry["logger"] == "negotiation"
+    assert entry["message"] == "PTP saved"
+    assert entry["ptp_id"] == "PTP-1"
+
+
+def test_queued_json_records_keep_the_exception_field(output):
+    agent_log.configure_logging(fmt="json", use_queue=True, stream=output)
+    try:
+        raise ValueError("bad plan")
+    except ValueError:
+        agent_log.get_logger("plans").exception("Plan generation failed for %s", "Rajesh")
+    agent_log.configure_logging(use_queue=False, stream=io.StringIO())  # flushes the queue
+
+    entry = json.loads(output.getvalue())
+    assert entry["message"] == "Plan generation failed for Rajesh"
+    assert entry["exception"].endswith("ValueError: bad plan")
+
+
+def test_debug_sampling_keeps_warnings(output):
+    agent_log.configure_logging(level="DEBUG", sample_rate=0.0, use_queue=False, stream=output)
+    log = agent_log.get_logger("test")
+
+    log.debug("dropped")
+    log.warning("kept")
+
+    assert "dropped" not in output.getvalue()
+    assert "kept" in output.getvalue()
+    assert log.isEnabledFor(logging.DEBUG)
@@ -0,0 +1,78 @@
+# tests/test_mock_azure_openai.py
+
+import asyncio
+
+import httpx
+import openai
+import pytest
+from openai import AsyncAzureOpenAI
+
+from scripts.mock_azure_openai import MockAzureOpenAI, create_app
+from src.utils.retry import retry_after_seconds
+
+
+def _client(mock: MockAzureOpenAI) -> AsyncAzureOpenAI:
+    http_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=create_app(mock)))
+    return AsyncAzureOpenAI(api_key="mock", api_version="2024-12-01-preview",
+                            azure_endpoint="http://mock", http_client=http_client, max_retries=0)
+
+
+def _classify_request(utterance: str) -> dict:
+    prompt = f'Classify this customer response in a debt collection call.\n\nResponse: "{utterance}"\n'
+    return {"model": "gpt-4.1-mini", "messages": [{"role": "user", "content": prompt}], "max_tokens": 10}
+
+
+def test_real_client_gets_completions_and_usage():
+    async def run():
+        return await _client(MockAzureOpenAI()).chat.completions.create(
+            **_classify_request("Main ne payment kar diya hai")
+        )
+
+    response = asyncio.run(run())
+    assert response.choices[0].message.content == "paid"
+    assert response.usage.prompt_tokens > 0
+
+
+def test_streamed_reply_arrives_in_chunks():
+    async def run():
+        stream = await _client(MockAzureOpenAI()).chat.completions.create(
+            model="gpt-4.1-mini", messages=[{"role": "user", "content": "Customer ne kaha: thoda time chahiye"}],
+            stream=True, stream_options={"include_usage": True},
+        )
+        parts, usage = [], None
+        async for chunk in stream:
+            usage = chunk.usage or usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+        return parts, usage
+
+    parts, usage = asyncio.run(run())
+    assert len(parts) > 3
+    assert usage.completion_tokens > 0
+
+
+def test_throttle_burst_returns_429_with_retry_after():
+    mock = MockAzureOpenAI(burst_every=60, burst_seconds=60, retry_after_ms=250)
+
+    async def run():
+        await _client(mock).chat.completions.create(**_classify_request("Yes"))
+
+    with pytest.raises(openai.RateLimitError) as excinfo:
+        asyncio.run(run())
+    assert retry_after_seconds(excinfo.value) == 0.25
+    assert mock.responses[429] == 1
+
+
+def test_requests_over_the_quota_get_429_until_the_window_has_room():
+    mock = MockAzureOpenAI(rpm=60, tpm=100_000, quota_window=10)  # 10 requests per 10 s
+
+    async def run():
+        client = _client(mock)
+        for _ in range(10):
+            await client.chat.completions.create(**_classify_request("Yes"))
+        await client.chat.completions.create(**_classify_request("Yes"))
+
+    with pytest.raises(openai.RateLimitError) as excinfo:
+        asyncio.run(run())
+    assert 9 < retry_after_seconds(excinfo.value) <= 10
+    assert mock.responses[200] == 10
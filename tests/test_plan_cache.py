@@ -0,0 +1,48 @@
+# tests/test_plan_cache.py
+
+import json
+from types import SimpleNamespace
+
+import src.utils.llm as llm
+from src.utils.plan_cache import PlanCache, plans_to_template, render_plans
+
+
+PLANS = [
+    {"name": "Immediate Settlement", "description": "7 din ke andar ₹42,750 (5% discount) full payment"},
+    {"name": "3-Month EMI Plan", "description": "3 mahine tak ₹15,000 per month"},
+]
+
+
+def test_template_rescales_rupee_figures_exactly():
+    template = plans_to_template(PLANS, 45000)
+    assert render_plans(template, 45000) == PLANS
+
+    rescaled = render_plans(template, 47000)
+    assert rescaled[0]["description"] == "7 din ke andar ₹44,650 (5% discount) full payment"
+    assert rescaled[1]["description"] == "3 mahine tak ₹15,667 per month"
+
+
+def test_cache_is_keyed_by_bucket_and_loan_type():
+    cache = PlanCache("v1", bucket_ratio=1.25)
+    cache.put(45000, "Personal Loan", PLANS)
+
+    assert cache.get(47000, "Personal Loan") is not None
+    assert cache.get(47000, "Vehicle Loan") is None
+    assert cache.get(125000, "Personal Loan") is None
+
+
+def test_generate_payment_plans_reuses_cached_plans(monkeypatch, azure_client):
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        message = SimpleNamespace(content=json.dumps({"plans": PLANS}, ensure_ascii=False))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")])
+
+    azure_client(create)
+    monkeypatch.setattr(llm, "_plan_cache", PlanCache("test", bucket_ratio=1.25))
+
+    assert llm.generate_payment_plans(45000, "Rajesh", loan_type="Personal Loan") == PLANS
+    plans = llm.generate_payment_plans(46000, "Priya", loan_type="Personal Loan")
+    assert plans[1]["description"] == "3 mahine tak ₹15,333 per month"
+    assert len(calls) == 1
@@ -0,0 +1,51 @@
+# tests/test_plan_engine.py
+
+from src.data import LOANS
+from src.nodes.negotiation import has_commitment_details
+from src.state import create_initial_state
+from src.utils.plan_engine import build_payment_plans, build_portfolio_plans
+
+
+def test_plans_are_computed_from_loan_fields():
+    settlement, three, six = build_payment_plans(LOANS["CUST001"])
+
+    assert settlement["kind"] == "settlement"
+    assert settlement["discount_percent"] == 5.0
+    assert settlement["installment_amount"] == 45000 - 2250
+    assert [three["months"], six["months"]] == [3, 6]
+    assert three["installment_amount"] == 15000
+    assert three["due_day"] == 1
+    assert three["description"] == "3 mahine tak ₹15,000 per month, har mahine 1 tarikh ko"
+
+
+def test_installments_never_go_below_the_contractual_emi():
+    loan = {"outstanding": 40000, "emi": 15000, "days_past_due": 95}
+    settlement, installments = build_payment_plans(loan)
+
+    assert settlement["discount_percent"] == 10.0
+    assert installments["months"] == 2
+    assert installments["installment_amount"] >= loan["emi"]
+
+
+def test_portfolio_plans_cover_every_loan():
+    portfolio = build_portfolio_plans()
+    assert set(portfolio) == set(LOANS)
+    assert all(plans and plans[0]["kind"] == "settlement" for plans in portfolio.values())
+
+
+def test_selected_plan_amount_comes_from_its_fields():
+    state = create_initial_state("+919876543211")
+    plans = build_payment_plans(LOANS["CUST002"])
+    for plan in plans:
+        plan["description"] = "details on request"  # no rupee figure to parse
+    state["offered_plans"] = plans
+    state["messages"] = [
+        {"role": "assistant", "content": "Yahan kuch payment options hain"},
+        {"role": "user", "content": "6 month wala plan, 15th December 2025 se"},
+    ]
+
+    has_both, amount, date, plan = has_commitment_details(state, "6 month wala plan, 15th December 2025 se")
+    assert has_both
+    assert plan["months"] == 6
+    assert amount == plans[2]["installment_amount"] == 8750
+    assert date == "15-12-2025"
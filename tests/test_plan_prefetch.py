@@ -0,0 +1,67 @@
+# tests/test_plan_prefetch.py
+
+import threading
+import time
+from concurrent.futures import Future
+
+import src.utils.plan_prefetch as plan_prefetch
+
+
+PLANS = [{"name": "3-Month EMI Plan", "description": "3 mahine tak ₹15,000 per month"}]
+
+
+def _slow_plans(amount, customer_name, loan_type=None):
+    time.sleep(0.05)
+    return PLANS
+
+
+def test_prefetched_plans_are_used_once(monkeypatch):
+    monkeypatch.setattr(plan_prefetch, "generate_payment_plans", _slow_plans)
+    hits = plan_prefetch._prefetches.value(result="hit")
+
+    assert plan_prefetch.start_plan_prefetch("session-hit-0001", 45000, "Rajesh")
+    assert plan_prefetch.take_prefetched_plans("session-hit-0001", 45000, time.time() + 5) == PLANS
+    assert plan_prefetch._prefetches.value(result="hit") == hits + 1
+
+    # Taken already: the next negotiation generates its own
+    assert plan_prefetch.take_prefetched_plans("session-hit-0001", 45000) is None
+
+
+def test_discarded_prefetch_counts_as_wasted(monkeypatch):
+    running = threading.Event()
+
+    def plans(*args, **kwargs):
+        running.set()
+        return _slow_plans(*args, **kwargs)
+
+    monkeypatch.setattr(plan_prefetch, "generate_payment_plans", plans)
+    wasted = plan_prefetch._prefetches.value(result="wasted")
+
+    plan_prefetch.start_plan_prefetch("session-waste-01", 45000, "Rajesh")
+    running.wait(1)
+    plan_prefetch.discard_prefetched_plans("session-waste-01")
+    assert plan_prefetch._prefetches.value(result="wasted") == wasted + 1
+    assert plan_prefetch.take_prefetched_plans("session-waste-01", 45000) is None
+
+
+def test_prefetch_dropped_while_queued_counts_as_cancelled(monkeypatch):
+    class QueuedExecutor:
+        def submit(self, fn, *args, **kwargs):
+            return Future()  # never picked up by a worker
+
+    monkeypatch.setattr(plan_prefetch, "_executor", QueuedExecutor())
+    counts = {result: plan_prefetch._prefetches.value(result=result) for result in ("wasted", "cancelled", "miss")}
+
+    for session_id in ("session-queued-1", "session-queued-2", "session-queued-3"):
+        plan_prefetch.start_plan_prefetch(session_id, 45000, "Rajesh")
+    plan_prefetch.discard_prefetched_plans("session-queued-1")
+    assert plan_prefetch.take_prefetched_plans("session-queued-2", 50000) is None  # amount changed
+    assert plan_prefetch.take_prefetched_plans("session-queued-3", 45000) is None
+
+    assert plan_prefetch._prefetches.value(result="cancelled") == counts["cancelled"] + 3
+    assert plan_prefetch._prefetches.value(result="wasted") == counts["wasted"]
+    assert plan_prefetch._prefetches.value(result="miss") == counts["miss"]
+
+
+def test_no_prefetch_outside_api_sessions():
+    assert not plan_prefetch.start_plan_prefetch(None, 45000, "Rajesh")
@@ -0,0 +1,65 @@
+# tests/test_prompt_budget.py
+
+from types import SimpleNamespace
+
+from src.nodes.negotiation import _build_negotiation_context, _roll_summary
+from src.state import create_initial_state
+from src.utils.plan_engine import build_payment_plans
+from src.utils.prompt_budget import (
+    PROMPT_TOKEN_BUDGET,
+    _tokens_total,
+    approximate_tokens,
+    record_token_usage,
+    roll_summary,
+    truncate_to_tokens,
+)
+
+
+def _messages(count, words=10):
+    return [
+        {"role": "assistant" if i % 2 else "user", "content": f"turn {i} " + "baat " * words}
+        for i in range(count)
+    ]
+
+
+def test_approximate_tokens_counts_words_digits_and_symbols():
+    assert approximate_tokens("") == 0
+    assert approximate_tokens("installment") == 3
+    assert approximate_tokens("₹45,000") == 4
+    assert approximate_tokens(truncate_to_tokens("baat " * 100, 20)) <= 20
+
+
+def test_summary_only_folds_new_messages():
+    messages = _messages(10)
+    summary, summarized = roll_summary(messages, keep_recent=6)
+    assert summarized == 4
+    assert summary.startswith("Customer: turn 0")
+
+    messages += _messages(2)
+    summary, summarized = roll_summary(messages, summary, summarized, keep_recent=6)
+    assert summarized == 6
+    assert summary.count("\n") == 5
+
+
+def test_negotiation_context_fits_the_budget():
+    state = create_initial_state("+919876543210")
+    state["offered_plans"] = build_payment_plans({"outstanding": 45000, "emi": 5000})
+    state["messages"] = _messages(20, words=300)
+    ctx = {"customer_name": "Rajesh", "amount": 45000, "last_user_input": "baat " * 300}
+
+    summary = _roll_summary(state)
+    assert summary["summarized_messages"] == 14
+    context = _build_negotiation_context(state, ctx, summary["conversation_summary"])
+    assert approximate_tokens(context) <= PROMPT_TOKEN_BUDGET
+    assert "3-Month EMI Plan" in context
+
+
+def test_token_usage_prefers_the_api_count():
+    labels = {"kind": "negotiate", "deployment": "test-deployment", "type": "prompt", "source": "usage"}
+    before = _tokens_total.value(**labels)
+    usage = SimpleNamespace(prompt_tokens=321, completion_tokens=12)
+    messages = [{"role": "user", "content": "hi"}]
+
+    assert record_token_usage("negotiate", "test-deployment", messages, usage) == (321, 12)
+    assert _tokens_total.value(**labels) == before + 321
+    assert record_token_usage("negotiate", "test-deployment", messages, None, "theek hai")[1] == 3
@@ -0,0 +1,103 @@
+# tests/test_rate_limiter.py
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import src.utils.llm as llm
+from src.utils.circuit_breaker import CircuitBreaker
+from src.utils.deployment_router import Deployment, DeploymentRouter
+from src.utils.rate_limiter import RateLimiter, RateLimitExceeded, _rate_limit_rejected, _rate_limit_wait
+from src.utils.sqlite_store import SQLiteStore
+
+
+def test_burst_above_the_quota_queues_in_order():
+    limiter = RateLimiter("burst", rpm=600, burst_seconds=0.5)  # 10 requests/s, 5 at once
+    observed = _rate_limit_wait.count(limiter="burst")
+
+    waits = [limiter._take(0, max_wait=1.0) for _ in range(7)]
+
+    assert waits[:5] == [0.0] * 5
+    assert 0.09 < waits[5] < waits[6] <= 0.21
+    start = time.perf_counter()
+    assert limiter.acquire(0, max_wait=1.0) > 0.2
+    assert time.perf_counter() - start >= 0.2
+    assert _rate_limit_wait.count(limiter="burst") == observed + 1
+
+
+def test_call_that_would_wait_too_long_is_refused_without_reserving():
+    limiter = RateLimiter("tokens", tpm=60_000, burst_seconds=1)  # 1000 tokens/s, 1000 at once
+    rejected = _rate_limit_rejected.value(limiter="tokens")
+
+    assert asyncio.run(limiter.aacquire(900, max_wait=0.5)) == 0.0
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire(2000, max_wait=0.5)
+    assert limiter._take(100, max_wait=0.0) == 0.0  # the refused call took nothing
+    assert _rate_limit_rejected.value(limiter="tokens") == rejected + 1
+
+
+def test_workers_sharing_a_store_share_the_quota(tmp_path):
+    path = str(tmp_path / "limits.db")
+    first, second = (RateLimiter("shared", rpm=60, burst_seconds=2, store=SQLiteStore(path)) for _ in range(2))
+
+    assert first._take(0, max_wait=0.0) == 0.0
+    assert second._take(0, max_wait=0.0) == 0.0
+    assert first._take(0, max_wait=0.0) is None  # 2 requests per 2 s, used by the two workers
+
+
+def test_rate_limited_call_falls_back_without_touching_the_breaker(monkeypatch, azure_client):
+    calls = []
+
+    def create(**request):
+        calls.append(request)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="PAYMENT_PLAN"),
+                                                        finish_reason="stop")])
+
+    azure_client(create)
+    monkeypatch.setattr(llm, "_provider", llm.AzureOpenAIProvider(limiter=RateLimiter("test", rpm=6, burst_seconds=10)))
+    monkeypatch.setattr(llm, "LLM_RATE_LIMIT_MAX_WAIT", 0.0)
+    fallbacks = llm._llm_fallbacks.value(kind="classify", reason="rate_limited")
+    window = llm._azure_breaker.snapshot()["recent_calls"]
+
+    llm.classify_intent_with_azure_openai("Kya koi EMI plan mil sakta hai?")
+    llm.classify_intent_with_azure_openai("Mujhe installments chahiye")
+
+    assert len(calls) == 1
+    assert llm._llm_fallbacks.value(kind="classify", reason="rate_limited") == fallbacks + 1
+    assert llm._azure_breaker.snapshot()["recent_calls"] == min(window + 1, llm.LLM_BREAKER_WINDOW)
+
+
+def test_time_queued_for_the_limiter_is_not_service_latency(monkeypatch, azure_client):
+    def create(**request):
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="callback"),
+                                                        finish_reason="stop")])
+
+    azure_client(create)
+    limiter = RateLimiter("queued", rpm=600, burst_seconds=0.1)  # one call at once, then one per 0.1 s
+    monkeypatch.setattr(llm, "_provider", llm.AzureOpenAIProvider(limiter=limiter))
+    monkeypatch.setattr(llm, "_azure_breaker", CircuitBreaker("azure_openai", slow_call_seconds=0.05))
+
+    for i in range(3):
+        llm.classify_intent_with_azure_openai(f"Kal baat karte hain {i}")
+
+    status = llm.get_llm_breaker_status()
+    assert _rate_limit_wait.snapshot()["queued"]["sum"] > 0.15  # the second and third call queued
+    assert (status["recent_calls"], status["slow_call_rate"]) == (3, 0.0)
+
+
+def test_routed_deployments_do_not_count_their_queue_as_latency():
+    deployment = Deployment("eastus", "https://eastus.example/", "gpt-4.1-mini",
+                            breaker=CircuitBreaker("deployment:eastus", slow_call_seconds=0.05),
+                            limiter=RateLimiter("queued_eastus", rpm=600, burst_seconds=0.1))
+    router = DeploymentRouter([deployment])
+
+    def send(deployment, timeout):
+        deployment.limiter.acquire(0, max_wait=1.0)
+        return "ok"
+
+    for _ in range(3):
+        assert router.call(send) == "ok"
+    assert deployment.latency < 0.05
+    assert deployment.breaker.snapshot()["slow_call_rate"] == 0.0
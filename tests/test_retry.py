@@ -0,0 +1,70 @@
+# tests/test_retry.py
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.utils.retry import RetryPolicy, call_with_retries, retry_after_seconds, _retries, _giveups
+
+
+class FakeStatusError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(status_code=status_code, headers=headers or {})
+
+
+def _flaky(errors):
+    """attempt() that raises each error in turn, then returns "ok"."""
+    calls = []
+
+    def attempt():
+        calls.append(time.time())
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return "ok"
+
+    return attempt, calls
+
+
+def test_throttling_is_retried_after_retry_after_ms():
+    before = _retries.value(reason="throttled")
+    attempt, calls = _flaky([FakeStatusError(429, {"retry-after-ms": "50"})])
+
+    assert call_with_retries(attempt, RetryPolicy(min_attempt_seconds=0)) == "ok"
+    assert len(calls) == 2
+    assert calls[1] - calls[0] >= 0.05
+    assert _retries.value(reason="throttled") == before + 1
+
+
+def test_server_errors_stop_after_max_attempts():
+    before = _giveups.value(reason="server_error")
+    attempt, calls = _flaky([FakeStatusError(503)] * 5)
+
+    with pytest.raises(FakeStatusError):
+        call_with_retries(attempt, RetryPolicy(max_attempts=3, base_delay=0.001, min_attempt_seconds=0))
+    assert len(calls) == 3
+    assert _giveups.value(reason="server_error") == before + 1
+
+
+def test_no_retry_past_the_deadline():
+    attempt, calls = _flaky([FakeStatusError(429, {"retry-after": "2"})])
+
+    with pytest.raises(FakeStatusError):
+        call_with_retries(attempt, RetryPolicy(), deadline=time.time() + 1)
+    assert len(calls) == 1
+
+
+def test_client_errors_are_not_retried():
+    attempt, calls = _flaky([FakeStatusError(400)])
+
+    with pytest.raises(FakeStatusError):
+        call_with_retries(attempt, RetryPolicy())
+    assert len(calls) == 1
+
+
+def test_retry_after_header_formats():
+    assert retry_after_seconds(FakeStatusError(429, {"retry-after-ms": "1500"})) == 1.5
+    assert retry_after_seconds(FakeStatusError(429, {"retry-after": "3"})) == 3.0
+    assert retry_after_seconds(FakeStatusError(429)) is None
@@ -0,0 +1,140 @@
+# tests/test_single_flight.py
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import src.utils.llm as llm
+from src.utils.circuit_breaker import CircuitBreaker
+from src.utils.single_flight import SingleFlight
+
+
+def test_concurrent_threads_share_one_call():
+    flight = SingleFlight("test_threads")
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.1)
+        return "paid"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("key", slow))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == ["paid"] * 5
+    assert len(calls) == 1
+    assert flight.stats() == {"leaders": 1, "coalesced": 4, "in_flight": 0}
+
+
+def test_followers_get_the_leaders_error_and_can_time_out():
+    flight = SingleFlight("test_errors")
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.1)
+        raise ConnectionError("down")
+
+    errors = []
+
+    def follower(timeout):
+        try:
+            flight.do("key", failing, timeout)
+        except Exception as e:
+            errors.append(type(e))
+
+    leader = threading.Thread(target=follower, args=(None,))
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=follower, args=(t,)) for t in (None, 0.01)]
+    for t in followers:
+        t.start()
+    for t in [leader, *followers]:
+        t.join()
+
+    assert sorted(e.__name__ for e in errors) == ["ConnectionError", "ConnectionError", "FlightTimeout"]
+
+
+def test_coroutines_share_one_call_and_survive_leader_cancellation():
+    flight = SingleFlight("test_async")
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return ["plan"]
+
+    async def run():
+        leader = asyncio.ensure_future(flight.ado("key", slow))
+        await asyncio.sleep(0)
+        followers = [asyncio.ensure_future(flight.ado("key", slow)) for _ in range(3)]
+        leader.cancel()
+        return await asyncio.gather(*followers)
+
+    assert asyncio.run(run()) == [["plan"]] * 3
+    assert len(calls) == 1
+
+
+def test_identical_classifications_make_one_azure_request(azure_client):
+    requests = []
+
+    def create(**kwargs):
+        requests.append(kwargs)
+        time.sleep(0.1)
+        message = SimpleNamespace(content="callback")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")], usage=None)
+
+    azure_client(create)
+    coalesced = llm.get_single_flight_stats()["classify"]["coalesced"]
+
+    results = []
+    utterances = ["kal  baat karte hain  shayad", "kal baat karte hain shayad", "kal baat karte hain shayad"]
+    threads = [threading.Thread(target=lambda u=u: results.append(llm.classify_intent_with_azure_openai(u)))
+               for u in utterances]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == ["callback"] * 3
+    assert len(requests) == 1
+    assert llm.get_single_flight_stats()["classify"]["coalesced"] == coalesced + 2
+
+
+
+def test_follower_with_more_time_calls_again_when_the_leader_runs_out(monkeypatch, azure_client):
+    timeouts = []
+    started = threading.Event()
+
+    def create(**kwargs):
+        timeouts.append(kwargs["timeout"])
+        started.set()
+        if kwargs["timeout"] < 1:
+            time.sleep(kwargs["timeout"])
+            raise TimeoutError("Request timed out")
+        message = SimpleNamespace(content="callback")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")], usage=None)
+
+    azure_client(create)
+    monkeypatch.setattr(llm, "_azure_breaker", CircuitBreaker("azure_openai"))
+    results = {}
+
+    def classify(name, budget):
+        results[name] = llm._classify_with_azure_openai("dekhte hain kab ho payega", time.time() + budget)
+
+    leader = threading.Thread(target=classify, args=("leader", 0.4))
+    leader.start()
+    started.wait()
+    follower = threading.Thread(target=classify, args=("follower", 8))
+    follower.start()
+    for t in (leader, follower):
+        t.join()
+
+    assert results["follower"] == ("callback", True)
+    assert results["leader"][1] is False
+    assert len(timeouts) == 2 and timeouts[0] <= 0.4 and timeouts[1] > 7
@@ -0,0 +1,41 @@
+# tests/test_sqlite_store.py
+
+import threading
+
+from src.utils.sqlite_store import SQLiteStore, hash_key
+
+
+def test_writes_are_visible_to_other_connections(tmp_path):
+    path = str(tmp_path / "cache.db")
+    writer = SQLiteStore(path)
+    key = hash_key("v1", "payment ho gaya hai")
+    writer.put("intent", key, "paid", version="v1", source_text="payment ho gaya hai")
+    writer.flush()
+
+    # A second store on the same file stands in for another uvicorn worker
+    reader = SQLiteStore(path)
+    assert reader.get("intent", key) == "paid"
+    assert reader.get_many("intent", [key, hash_key("v1", "other")]) == {key: "paid"}
+    assert reader.preload("intent", "v1", limit=10) == [(key, "paid")]
+    assert reader.get("plans", key) is None
+
+    writer.close()
+    reader.close()
+
+
+def test_flush_returns_after_close_and_after_a_failed_batch(tmp_path, monkeypatch):
+    store = SQLiteStore(str(tmp_path / "cache.db"), flush_interval=0.05)
+
+    def broken(conn, batch):
+        raise ValueError("not serialisable")
+
+    monkeypatch.setattr(store, "_write_batch", broken)
+    store.put("intent", hash_key("v1", "a"), "paid", version="v1")
+    store.flush()
+    assert store._writer.is_alive()
+
+    store.close()
+    flushed = threading.Thread(target=store.flush, daemon=True)
+    flushed.start()
+    flushed.join(timeout=2)
+    assert not flushed.is_alive()
@@ -0,0 +1,134 @@
+# tests/test_turn_analysis.py
+
+import asyncio
+import json
+
+import src.nodes.negotiation as negotiation
+import src.nodes.payment_check as payment_check
+import src.utils.llm as llm
+from src.state import create_initial_state
+from src.utils.llm_provider import LocalLLMProvider
+
+PLANS = [
+    {"name": "3-Month EMI Plan", "description": "3 mahine tak ₹15,000 per month"},
+    {"name": "6-Month EMI Plan", "description": "6 mahine tak ₹7,500 per month"},
+]
+
+
+class RecordingProvider(LocalLLMProvider):
+    def __init__(self, answers):
+        super().__init__(answers=answers)
+        self.kinds = []
+
+    def create(self, client, kind, **request):
+        self.kinds.append(kind)
+        return super().create(client, kind, **request)
+
+    async def acreate(self, client, kind, **request):
+        self.kinds.append(kind)
+        return await super().acreate(client, kind, **request)
+
+
+def _turn(**fields):
+    answer = {"intent": "willing", "amount": None, "date": None, "plan_choice": None,
+              "reply": "Bahut achha, main aapko kuch payment options dikhata hoon."}
+    return json.dumps({**answer, **fields}, ensure_ascii=False)
+
+
+def _combined(monkeypatch, answers):
+    provider = RecordingProvider(answers)
+    monkeypatch.setattr(llm, "_provider", provider)
+    monkeypatch.setattr(llm, "INTENT_CACHE_ENABLED", False)
+    monkeypatch.setattr(llm, "PLAN_CACHE_ENABLED", False)
+    monkeypatch.setattr(llm, "classify_with_confidence", lambda prompt: ("unknown", 0.0))
+    monkeypatch.setattr(llm, "classify_intent_with_model", lambda prompt: None)
+    for node in (payment_check, negotiation):
+        monkeypatch.setattr(node, "LLM_COMBINED_TURN", True)
+        monkeypatch.setattr(node, "PLAN_SOURCE", "llm")
+    return provider
+
+
+def _state(*messages, **fields):
+    state = create_initial_state("+919876543210")
+    state.update(is_verified=True, messages=list(messages), **fields)
+    return state
+
+
+def _willing_turn(state: dict) -> dict:
+    state.update(payment_check.payment_check_node(state))
+    if state["payment_status"] == "willing":
+        state.update(negotiation.negotiation_node(state))
+    return state
+
+
+def _disclosed(utterance: str) -> dict:
+    return _state({"role": "assistant", "content": "Kya aap aaj yeh payment kar sakte hain?"},
+                  {"role": "user", "content": utterance}, stage="disclosure", last_user_input=utterance)
+
+
+def test_willing_turn_is_one_llm_call(monkeypatch):
+    provider = _combined(monkeypatch, {"turn": _turn(reply=None, plans=PLANS)})
+
+    state = _willing_turn(_disclosed("Haan ho jayega, bas thoda time chahiye"))
+
+    assert provider.kinds == ["turn"]
+    assert state["offered_plans"] == PLANS
+    assert state["messages"][-1]["content"].endswith("Aapke liye kaunsa option best rahega?")
+    assert state["turn_analysis"] is None
+
+
+def test_turn_call_is_only_made_when_it_saves_a_call(monkeypatch):
+    provider = _combined(monkeypatch, {"classify": "willing"})
+    for node in (payment_check, negotiation):
+        monkeypatch.setattr(node, "PLAN_SOURCE", "engine")
+
+    state = _willing_turn(_disclosed("Haan ho jayega, bas thoda time chahiye"))
+
+    assert provider.kinds == ["classify"]
+    assert state["payment_status"] == "willing" and state["offered_plans"]
+
+
+def test_slots_from_the_turn_call_complete_the_commitment(monkeypatch):
+    provider = _combined(monkeypatch, {"turn": _turn(plan_choice=1, date="10-11-2026")})
+    utterance = "Mere liye chhota wala sahi rahega, agle mahine das tareekh ko"
+    state = _state({"role": "assistant", "content": "Yahan kuch payment options hain: ... Kaunsa option best rahega?"},
+                   {"role": "user", "content": utterance},
+                   stage="negotiation", payment_status="willing", offered_plans=PLANS, last_user_input=utterance)
+
+    result = asyncio.run(negotiation.anegotiation_node(state))
+
+    assert provider.kinds == ["turn"]
+    assert result["ptp_id"] and result["is_complete"]
+    assert (result["selected_plan"], result["ptp_amount"], result["ptp_date"]) == (PLANS[0], 15000, "10-11-2026")
+
+
+def test_unusable_turn_output_falls_back_to_the_separate_call(monkeypatch):
+    provider = _combined(monkeypatch, {"turn": '{"intent": "willing"', "classify": "callback"})
+    parse_failures = llm._parse_failures.value(kind="turn", error="json")
+    fallbacks = llm._llm_fallbacks.value(kind="turn", reason="invalid_response")
+
+    assert llm.classify_turn("Dekhte hain", "context", plans_for=45000) == ("callback", None)
+    assert provider.kinds == ["turn", "classify"]
+    assert llm._parse_failures.value(kind="turn", error="json") == parse_failures + 1
+    assert llm._llm_fallbacks.value(kind="turn", reason="invalid_response") == fallbacks + 1
+
+
+def test_implausible_slots_are_dropped(monkeypatch):
+    _combined(monkeypatch, {"turn": _turn(amount=-5, date="15-03-1985", plan_choice=0, reply="Ok")})
+
+    analysis = llm.analyze_turn("context", classify=False)
+
+    assert analysis == {"intent": "willing", "amount": None, "date": None, "plan_choice": None,
+                        "reply": None, "plans": None}
+
+
+def test_template_fallback_uses_the_turn_slots(monkeypatch):
+    _combined(monkeypatch, {"turn": _turn(date="10-11-2026", reply="Ok")})
+    utterance = "Agle mahine das tareekh ko dekhte hain"
+    state = _state({"role": "assistant", "content": "Yahan kuch payment options hain: ... Kaunsa option best rahega?"},
+                   {"role": "user", "content": utterance},
+                   stage="negotiation", payment_status="willing", offered_plans=PLANS, last_user_input=utterance)
+
+    result = negotiation.negotiation_node(state)
+
+    assert result["messages"][-1]["content"].startswith("Us date ke liye dhanyawad")
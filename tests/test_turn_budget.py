@@ -0,0 +1,33 @@
+# tests/test_turn_budget.py
+
+import time
+from types import SimpleNamespace
+
+import src.utils.llm as llm
+
+
+def _recording_create(calls):
+    def create(**kwargs):
+        calls.append(kwargs)
+        return SimpleNamespace(choices=[])
+
+    return create
+
+
+def test_spent_budget_uses_fallbacks_without_calling_azure(azure_client):
+    calls = []
+    azure_client(_recording_create(calls))
+    deadline = time.time() - 1
+
+    assert llm.generate_payment_plans(30000, "Test", deadline) == llm.generate_fallback_plans(30000)
+    assert llm.generate_negotiation_response("context", deadline) is None
+    assert llm.classify_intent_with_azure_openai("Main ne payment kar diya hai", deadline) == "paid"
+    assert calls == []
+
+
+def test_remaining_budget_becomes_the_request_timeout(azure_client):
+    calls = []
+    azure_client(_recording_create(calls))
+
+    llm.generate_negotiation_response("context", time.time() + 5)
+    assert 4 < calls[0]["timeout"] <= 5